@@ -1,49 +1,27 @@
 import sys
 
-from PyQt5.QtCore import QThread, pyqtSignal, Qt
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem, QHeaderView, QApplication, QTableView, QGridLayout,
+    QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QApplication, QTableView, QGridLayout,
     QGraphicsOpacityEffect
 )
-from qfluentwidgets import TableWidget, LineEdit, PrimaryToolButton, FluentIcon, PrimaryPushButton, BodyLabel, \
-    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu
+from qfluentwidgets import TableView, LineEdit, PrimaryToolButton, FluentIcon, PrimaryPushButton, BodyLabel, \
+    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu, MessageBoxBase, SubtitleLabel, SpinBox
 
 from books import BookManager
+from catalog_store import catalog
 from connector_pymysql import DBConnector, db_config
-
-
-class Worker(QThread):
-    result_ready = pyqtSignal(list, list)
-
-    def __init__(self, parent=None):
-        super(Worker, self).__init__(parent)
-        print("子线程创建")
-
-    def run(self):
-        try:
-            print("Worker thread started")
-            columns, books = BookManager().select_all_book()
-
-            sorted_books = sorted(books, key=lambda book: book.get('shelves', 1), reverse=True)
-
-            print("Query completed with shelves-sorted results")
-            self.result_ready.emit(columns, sorted_books)
-        except Exception as e:
-            print(f"Worker thread error: {str(e)}")
-            # self.result_ready.emit([], [])
+from search_controller import SearchController
+from search_index import book_matches
+from table_models import BookTableModel
 
 
 class BookManagerInterface(QWidget):
-    # 更新表格信号
-    search_result_ready = pyqtSignal(list, list)
     show_success_delete_InfoBars = pyqtSignal(bool, str)
 
     def __init__(self, text: str, parent=None):
         super().__init__()
         self.initUI()
-        # 更新表格信号
-        self.search_result_ready.connect(self.update_table)
         self.setObjectName(text.replace(' ', '-'))
 
         # self.stackedWidget.setAttribute(Qt.WA_TranslucentBackground)
@@ -56,10 +34,13 @@ class BookManagerInterface(QWidget):
         # 总垂直布局
         vBoxLayout = QVBoxLayout(self)  # 将布局设置为窗口的主布局
 
-        # 搜索和按钮
+        # 搜索和按钮：输入防抖后在后台线程查询，只显示最新一次的结果
+        self.search_controller = SearchController(self.query_books, parent=self)
+        self.search_controller.result_ready.connect(self.update_table)
+        self.search_controller.failed.connect(self.show_search_error)
         hBoxLayout1 = QHBoxLayout()
-        le1 = LineEdit()
-        le1.textChanged.connect(self.search_books)
+        le1 = self.search_edit = LineEdit()
+        le1.textChanged.connect(self.search_controller.search)
         le1.setPlaceholderText("搜索ISBN码或者书名")
         le1.setStyleSheet("background-color: rgba(245, 245, 245, 0.2);border-radius: 4px")
         ptbtn1 = PrimaryToolButton()
@@ -68,7 +49,7 @@ class BookManagerInterface(QWidget):
         ppbtn1 = PrimaryPushButton()
         ptbtn2 = PrimaryToolButton()
         ptbtn2.setIcon(FluentIcon.SYNC)
-        ptbtn2.clicked.connect(self.search_books)
+        ptbtn2.clicked.connect(catalog.reload)  # 从数据库重新加载目录
         ppbtn1.setIcon(FluentIcon.ADD)
         ppbtn1.setText("添加图书")
         ppbtn1.clicked.connect(self.add_book_window)
@@ -77,25 +58,25 @@ class BookManagerInterface(QWidget):
         hBoxLayout1.addWidget(ptbtn2)
         hBoxLayout1.addWidget(ppbtn1)
 
-        # 启动子线程加载数据
-        self.worker = Worker(parent=self)
-        self.worker.result_ready.connect(self.update_table)  # 连接信号和槽
-        self.worker.start()  # 启动线程
-
         # 表格
         hBoxLayout2 = QHBoxLayout()
-        self.tableView = TableWidget()
+        self.tableView = TableView()
+        # 虚拟模型：只为可见行生成单元格，几十万行也不会卡住界面
+        self.model = BookTableModel(self.tableView)
+        self.tableView.setModel(self.model)
         self.tableView.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tableView.customContextMenuRequested.connect(self.show_context_menu)
-        self.tableView.setSortingEnabled(True)  # 原生排序
+        self.tableView.setSortingEnabled(True)  # 点击表头排序
+        self.tableView.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)  # 默认保持查询顺序
+        # 支持Ctrl/Shift多选整行，右键对选中的多本书批量操作
+        self.tableView.setSelectionBehavior(QTableView.SelectRows)
+        self.tableView.setSelectionMode(QTableView.ExtendedSelection)
         hBoxLayout2.addWidget(self.tableView)
 
         # 设置表格属性
         self.tableView.setBorderVisible(True)
         self.tableView.setBorderRadius(8)
         self.tableView.setWordWrap(False)
-        self.tableView.setColumnCount(5)
-        self.tableView.setHorizontalHeaderLabels(['ISBN', '书名', '分类', '库存', '上架状态'])
         self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # 自动拉伸
         self.tableView.setEditTriggers(QTableView.NoEditTriggers)  # 禁用直接编辑
 
@@ -103,25 +84,58 @@ class BookManagerInterface(QWidget):
         vBoxLayout.addLayout(hBoxLayout1)
         vBoxLayout.addLayout(hBoxLayout2)
 
+        # 数据来自各界面共享的图书目录，只加载一次；任何界面改了图书都在内存中刷新
+        catalog.reset.connect(self.on_catalog_reset)
+        catalog.page_loaded.connect(self.on_catalog_page)
+        catalog.loaded.connect(self.on_catalog_loaded)
+        catalog.book_changed.connect(self.on_book_changed)
+        if catalog.ready:
+            self.update_table([], catalog.books("shelves"))
+        else:
+            catalog.load()
+
+    def on_catalog_reset(self, columns, books):
+        """目录重新加载的第一页（有搜索关键字时等加载完再过滤）"""
+        if not self.search_edit.text():
+            self.update_table(columns, books)
+
+    def on_catalog_page(self, columns, books):
+        if not self.search_edit.text():
+            self.append_table(columns, books)
+
+    def on_catalog_loaded(self):
+        if self.search_edit.text():
+            self.search_books(self.search_edit.text())
+
+    def on_book_changed(self, isbn, book):
+        """有图书被修改：只刷新这一行，保持滚动位置和选中行"""
+        if book is None or not book_matches(book, self.search_edit.text()):
+            self.model.remove_book(isbn)
+        else:
+            self.model.update_book(book)
+
     def show_context_menu(self, pos):
         row = self.tableView.rowAt(pos.y())
         if row == -1:  # 未选中有效行
             return
 
-        # 获取选中行的图书数据
-        book_item = self.tableView.item(row, 0)
-        if not book_item:
+        rows = self.selected_rows()
+        if len(rows) > 1 and row in rows:
+            menu = RoundMenu()
+            menu.addAction(Action(FluentIcon.BROOM, f'批量下架（{len(rows)}本）',
+                                  triggered=lambda: self.delete_books(rows)))
+            menu.addAction(Action(FluentIcon.EDIT, f'批量调整库存（{len(rows)}本）',
+                                  triggered=lambda: self.adjust_books_stock(rows)))
+            menu.exec_(self.tableView.viewport().mapToGlobal(pos))
             return
 
-        # 获取图书的上架状态
-        shelves_item = self.tableView.item(row, 4)
-        if not shelves_item:
+        # 获取选中行的图书数据
+        book = self.model.book(row)
+        if not book:
             return
 
-        shelves = shelves_item.text()  # 上架状态（0: 下架, 1: 上架）
-
         # 如果图书是下架状态，不弹出菜单
-        if shelves == "下架":
+        if not self.model.is_active(book):
             return
 
         # 创建菜单
@@ -133,20 +147,16 @@ class BookManagerInterface(QWidget):
         menu.exec_(self.tableView.viewport().mapToGlobal(pos))
 
     def edit_book(self, row):
-        isbn = self.tableView.item(row, 0).text()
-        # print(isbn)
-        columns, books = BookManager().select_book_by_column("isbn", isbn)
-        print(books)
-        print(books[0]['isbn'])
-        # print(columns, books)
+        isbn = self.model.book(row)['isbn']
+        # 目录已经在内存中，不必在界面线程里查询数据库
+        books = [catalog.book(isbn) or self.model.book(row)]
         self.edit_book_window = Edit_Book(books)
         self.edit_book_window.show_success_edit_InfoBar.connect(self.show_success_edit_infobar)
         self.edit_book_window.show()
 
     def delete_book(self, row):
-        isbn = self.tableView.item(row, 0).text()
-        columns, books = BookManager().select_book_by_column("isbn", isbn)
-        title = books[0]['title']
+        isbn = self.model.book(row)['isbn']
+        title = self.model.book(row)['title']
         mess = Dialog("确认下架", f"确认下架ISBN：{isbn}\n书名：{title}\n\n的图书吗？")
         mess.yesButton.setText("确认")
         mess.cancelButton.setText("取消")
@@ -160,6 +170,54 @@ class BookManagerInterface(QWidget):
         else:
             print('取消添加')
 
+    def selected_rows(self):
+        """当前选中的行号（升序去重）"""
+        return sorted({index.row() for index in self.tableView.selectionModel().selectedRows()})
+
+    def delete_books(self, rows):
+        """批量下架选中的图书（已下架的跳过）"""
+        books = [self.model.book(row) for row in rows]
+        isbns = [book['isbn'] for book in books if self.model.is_active(book)]
+        if not isbns:
+            return
+        mess = Dialog("确认批量下架", f"确认下架选中的 {len(isbns)} 本图书吗？")
+        mess.yesButton.setText("确认")
+        mess.cancelButton.setText("取消")
+        if mess.exec() and BookManager().set_books_inactive(isbns):
+            self.show_success_batch_infobar('下架成功', f"已下架 {len(isbns)} 本图书！")
+
+    def adjust_books_stock(self, rows):
+        """给选中的每本图书增减相同的库存"""
+        isbns = [self.model.book(row)['isbn'] for row in rows]
+        dialog = Stock_Delta_Dialog(len(isbns), self.window())
+        if not dialog.exec() or dialog.delta() == 0:
+            return
+        delta = dialog.delta()
+        if BookManager().adjust_stock({isbn: delta for isbn in isbns}):
+            self.show_success_batch_infobar('调整成功', f"已调整 {len(isbns)} 本图书的库存！")
+        else:
+            InfoBar.warning(
+                title='调整失败',
+                content="库存不能小于0，未做任何修改",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=2000,
+                parent=self
+            ).show()
+
+    def show_success_batch_infobar(self, title, content):
+        w = InfoBar.success(
+            title=title,
+            content=content,
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self
+        )
+        w.show()
+
     # def update_table(self, columns, books):
     #     """更新表格数据"""
     #     print("Books data:", books)
@@ -174,73 +232,36 @@ class BookManagerInterface(QWidget):
     #         else:
     #             print(f"Error: book at row {row} is not a dictionary: {book}")
 
+    def show_search_error(self, keyword, error):
+        """搜索失败：清空表格（不再显示上一个关键字的结果）并提示"""
+        self.update_table([], [])
+        InfoBar.error(
+            title='搜索失败',
+            content=f"搜索“{keyword}”失败：{error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        ).show()
+
     def update_table(self, columns, books):
-        """更新表格数据"""
-        print("Books data:", books)
-        self.tableView.setRowCount(len(books))  # 设置行数
-        for row, book in enumerate(books):
-            # 确保 book 是字典
-            if isinstance(book, dict):
-                # 获取上架状态（确保是整数类型）
-                try:
-                    shelves = int(book.get('shelves', 1))  # 默认值为1（上架）
-                except (ValueError, TypeError):
-                    shelves = 1  # 异常时默认设为上架
+        """更新表格数据（一次模型重置）"""
+        self.tableView.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.model.set_books(books)
 
-                # 根据上架状态设置字体颜色
-                if shelves == 0:  # 下架
-                    color = QColor(128, 128, 128)  # 灰色
-                else:
-                    color = QColor(0, 0, 0)  # 默认黑色
-
-                # 创建并设置单元格
-                for col in range(5):  # 假设共4列（0-3）
-                    if col == 0:
-                        text = book['isbn']
-                    elif col == 1:
-                        text = book['title']
-                    elif col == 2:
-                        text = book['category']
-                    elif col == 3:
-                        text = str(book.get('stock', 0))  # 库存值
-                    elif col == 4:
-                        text = "上架" if book['shelves'] == 1 else "下架"
-
-                    item = QTableWidgetItem(text)
-                    item.setForeground(color)  # 设置字体颜色
-                    self.tableView.setItem(row, col, item)
-            else:
-                print(f"Error: book at row {row} is not a dictionary: {book}")
+    def append_table(self, columns, books):
+        """把一页图书追加到表格末尾"""
+        self.model.append_books(books)
 
     def search_books(self, keyword):
-        """根据关键字搜索书籍"""
-        if not keyword:
-            # 如果关键字为空，加载所有书籍
-            columns, books = BookManager().select_all_book()
-            self.search_result_ready.emit(columns, books)
-        else:
-            # 如果关键字不为空，分别查询 title 和 isbn
-            columns_title, results_title = BookManager().select_book_by_column("title", keyword)
-            columns_isbn, results_isbn = BookManager().select_book_by_column("isbn", keyword)
-            # 确保列名一致
-            if columns_title != columns_isbn:
-                raise ValueError("列名不一致，无法合并结果")
-            # 将 results_title 转换为列表（如果它是元组）
-            if isinstance(results_title, tuple):
-                results_title = list(results_title)
-            # 将 results_isbn 转换为列表（如果它是元组）
-            if isinstance(results_isbn, tuple):
-                results_isbn = list(results_isbn)
-            # 合并结果并去重
-            combined_results = results_title + results_isbn
-            unique_results = []
-            seen = set()
-            for book in combined_results:
-                if book['isbn'] not in seen:
-                    seen.add(book['isbn'])
-                    unique_results.append(book)
-            # 发射信号，传递合并后的结果
-            self.search_result_ready.emit(columns_title, unique_results)
+        """立即按关键字搜索书籍（后台执行，结果到达后更新表格）"""
+        self.search_controller.search_now(keyword)
+
+    def query_books(self, keyword):
+        """根据关键字查询书籍，在搜索线程中执行（目录加载完成后只查内存）"""
+        # 关键字为空时是全部书籍，否则同时匹配 title 和 isbn（已去重、按匹配程度排序）
+        return [], catalog.search(keyword)
 
     def add_book_window(self):
         # self.add_book.show()
@@ -261,7 +282,6 @@ class BookManagerInterface(QWidget):
                 parent=self
             )
             w.show()
-            self.search_books("")  # 自动刷新表格
 
     def show_success_edit_infobar(self, b, ibsn):
         if b:
@@ -276,7 +296,6 @@ class BookManagerInterface(QWidget):
                 parent=self
             )
             w.show()
-            self.search_books("")
 
     def show_success_delete_InfoBar(self, b, isbn):
         if b:
@@ -293,7 +312,6 @@ class BookManagerInterface(QWidget):
             w.show()
             # time.sleep(2000)
             # w.close()
-            self.search_books("")
     # def edit_book_window(self):
     #     # self.add_book.show()
     #     self.add_book_window = Edit_Book()
@@ -301,6 +319,25 @@ class BookManagerInterface(QWidget):
     #     self.add_book_window.show()
 
 
+class Stock_Delta_Dialog(MessageBoxBase):
+    """批量调整库存：输入每本书增减的数量"""
+
+    def __init__(self, count: int, parent=None):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel(f"批量调整库存（{count}本）")
+        self.spinBox = SpinBox()
+        self.spinBox.setRange(-9999, 9999)
+        self.viewLayout.addWidget(self.titleLabel)
+        self.viewLayout.addWidget(BodyLabel("每本书的库存增减数量（负数为减少）："))
+        self.viewLayout.addWidget(self.spinBox)
+        self.yesButton.setText("确认")
+        self.cancelButton.setText("取消")
+        self.widget.setMinimumWidth(320)
+
+    def delta(self):
+        return self.spinBox.value()
+
+
 class Add_Book(QWidget):
     check_exist_signal = pyqtSignal(list)
     show_success_InfoBar = pyqtSignal(bool, str)
@@ -368,21 +405,21 @@ class Add_Book(QWidget):
         title = self.le2.text()
         category = self.le3.text()
         stock = self.le4.text()
-        columns = None
-        books = None
         if not (len(isbn) == 0 or len(title) == 0 or len(stock) == 0):
-            try:
-                with DBConnector(db_config) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        f"SELECT * FROM books WHERE isbn = '{isbn}'")
-                    columns = [col[0] for col in cursor.description]
-                    books = cursor.fetchall()
-                    # return columns, books
-            except Exception as e:
-                print(e)
-
-            if books != ():  # 图书已存在
+            if catalog.ready:
+                # 目录已经在内存中（包括已下架的图书），不必查询数据库
+                exists = catalog.book(isbn) is not None
+            else:
+                exists = True
+                try:
+                    with DBConnector(db_config) as conn:
+                        cursor = conn.cursor()
+                        cursor.execute("SELECT isbn FROM books WHERE isbn = %s", (isbn,))
+                        exists = cursor.fetchone() is not None
+                except Exception as e:
+                    print(e)
+
+            if exists:  # 图书已存在
                 w = InfoBar.warning(
                     title='图书已存在',
                     content=f"图书（{isbn}）已存在！",
@@ -1,70 +1,35 @@
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QDate
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import pyqtSignal, Qt, QDate
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem, QHeaderView, QTableView
+    QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QTableView
 )
-from qfluentwidgets import TableWidget, LineEdit, PrimaryToolButton, FluentIcon, PrimaryPushButton, BodyLabel, \
-    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu, FastCalendarPicker
+from qfluentwidgets import TableView, LineEdit, PrimaryToolButton, FluentIcon, PrimaryPushButton, BodyLabel, \
+    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu, FastCalendarPicker, ListWidget
 
-from books import BookManager
-from connector_pymysql import DBConnector, db_config
-
-
-class Worker(QThread):
-    # 定义一个信号，用于传递查询结果
-    result_ready = pyqtSignal(list, list)
-
-    def __init__(self, parent=None):
-        super(Worker, self).__init__(parent)
-        print("子线程创建")
-
-    def select_all_books_sorted_by_stock(self):
-        """
-        获取所有图书数据，并按库存降序排列
-        :return: (表头列表, 图书数据列表)
-        """
-        try:
-            with DBConnector(db_config) as conn:
-                cursor = conn.cursor()
-                # 按库存降序排序，下架图书（shelves=0）排在最后
-                cursor.execute('''
-                    SELECT * FROM books 
-                    ORDER BY shelves DESC, stock DESC
-                ''')
-                columns = [col[0] for col in cursor.description]
-                books = cursor.fetchall()
-                return columns, books
-        except Exception as e:
-            print(f"获取排序数据失败: {e}")
-            return [], []
-
-    def run(self):
-        try:
-            print("Worker thread started")
-            columns, books = self.select_all_books_sorted_by_stock()
-            print("Query completed:", columns, books)
-            # 发出信号，传递查询结果
-            self.result_ready.emit(columns, books)
-        except Exception as e:
-            print(f"!!! Worker thread crashed: {e}")
+from borrow import BorrowManager
+from catalog_store import catalog
+from search_controller import SearchController
+from search_index import book_matches
+from table_models import StockBookTableModel
+from task_executor import executor, PRIORITY_VISIBLE
 
 
 class BorrowInterface(QWidget):
-    search_result_ready = pyqtSignal(list, list)
-
     def __init__(self, text: str, parent=None):
         super(BorrowInterface, self).__init__(parent)
+        self.cart = []  # 借书车中的图书（同一本只放一次）
         self.initUI()
-        self.search_result_ready.connect(self.update_table)
         self.setObjectName(text.replace(' ', '-'))
 
     def initUI(self):
         vBoxLayout = QVBoxLayout(self)  # 将布局设置为窗口的主布局
 
-        # 搜索和按钮
+        # 搜索和按钮：输入防抖后在后台线程查询，只显示最新一次的结果
+        self.search_controller = SearchController(self.query_books, parent=self)
+        self.search_controller.result_ready.connect(self.update_table)
+        self.search_controller.failed.connect(self.show_search_error)
         hBoxLayout1 = QHBoxLayout()
-        le1 = LineEdit()
-        le1.textChanged.connect(self.search_books)
+        le1 = self.search_edit = LineEdit()
+        le1.textChanged.connect(self.search_controller.search)
         le1.setPlaceholderText("搜索ISBN码或者书名")
         le1.setStyleSheet("background-color: rgba(245, 245, 245, 0.2);border-radius: 4px")
         ptbtn1 = PrimaryToolButton()
@@ -72,20 +37,29 @@ class BorrowInterface(QWidget):
         # ppbtn1 = PrimaryPushButton()
         ptbtn2 = PrimaryToolButton()
         ptbtn2.setIcon(FluentIcon.SYNC)
-        ptbtn2.clicked.connect(self.search_books)
+        ptbtn2.clicked.connect(catalog.reload)  # 从数据库重新加载目录
         # ppbtn1.setIcon(FluentIcon.ADD)
         # ppbtn1.setText("添加图书")
         # ppbtn1.clicked.connect(self.add_book_window)
+        # 借书车：一个学生一次借多本书，一个事务完成
+        self.cart_btn = PushButton(FluentIcon.SHOPPING_CART, "借书车 (0)")
+        self.cart_btn.clicked.connect(self.show_cart)
         hBoxLayout1.addWidget(le1)
         hBoxLayout1.addWidget(ptbtn1)
         hBoxLayout1.addWidget(ptbtn2)
+        hBoxLayout1.addWidget(self.cart_btn)
         # hBoxLayout1.addWidget(ppbtn1)
 
         # 表格
         hBoxLayout2 = QHBoxLayout()
-        self.tableView = TableWidget()
+        self.tableView = TableView()
+        # 虚拟模型：只为可见行生成单元格，背景色按库存在绘制时计算
+        self.model = StockBookTableModel(self.tableView)
+        self.tableView.setModel(self.model)
         self.tableView.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tableView.customContextMenuRequested.connect(self.show_context_menu)
+        self.tableView.setSelectionBehavior(QTableView.SelectRows)
+        self.tableView.setSelectionMode(QTableView.ExtendedSelection)
         # self.tableView.setSortingEnabled(True)  # 原生排序
         hBoxLayout2.addWidget(self.tableView)
 
@@ -93,20 +67,43 @@ class BorrowInterface(QWidget):
         self.tableView.setBorderVisible(True)
         self.tableView.setBorderRadius(8)
         self.tableView.setWordWrap(False)
-        self.tableView.setColumnCount(5)
-        self.tableView.setHorizontalHeaderLabels(['ISBN', '书名', '分类', '库存', '上架状态'])
         self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # 自动拉伸
         self.tableView.setEditTriggers(QTableView.NoEditTriggers)  # 禁用直接编辑
 
-        # 启动子线程加载数据
-        self.worker = Worker(parent=self)
-        self.worker.result_ready.connect(self.update_table)  # 连接信号和槽
-        self.worker.start()  # 启动线程
-
         # 将布局添加到主布局
         vBoxLayout.addLayout(hBoxLayout1)
         vBoxLayout.addLayout(hBoxLayout2)
 
+        # 数据来自各界面共享的图书目录，只加载一次；任何界面改了图书都在内存中刷新
+        catalog.reset.connect(self.on_catalog_reset)
+        catalog.page_loaded.connect(self.on_catalog_page)
+        catalog.loaded.connect(self.on_catalog_loaded)
+        catalog.book_changed.connect(self.on_book_changed)
+        if catalog.ready:
+            self.update_table([], catalog.books("stock"))
+        else:
+            catalog.load()
+
+    def on_catalog_reset(self, columns, books):
+        """目录重新加载的第一页（有搜索关键字时等加载完再过滤）"""
+        if not self.search_edit.text():
+            self.update_table(columns, books)
+
+    def on_catalog_page(self, columns, books):
+        if not self.search_edit.text():
+            self.append_table(columns, books)
+
+    def on_catalog_loaded(self):
+        """加载完成后按库存重新排序"""
+        self.search_books(self.search_edit.text())
+
+    def on_book_changed(self, isbn, book):
+        """有图书被修改：只刷新这一行，保持滚动位置和选中行"""
+        if book is None or not book_matches(book, self.search_edit.text()):
+            self.model.remove_book(isbn)
+        else:
+            self.model.update_book(book)
+
     def show_context_menu(self, pos):
         """显示右键菜单，下架图书不弹出菜单"""
         row = self.tableView.rowAt(pos.y())
@@ -114,35 +111,32 @@ class BorrowInterface(QWidget):
             return
 
         # 获取当前行的图书数据
-        item = self.tableView.item(row, 0)  # 假设第一列是 ISBN
-        if not item:
-            return
-
-        # 获取图书的上架状态
-        shelves_item = self.tableView.item(row, 4)
-        if not shelves_item:
+        book = self.model.book(row)
+        if not book:
             return
 
-        shelves = shelves_item.text()  # 上架状态（0: 下架, 1: 上架）
-
         # 如果图书是下架状态，不弹出菜单
-        if shelves == "下架":
+        if not self.model.is_active(book):
             return
 
         # 创建菜单
         menu = RoundMenu()
-        menu.addAction(Action(FluentIcon.RIGHT_ARROW, '借书', triggered=lambda: self.borrow_book(row)))
+        rows = self.selected_rows()
+        if len(rows) > 1 and row in rows:
+            menu.addAction(Action(FluentIcon.SHOPPING_CART, f'加入借书车（{len(rows)}本）',
+                                  triggered=lambda: self.add_to_cart(rows)))
+        else:
+            menu.addAction(Action(FluentIcon.RIGHT_ARROW, '借书', triggered=lambda: self.borrow_book(row)))
+            menu.addAction(Action(FluentIcon.SHOPPING_CART, '加入借书车', triggered=lambda: self.add_to_cart([row])))
         # menu.addAction(Action(FluentIcon.BROOM, '从数据库删除', triggered=lambda: self.delete_book(row)))
 
         # 显示菜单
         menu.exec_(self.tableView.viewport().mapToGlobal(pos))
 
     def borrow_book(self, row):
-        isbn = self.tableView.item(row, 0).text()
-        # print(isbn)
-        columns, books = BookManager().select_book_by_column("isbn", isbn)
-        print(books)
-        print(books[0]['isbn'])
+        isbn = self.model.book(row)['isbn']
+        # 库存以内存目录为准（借书、还书后由 book_index 同步），不必在界面线程里查询数据库
+        books = [catalog.book(isbn) or self.model.book(row)]
         if books[0]['stock'] == 0:
             w = InfoBar.warning(
                 title='库存不足',
@@ -159,6 +153,84 @@ class BorrowInterface(QWidget):
             self.borrow_book_window.show_success_borrow_InfoBar.connect(self.show_success_InfoBar)
             self.borrow_book_window.show()
 
+    def selected_rows(self):
+        """当前选中的行号（升序去重）"""
+        return sorted({index.row() for index in self.tableView.selectionModel().selectedRows()})
+
+    def add_to_cart(self, rows):
+        """把选中的图书加入借书车（已下架、没有库存或已在车中的跳过）"""
+        in_cart = {book['isbn'] for book in self.cart}
+        added = 0
+        for row in rows:
+            book = self.model.book(row)
+            if book is None or book['isbn'] in in_cart:
+                continue
+            book = catalog.book(book['isbn']) or book
+            if not self.model.is_active(book) or book['stock'] < 1:
+                continue
+            self.cart.append(book)
+            in_cart.add(book['isbn'])
+            added += 1
+        self.cart_btn.setText(f"借书车 ({len(self.cart)})")
+        InfoBar.success(
+            title='已加入借书车',
+            content=f"加入 {added} 本，借书车中共 {len(self.cart)} 本",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self
+        ).show()
+
+    def show_cart(self):
+        if not self.cart:
+            InfoBar.warning(
+                title='借书车为空',
+                content="在表格中右键图书加入借书车",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=2000,
+                parent=self
+            ).show()
+            return
+        self.cart_window = Borrow_Cart(self.cart)
+        self.cart_window.cart_changed.connect(lambda: self.cart_btn.setText(f"借书车 ({len(self.cart)})"))
+        self.cart_window.borrowed.connect(self.on_cart_borrowed)
+        self.cart_window.show()
+
+    def on_cart_borrowed(self, student_id, results):
+        """借书车借书完成：借到的书移出借书车，没借到的留在车中"""
+        borrowed = {result['isbn'] for result in results if result['ok']}
+        self.cart[:] = [book for book in self.cart if book['isbn'] not in borrowed]
+        self.cart_btn.setText(f"借书车 ({len(self.cart)})")
+        records = [result['record'] for result in results if result['record']]
+        if records:
+            # 库存变化由图书目录通知各界面，新借阅记录交给还书界面局部刷新
+            catalog.records_changed.emit(records)
+        failed = [result for result in results if not result['ok']]
+        if failed:
+            InfoBar.warning(
+                title='部分图书借书失败',
+                content=f"学生:{student_id}借到 {len(borrowed)} 本，失败 {len(failed)} 本："
+                        + "；".join(f"{result['isbn']} {result['reason']}" for result in failed),
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=5000,
+                parent=self
+            ).show()
+        else:
+            InfoBar.success(
+                title='借书成功',
+                content=f"学生:{student_id}借书 {len(borrowed)} 本成功！",
+                orient=Qt.Horizontal,
+                isClosable=True,
+                position=InfoBarPosition.TOP,
+                duration=2000,
+                parent=self
+            ).show()
+
     def show_success_InfoBar(self, b, infos):
         if b:
             w = InfoBar.success(
@@ -172,101 +244,45 @@ class BorrowInterface(QWidget):
                 parent=self
             )
             w.show()
-            self.search_books("")
             # print("diaoyongsousuo")
             # self.worker = Worker(parent=self)
             # self.worker.result_ready.connect(self.update_table)  # 连接信号和槽
             # self.worker.start()
 
     def search_books(self, keyword):
-        """根据关键字搜索书籍"""
+        """立即按关键字搜索书籍（后台执行，结果到达后更新表格）"""
+        self.search_controller.search_now(keyword)
+
+    def query_books(self, keyword):
+        """根据关键字查询书籍，在搜索线程中执行（目录加载完成后只查内存）"""
         if not keyword:
-            # 如果关键字为空，加载所有书籍
-            columns, books = BookManager().select_all_book()
-            sorted_results = sorted(books, key=lambda x: x['stock'], reverse=True)
-            sorted_books = sorted(sorted_results, key=lambda book: book.get('shelves', 1), reverse=True)
-            # print("降序：")
-            # print(sorted_results)
-            self.search_result_ready.emit(columns, sorted_books)
-        else:
-            # 如果关键字不为空，分别查询 title 和 isbn
-            columns_title, results_title = BookManager().select_book_by_column("title", keyword)
-            columns_isbn, results_isbn = BookManager().select_book_by_column("isbn", keyword)
-            # 确保列名一致
-            if columns_title != columns_isbn:
-                raise ValueError("列名不一致，无法合并结果")
-            # 将 results_title 转换为列表（如果它是元组）
-            if isinstance(results_title, tuple):
-                results_title = list(results_title)
-            # 将 results_isbn 转换为列表（如果它是元组）
-            if isinstance(results_isbn, tuple):
-                results_isbn = list(results_isbn)
-            # 合并结果并去重
-            combined_results = results_title + results_isbn
-            unique_results = []
-            seen = set()
-            for book in combined_results:
-                if book['isbn'] not in seen:
-                    seen.add(book['isbn'])
-                    unique_results.append(book)
-
-            sorted_results = sorted(unique_results, key=lambda x: x['stock'], reverse=True)
-            # print("降序：")
-            # print(sorted_results)
-            # 发射信号，传递合并后的结果
-            self.search_result_ready.emit(columns_title, sorted_results)
+            # 如果关键字为空，显示所有书籍：上架在前，库存多的在前（目录还没加载完时查询数据库）
+            return [], catalog.books("stock")
+        # 如果关键字不为空，一次查询同时匹配 title 和 isbn（已去重）
+        results = catalog.search(keyword)
+        sorted_results = sorted(results, key=lambda x: x['stock'], reverse=True)
+        return [], sorted_results
+
+    def show_search_error(self, keyword, error):
+        """搜索失败：清空表格（不再显示上一个关键字的结果）并提示"""
+        self.update_table([], [])
+        InfoBar.error(
+            title='搜索失败',
+            content=f"搜索“{keyword}”失败：{error}",
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=3000,
+            parent=self
+        ).show()
 
     def update_table(self, columns, books):
-        """更新表格数据"""
-        print("Books data:", books)
-        self.tableView.setRowCount(len(books))  # 设置行数
-        for row, book in enumerate(books):
-            # 确保 book 是字典
-            if isinstance(book, dict):
-                # 获取库存值（确保是整数类型）
-                try:
-                    stock = int(book.get('stock', 0))
-                except (ValueError, TypeError):
-                    stock = 0  # 异常时默认设为0
-
-                # 获取上架状态（确保是整数类型）
-                try:
-                    shelves = int(book.get('shelves', 1))  # 默认上架
-                except (ValueError, TypeError):
-                    shelves = 1  # 异常时默认上架
-
-                # 根据库存设置颜色（仅对上架图书生效）
-                if shelves == 1:  # 上架图书
-                    if stock < 5:
-                        color = QColor(255, 200, 200)  # 淡红色
-                    elif stock < 10:
-                        color = QColor(255, 255, 200)  # 淡黄色
-                    else:
-                        color = QColor(200, 255, 200)  # 淡绿色
-                else:  # 下架图书
-                    color = None  # 不填充背景颜色
-
-                # 创建并设置单元格
-                for col in range(5):  # 假设共4列（0-3）
-                    if col == 0:
-                        text = book['isbn']
-                    elif col == 1:
-                        text = book['title']
-                    elif col == 2:
-                        text = book['category']
-                    elif col == 3:
-                        text = str(stock)
-                    elif col == 4:
-                        text = "上架" if book['shelves'] == 1 else "下架"
-
-                    item = QTableWidgetItem(text)
-                    if shelves == 0:  # 下架图书
-                        item.setForeground(QColor(128, 128, 128))  # 字体设置为灰色
-                    if color:  # 上架图书
-                        item.setBackground(color)
-                    self.tableView.setItem(row, col, item)
-            else:
-                print(f"Error: book at row {row} is not a dictionary: {book}")
+        """更新表格数据（一次模型重置）"""
+        self.model.set_books(books)
+
+    def append_table(self, columns, books):
+        """把一页图书追加到表格末尾"""
+        self.model.append_books(books)
 
 
 class Borrow_Book(QWidget):
@@ -349,34 +365,130 @@ class Borrow_Book(QWidget):
 
         if mess.exec():
             print('确认')
-            self.borrow_book(student_id=student_id, isbn=isbn, borrow_date=borrow_date, due_date=due_date)
-            print("写入数据库成功")
-            self.show_success_borrow_InfoBar.emit(True, [student_id, isbn])
-            self.close()
+            record = self.borrow_book(student_id=student_id, isbn=isbn, borrow_date=borrow_date, due_date=due_date)
+            if record:
+                print("写入数据库成功")
+                self.show_success_borrow_InfoBar.emit(True, [student_id, isbn])
+                # 库存变化由图书目录通知各界面，新借阅记录交给还书界面局部刷新
+                catalog.records_changed.emit([record])
+                self.close()
+            else:
+                # 打开窗口后被其他借书台借完或下架
+                InfoBar.warning(
+                    title='借书失败',
+                    content="库存不足、图书已下架或学号无效",
+                    orient=Qt.Horizontal,
+                    isClosable=True,
+                    position=InfoBarPosition.TOP,
+                    duration=2000,
+                    parent=self
+                )
         else:
             print('取消借书')
 
     def borrow_book(self, student_id: str, isbn: str, borrow_date: str, due_date: str):
-        try:
-            with DBConnector(db_config) as conn:
-                cursor = conn.cursor()
-                # 减少库存
-                cursor.execute(
-                    "UPDATE books SET stock = stock - 1 WHERE isbn = %s",
-                    (isbn,))
-
-                cursor.execute(
-                    """INSERT INTO borrow_records 
-                    (student_id, isbn, borrow_date, due_date)
-                    VALUES (%s, %s, %s, %s)""",
-                    (student_id, isbn, borrow_date, due_date)
-                )
+        """
+        :return: 新增的借阅记录（包含书名），库存不足、已下架或失败返回None
+        """
+        return BorrowManager().checkout(student_id, isbn, due_date, borrow_date)
+
+
+class Borrow_Cart(QWidget):
+    """借书车：同一个学生的多本书一次提交，整批在一个事务中完成，逐本返回结果"""
+    cart_changed = pyqtSignal()
+    borrowed = pyqtSignal(str, list)  # 学号, 每本书的借书结果
 
-                conn.commit()
-                print(f"学生 {student_id} 借阅 {isbn} 成功！")
+    def __init__(self, cart: list, parent=None):
+        super(Borrow_Cart, self).__init__(parent)
+        self.cart = cart  # 与借书界面共用同一个列表
+        self.init_UI()
+
+    def init_UI(self):
+        vboxLayout = QVBoxLayout(self)
+        # 学号
+        hBoxLayout1 = QHBoxLayout()
+        label1 = BodyLabel("学号:")
+        self.le_student_id = LineEdit()
+        hBoxLayout1.addWidget(label1)
+        hBoxLayout1.addWidget(self.le_student_id)
+        # 借书车中的图书
+        self.list_books = ListWidget()
+        self.list_books.setSelectionMode(QTableView.ExtendedSelection)
+        self.refresh_list()
+        # 还书日期
+        hBoxLayout2 = QHBoxLayout()
+        label2 = BodyLabel("还书日期(默认30天后):")
+        self.date_picker = FastCalendarPicker()
+        self.date_picker.setDate(QDate.currentDate().addDays(30))  # 默认30天后
+        hBoxLayout2.addWidget(label2)
+        hBoxLayout2.addWidget(self.date_picker)
+        # 确认取消按钮
+        hBoxLayout3 = QHBoxLayout()
+        self.ppbtn_confirm = PrimaryPushButton("确认借书")
+        self.ppbtn_confirm.clicked.connect(self.ppbtn_confirm_do)
+        self.pbtn_remove = PushButton("移出借书车")
+        self.pbtn_remove.clicked.connect(self.remove_selected)
+        self.pbtn_cancel = PushButton("取消")
+        self.pbtn_cancel.clicked.connect(self.close)
+        hBoxLayout3.addWidget(self.ppbtn_confirm)
+        hBoxLayout3.addWidget(self.pbtn_remove)
+        hBoxLayout3.addWidget(self.pbtn_cancel)
+        # 添加布局
+        vboxLayout.addLayout(hBoxLayout1)
+        vboxLayout.addWidget(self.list_books)
+        vboxLayout.addLayout(hBoxLayout2)
+        vboxLayout.addLayout(hBoxLayout3)
+        # 窗口设置
+        self.resize(500, 400)
+        self.setWindowTitle("借书车")
+
+    def refresh_list(self):
+        self.list_books.clear()
+        self.list_books.addItems([f"{book['isbn']}  {book['title']}" for book in self.cart])
+
+    def remove_selected(self):
+        rows = {self.list_books.row(item) for item in self.list_books.selectedItems()}
+        self.cart[:] = [book for i, book in enumerate(self.cart) if i not in rows]
+        self.refresh_list()
+        self.cart_changed.emit()
+
+    def ppbtn_confirm_do(self):
+        student_id = self.le_student_id.text().strip()
+        if not student_id or not self.cart:
+            return
+        borrow_date = QDate.currentDate().toString("yyyy-MM-dd")
+        due_date = self.date_picker.getDate().toString("yyyy-MM-dd")
+        titles = "\n".join(book['title'] for book in self.cart)
+        mess = Dialog("借书确认", f"确认学生：{student_id}\n借阅图书 {len(self.cart)} 本:\n{titles}\n还书日期:{due_date}")
+        mess.yesButton.setText("确认")
+        mess.cancelButton.setText("取消")
+
+        if mess.exec():
+            # 整批借书在后台执行，完成后再通知借书界面刷新
+            isbns = [book['isbn'] for book in self.cart]
+            self.ppbtn_confirm.setEnabled(False)
+            self.task = executor.submit(BorrowManager().borrow_books, student_id, isbns, due_date, borrow_date,
+                                        priority=PRIORITY_VISIBLE)
+            self.task.result_ready.connect(lambda results: self.on_borrowed(student_id, results))
+            self.task.failed.connect(self.on_borrow_failed)
+        else:
+            print('取消借书')
 
-        except Exception as e:
-            print(f"借书失败: {e}")
+    def on_borrowed(self, student_id, results):
+        self.borrowed.emit(student_id, results)
+        self.close()
+
+    def on_borrow_failed(self, error):
+        self.ppbtn_confirm.setEnabled(True)
+        InfoBar.error(
+            title='借书失败',
+            content=error,
+            orient=Qt.Horizontal,
+            isClosable=True,
+            position=InfoBarPosition.TOP,
+            duration=2000,
+            parent=self
+        ).show()
 
 # if __name__ == '__main__':
 #     app = QApplication(sys.argv)
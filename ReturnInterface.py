@@ -1,47 +1,35 @@
-from datetime import datetime
-
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QDate
-from PyQt5.QtGui import QColor
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem, QHeaderView, QTableView, \
+from PyQt5.QtCore import pyqtSignal, Qt, QDate
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QTableView, \
     QGridLayout
 from qfluentwidgets import (
-    TableWidget, LineEdit, PrimaryToolButton, FluentIcon, BodyLabel,
-    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu, PrimaryPushButton, FastCalendarPicker
+    TableView, LineEdit, PrimaryToolButton, FluentIcon, BodyLabel,
+    PushButton, InfoBar, InfoBarPosition, Dialog, Action, RoundMenu, PrimaryPushButton, FastCalendarPicker,
+    ListWidget
 )
 
 from borrow import BorrowManager
-
-
-class ReturnWorker(QThread):
-    result_ready = pyqtSignal(list, list)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.borrow_manager = BorrowManager()
-
-    def run(self):
-        try:
-            columns, records = self.borrow_manager.get_all_borrow_records()
-            self.result_ready.emit(columns, records)
-        except Exception as e:
-            print(f"Worker error: {e}")
+from catalog_store import catalog
+from search_index import BorrowRecordIndex
+from table_models import BorrowRecordTableModel
+from task_executor import executor, PRIORITY_VISIBLE
 
 
 class ReturnInterface(QWidget):
-    search_result_ready = pyqtSignal(list, list)
-
     def __init__(self, text: str, parent=None):
         super().__init__(parent)
         self.borrow_manager = BorrowManager()
+        self.loader = None  # 正在进行的加载任务
+        self.loaded_batches = 0
+        self.cart = {}  # 还书车：记录ID -> 借阅记录
         self.init_ui()
-        self.search_result_ready.connect(self.update_table)
         self.setObjectName(text.replace(' ', '-'))
 
     def init_ui(self):
         self.setObjectName("ReturnInterface")
         vbox_layout = QVBoxLayout(self)
 
-        # 搜索栏
+        # 已加载记录的内存索引：输入时只在本地过滤，刷新或还书/续借后才重新查询数据库
+        self.record_index = BorrowRecordIndex()
         search_layout = QHBoxLayout()
         self.search_edit = LineEdit()
         self.search_edit.setPlaceholderText("搜索学号/ISBN/书名")
@@ -51,104 +39,92 @@ class ReturnInterface(QWidget):
         search_btn.clicked.connect(lambda: self.search_records(self.search_edit.text()))
         refresh_btn = PrimaryToolButton(FluentIcon.SYNC)
         refresh_btn.clicked.connect(self.load_data)
+        # 还书车：多本书一次归还，一个事务完成
+        self.cart_btn = PushButton(FluentIcon.SHOPPING_CART, "还书车 (0)")
+        self.cart_btn.clicked.connect(self.show_cart)
 
         search_layout.addWidget(self.search_edit)
         search_layout.addWidget(search_btn)
         search_layout.addWidget(refresh_btn)
+        search_layout.addWidget(self.cart_btn)
 
         # 表格
-        self.table = TableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(['记录ID', '学号', '书名', 'ISBN', '借书日期', '应还日期'])
+        self.table = TableView()
+        # 虚拟模型：逾期状态和日期文字每行只算一次，只渲染可见行
+        self.model = BorrowRecordTableModel(self.table)
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setEditTriggers(QTableView.NoEditTriggers)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setSelectionMode(QTableView.ExtendedSelection)
 
         vbox_layout.addLayout(search_layout)
         vbox_layout.addWidget(self.table)
 
-        # 初始加载数据
+        # 初始加载数据；之后借书/还书/续借只局部刷新对应的行
         self.load_data()
+        catalog.records_changed.connect(self.patch_records)
+
+    def load_data(self, batch_size=500):
+        """服务器端游标流式读取，第一批到达就先显示；重复刷新时取消上一次还没完成的加载"""
+        if self.loader is not None:
+            self.loader.cancel()
+        self.loaded_batches = 0
+        loader = executor.stream(self.borrow_manager.iter_all_borrow_records, batch_size,
+                                 priority=PRIORITY_VISIBLE)
+        loader.item_ready.connect(lambda batch: self.on_batch_loaded(loader, batch))
+        loader.done.connect(lambda: self.on_load_done(loader))
+        self.loader = loader
+
+    def on_batch_loaded(self, loader, batch):
+        if loader is not self.loader:
+            return  # 已取消的加载在取消前发出的批次
+        columns, records = batch
+        if self.loaded_batches == 0:
+            self.update_table(columns, records)
+        else:
+            self.append_table(columns, records)
+        self.loaded_batches += 1
 
-    def load_data(self):
-        self.worker = ReturnWorker()
-        self.worker.result_ready.connect(self.update_table)
-        self.worker.start()
+    def on_load_done(self, loader):
+        if loader is not self.loader:
+            return
+        self.loader = None
+        if self.loaded_batches == 0 and not loader.cancelled:
+            self.update_table([], [])  # 没有任何记录
 
     def update_table(self, columns, records):
-        """更新表格数据并设置行颜色"""
-        self.records = records
-        self.table.setRowCount(len(records))
-        current_date = datetime.today().date()  # 统一使用date类型
-
-        for row, record in enumerate(records):
-            row_color = None
-            due_date = record['due_date'].date()  # 转换datetime到date
-            delta_days = None  # 初始化 delta_days
-
-            if record['returned_date'] is not None:
-                # 已归还的记录不设置背景色
-                pass
+        """数据库重新加载的第一批记录：重建索引，按当前关键字显示"""
+        self.record_index.build(records)
+        self.search_records(self.search_edit.text())
+
+    def append_table(self, columns, records):
+        """后续批次：加入索引，满足当前关键字的追加到表格末尾"""
+        records = self.record_index.add(records)  # 加载过程中已局部刷新的记录不重复追加
+        keyword = self.search_edit.text()
+        self.model.append_records([record for record in records if self.record_index.matches(record, keyword)])
+
+    def patch_records(self, records):
+        """用写操作返回的记录更新索引和表格中对应的行，不重新查询数据库"""
+        keyword = self.search_edit.text()
+        for record in records:
+            self.record_index.put(record)
+            if self.record_index.matches(record, keyword):
+                self.model.update_record(record)
             else:
-                delta_days = (due_date - current_date).days
-
-                if delta_days < 0:
-                    row_color = QColor(255, 200, 200)  # 逾期
-                elif 0 <= delta_days <= 3:
-                    row_color = QColor(255, 255, 200)  # 即将到期
-                else:
-                    row_color = QColor(200, 255, 200)  # 归还时限大于3天，设置绿色
-
-            # 创建表格项并设置颜色
-            for col in range(6):  # 共6列数据
-                # 生成单元格文本
-                if col == 0:
-                    text = str(record['id'])
-                elif col == 1:
-                    text = str(record['student_id'])
-                elif col == 2:
-                    text = record['title']
-                elif col == 3:
-                    text = record['isbn']
-                elif col == 4:
-                    text = record['borrow_date'].strftime("%Y-%m-%d")
-                elif col == 5:
-                    text = record['due_date'].strftime("%Y-%m-%d")
-                else:
-                    text = ""
-
-                item = QTableWidgetItem(text)
-
-                if record['returned_date'] is not None:
-                    # 已归还的记录设置字体为灰色
-                    item.setForeground(QColor(128, 128, 128))
-                    # 设置不可选择状态
-                    item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-
-                # 设置整行背景色
-                if row_color:
-                    item.setBackground(row_color)
-
-                # 特殊格式：逾期记录加粗
-                if delta_days is not None and delta_days < 0 and not record['returned_date']:
-                    font = item.font()
-                    font.setBold(True)
-                    item.setFont(font)
-
-                self.table.setItem(row, col, item)
+                self.model.remove_record(record['id'])
 
     def show_context_menu(self, pos):
         # 获取点击位置的行号
         row = self.table.rowAt(pos.y())
 
         # 有效性校验
-        if not (0 <= row < self.table.rowCount()):  # 行号越界保护
+        record = self.model.record(row)
+        if record is None:  # 行号越界保护
             return
 
-        # 获取对应数据记录
-        record = self.records[row]
-
         # 核心逻辑：已归还记录不弹出菜单
         if record.get('returned_date'):  # 使用get方法避免KeyError
             return  # 直接退出，不显示菜单
@@ -163,6 +139,12 @@ class ReturnInterface(QWidget):
         menu.addAction(return_action)
         renew_action = Action(FluentIcon.UPDATE, "续借图书", triggered=lambda: self.handle_renew_book(row))
         menu.addAction(renew_action)
+        rows = self.selected_rows()
+        if len(rows) > 1 and row in rows:
+            menu.addAction(Action(FluentIcon.SHOPPING_CART, f"加入还书车（{len(rows)}本）",
+                                  triggered=lambda: self.add_to_cart(rows)))
+        else:
+            menu.addAction(Action(FluentIcon.SHOPPING_CART, "加入还书车", triggered=lambda: self.add_to_cart([row])))
 
         # 显示菜单
         menu.exec_(self.table.viewport().mapToGlobal(pos))
@@ -178,11 +160,12 @@ class ReturnInterface(QWidget):
             )
             return
         # 获取选中行的记录信息
-        record_id = int(self.table.item(row, 0).text())
-        student_id = self.table.item(row, 1).text()
-        isbn = self.table.item(row, 3).text()
-        title = self.table.item(row, 2).text()
-        due_date = self.table.item(row, 5).text()
+        record = self.model.record(row)
+        record_id = int(record['id'])
+        student_id = str(record['student_id'])
+        isbn = record['isbn']
+        title = record['title']
+        due_date = self.model.text(row, 5)
 
         renew_info = {
             "record_id": record_id,
@@ -194,14 +177,9 @@ class ReturnInterface(QWidget):
 
         self.renew_window = Renew_window(renew_info)
         # self.renew_window.destroyed.connect(self.load_data)
-        self.renew_window.updata_table.connect(self.load_data)
+        self.renew_window.updata_table.connect(lambda record: self.patch_records([record]))
         self.renew_window.show()
 
-    # TODO
-    # self.worker = ReturnWorker()
-    # self.worker.result_ready.connect(self.update_table)
-    # self.worker.start()
-
     def handle_return_book(self, row):
         # 获取当前选中的行
 
@@ -215,41 +193,76 @@ class ReturnInterface(QWidget):
             )
             return
         # 获取选中行的记录信息
-        record_id = int(self.table.item(row, 0).text())
-        student_id = self.table.item(row, 1).text()
-        isbn = self.table.item(row, 3).text()
-        title = self.table.item(row, 2).text()
+        record = self.model.record(row)
+        student_id = str(record['student_id'])
+        isbn = record['isbn']
+        title = record['title']
         # 弹出确认对话框
         dialog = Dialog("确认归还", f"确认归还《{title}》\nISBN: {isbn}\n学号: {student_id} 吗？", self)
         dialog.yesButton.setText("确认")
         dialog.cancelButton.setText("取消")
         if dialog.exec():
-            try:
-                # 调用归还方法，传入 ISBN 和 student_id
-                self.borrow_manager.return_book_w(isbn, student_id)
+            # 调用归还方法，传入 ISBN 和 student_id，返回归还后的记录
+            record = self.borrow_manager.return_book_w(isbn, student_id)
+            if record:
                 self.show_info_bar("success", "归还成功", f"《{title}》已成功归还")
-                self.search_records(self.search_edit.text())  # 刷新表格
-            except Exception as e:
-                self.show_info_bar("error", "归还失败", str(e))
+                self.patch_records([record])  # 只刷新这一行
+            else:
+                self.show_info_bar("error", "归还失败", f"未找到《{title}》的有效借阅记录")
+
+    def selected_rows(self):
+        """当前选中的行号（升序去重）"""
+        return sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+
+    def add_to_cart(self, rows):
+        """把选中的未归还记录加入还书车"""
+        for row in rows:
+            record = self.model.record(row)
+            if record is not None and not record.get('returned_date'):
+                self.cart[record['id']] = record
+        self.update_cart_btn()
+        self.show_info_bar("success", "已加入还书车", f"还书车中共 {len(self.cart)} 本")
+
+    def update_cart_btn(self):
+        self.cart_btn.setText(f"还书车 ({len(self.cart)})")
+
+    def show_cart(self):
+        if not self.cart:
+            self.show_info_bar("warning", "还书车为空", "在表格中右键借阅记录加入还书车")
+            return
+        self.cart_window = Return_Cart(self.cart)
+        self.cart_window.cart_changed.connect(self.update_cart_btn)
+        self.cart_window.confirmed.connect(self.return_cart)
+        self.cart_window.show()
+
+    def return_cart(self):
+        """还书车中的记录一次归还（后台执行）；归还成功的移出还书车，失败的留在车中"""
+        records = list(self.cart.values())
+        # 指定记录ID：归还的就是车中的那一条，而不是该学生这本书最近的一条
+        items = [(record['isbn'], record['student_id'], record['id']) for record in records]
+        self.cart_btn.setEnabled(False)
+        self.return_task = executor.submit(self.borrow_manager.return_books, items, priority=PRIORITY_VISIBLE)
+        self.return_task.result_ready.connect(self.on_cart_returned)
+        self.return_task.failed.connect(lambda error: self.show_info_bar("error", "归还失败", error))
+        self.return_task.done.connect(lambda: self.cart_btn.setEnabled(True))
+
+    def on_cart_returned(self, results):
+        returned = [result['record'] for result in results if result['ok'] and result['record']]
+        for record in returned:
+            self.cart.pop(record['id'], None)
+        self.update_cart_btn()
+        self.patch_records(returned)  # 只刷新归还的行
+        failed = [result for result in results if not result['ok']]
+        if failed:
+            self.show_info_bar("warning", "部分图书归还失败",
+                               f"归还 {len(results) - len(failed)} 本，失败 {len(failed)} 本："
+                               + "；".join(f"{result['isbn']} {result['reason']}" for result in failed))
+        else:
+            self.show_info_bar("success", "归还成功", f"{len(results)} 本图书已成功归还")
 
     def search_records(self, keyword):
-        """根据关键字搜索记录并更新表格"""
-        columns, records = self.borrow_manager.get_all_borrow_records()
-
-        if keyword:
-            filtered = []
-            keyword = keyword.lower()
-            for record in records:
-                # 检查关键字是否匹配学生ID、ISBN或书名
-                if (keyword in str(record['student_id']).lower() or
-                        keyword in record['isbn'].lower() or
-                        keyword in record['title'].lower()):
-                    filtered.append(record)
-            records = filtered
-            self.records = records
-
-        # 调用更新表格函数
-        self.update_table(columns, records)
+        """在已加载的记录中按学号/ISBN/书名过滤，不查询数据库"""
+        self.model.set_records(self.record_index.search(keyword))
 
     def show_info_bar(self, type_, title, content):
         creator = getattr(InfoBar, type_)
@@ -265,7 +278,8 @@ class ReturnInterface(QWidget):
 
 
 class Renew_window(QWidget):
-    updata_table = pyqtSignal()
+    # 续借成功，参数为更新后的借阅记录
+    updata_table = pyqtSignal(dict)
 
     def __init__(self, renew_info: dict):
         super().__init__()
@@ -342,7 +356,8 @@ class Renew_window(QWidget):
             id, due_data = self.renew_info['record_id'], self.calendarpicker.getDate().toString("yyyy-MM-dd")
             # print(id)
             print(f'due_date:{due_data}')
-            if BorrowManager.renew_book_by_id(self, id, due_data):
+            record = BorrowManager().renew_book_by_id(id, due_data)
+            if record:
                 w = InfoBar.success(
                     title=' 续借成功',
                     content=f"图书{self.renew_info['isbn']}续借成功！",
@@ -354,7 +369,7 @@ class Renew_window(QWidget):
                     parent=self
                 )
                 w.show()
-                self.updata_table.emit()
+                self.updata_table.emit(record)
                 # self.search_books("")
 
             # mess.close()
@@ -369,3 +384,58 @@ class Renew_window(QWidget):
 #     window.resize(800, 600)
 #     window.show()
 #     sys.exit(app.exec())
+
+
+class Return_Cart(QWidget):
+    """还书车：列出待归还的记录，确认后由还书界面整批归还"""
+    cart_changed = pyqtSignal()
+    confirmed = pyqtSignal()
+
+    def __init__(self, cart: dict, parent=None):
+        super().__init__(parent)
+        self.cart = cart  # 与还书界面共用同一个字典
+        self.init_ui()
+
+    def init_ui(self):
+        vbox_layout = QVBoxLayout(self)
+        self.list_records = ListWidget()
+        self.list_records.setSelectionMode(QTableView.ExtendedSelection)
+        self.refresh_list()
+        # 确认取消按钮
+        hBoxLayout = QHBoxLayout()
+        self.ppbtn_confirm = PrimaryPushButton("确认还书")
+        self.ppbtn_confirm.clicked.connect(self.confirm)
+        self.pbtn_remove = PushButton("移出还书车")
+        self.pbtn_remove.clicked.connect(self.remove_selected)
+        self.pbtn_cancel = PushButton("取消")
+        self.pbtn_cancel.clicked.connect(self.close)
+        hBoxLayout.addWidget(self.ppbtn_confirm)
+        hBoxLayout.addWidget(self.pbtn_remove)
+        hBoxLayout.addWidget(self.pbtn_cancel)
+        vbox_layout.addWidget(self.list_records)
+        vbox_layout.addLayout(hBoxLayout)
+        # 窗口设置
+        self.resize(500, 400)
+        self.setWindowTitle("还书车")
+
+    def refresh_list(self):
+        self.list_records.clear()
+        self.record_ids = list(self.cart)
+        self.list_records.addItems([f"学号:{record['student_id']}  {record['isbn']}  {record['title']}"
+                                    for record in self.cart.values()])
+
+    def remove_selected(self):
+        for item in self.list_records.selectedItems():
+            self.cart.pop(self.record_ids[self.list_records.row(item)], None)
+        self.refresh_list()
+        self.cart_changed.emit()
+
+    def confirm(self):
+        if not self.cart:
+            return
+        dialog = Dialog("确认归还", f"确认归还还书车中的 {len(self.cart)} 本图书吗？", self)
+        dialog.yesButton.setText("确认")
+        dialog.cancelButton.setText("取消")
+        if dialog.exec():
+            self.confirmed.emit()
+            self.close()
@@ -1,56 +1,55 @@
-import math
 import sys
 
-from PyQt5.QtCore import Qt, QPropertyAnimation, pyqtProperty, QEasingCurve, QPointF, QTime, QTimer, QRectF
-from PyQt5.QtGui import QLinearGradient, QPainter, QColor, QFont, QRadialGradient, QBrush, QPainterPath
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QColor, QFont, QPainterPath
 # 导入主页面相关模块
-from PyQt5.QtWidgets import QApplication, QLabel, QGraphicsBlurEffect, QMessageBox
+from PyQt5.QtWidgets import QApplication, QLabel, QGraphicsBlurEffect
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLineEdit
 from qfluentwidgets import FluentIcon as FIF, Dialog
 from qfluentwidgets import FluentWindow
-from qfluentwidgets import InfoBar, InfoBarPosition, LineEdit, BodyLabel, PrimaryPushButton
+from qfluentwidgets import InfoBar, InfoBarPosition, LineEdit, BodyLabel, PrimaryPushButton, IndeterminateProgressBar
 
 from BookManagerInterface import BookManagerInterface
 from BorrowInterface import BorrowInterface
 from ReturnInterface import ReturnInterface
+from animated_background import GradientBackground
+from catalog_store import catalog
 from connector_pymysql import DBConnector, db_config
+from task_executor import executor, PRIORITY_VISIBLE
+
+# 登录验证超时（毫秒）
+LOGIN_TIMEOUT = 15000
 
 
 class Window(FluentWindow):
     """ 主界面 """
 
-    def __init__(self):
-
+    def __init__(self, prefetch=True):
+        """
+        :param prefetch: 第一个界面可用后是否在后台预加载其余界面
+        """
         super().__init__()
 
 
-        self.BookManagerInterface = BookManagerInterface('BookManagerInterface', self)
-        self.BorrowInterface = BorrowInterface('BorrowInterface', self)
-        self.ReturnInterface = ReturnInterface('ReturnInterface', self)
+        # 子界面第一次切换到时才创建并加载数据，首个界面可用后再在后台依次预加载其余界面
+        self.BookManagerInterface = LazyInterface(BookManagerInterface, 'BookManagerInterface', self)
+        self.BorrowInterface = LazyInterface(BorrowInterface, 'BorrowInterface', self)
+        self.ReturnInterface = LazyInterface(ReturnInterface, 'ReturnInterface', self)
+        self.prefetch = prefetch
 
         self.initNavigation()
         self.navigationInterface.setExpandWidth(160)
         self.navigationInterface.setCollapsible(False)
         self.resize(1450, 900)
 
-        self._animation_progress = 0.0  # 新增动画进度属性
         self.initAnimations()
 
         self.stackedWidget.setAttribute(Qt.WA_TranslucentBackground)
         # self.stackedWidget.setStyleSheet("background: transparent;")
 
     def initAnimations(self):
-        """ 初始化背景动画 """
-        self.anim_timer = QTimer(self)
-        self.anim_timer.timeout.connect(self.updateAnimation)
-        self.anim_timer.start(16)  # ~60fps
-        self.start_time = QTime.currentTime()
-
-    def updateAnimation(self):
-        """ 更新动画进度 """
-        elapsed = self.start_time.msecsTo(QTime.currentTime())
-        self._animation_progress = (elapsed % 15000) / 15000.0
-        self.update()
+        """ 初始化背景动画（缓存渲染，窗口不在前台时暂停） """
+        self.background = GradientBackground(self)
 
     def paintEvent(self, event):
         """ 重写绘制事件 """
@@ -59,50 +58,23 @@ class Window(FluentWindow):
 
         # 添加自定义渐变层
         painter = QPainter(self)
-        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
-        self.drawAnimatedGradients(painter)
+        self.background.paint(painter, self.rect())
         painter.end()
 
-    def drawAnimatedGradients(self, painter):
-        """ 绘制五个动态渐变层（移植自LoginPage） """
-        t = self._animation_progress
-        size = max(self.width(), self.height())
-        gradients = [
-            {"color": QColor(235, 105, 78), "phase": 0.0, "sizes": [1.3, 1.0, 0.8, 0.9]},
-            {"color": QColor(243, 11, 164), "phase": 0.25, "sizes": [0.8, 0.9, 1.1, 0.9]},
-            {"color": QColor(254, 234, 131), "phase": 0.5, "sizes": [0.9, 1.0, 0.8, 1.0]},
-            {"color": QColor(170, 142, 245), "phase": 0.75, "sizes": [1.1, 0.9, 0.6, 0.9]},
-            {"color": QColor(248, 192, 147), "phase": 1.0, "sizes": [0.9, 0.6, 0.8, 0.7]}
-        ]
-        for grad in gradients:
-            pos = self.calcGradientPosition(t + grad["phase"])
-            grad_size = self.calcGradientSize(t, grad["sizes"]) * size
-            self.drawGradient(painter, grad["color"], pos, grad_size)
-
-    # 以下方法可以直接从LoginPage移植（保持相同实现）
-    def calcGradientPosition(self, phase):
-        angle = phase * 2 * math.pi
-        x = math.cos(angle) * 0.4
-        y = math.sin(angle) * 0.4
-        return QPointF(
-            self.width() / 2 + x * self.width(),
-            self.height() / 2 + y * self.height()
-        )
-
-    def calcGradientSize(self, t, sizes):
-        phases = [0, 0.25, 0.5, 0.75, 1.0]
-        for i in range(len(phases) - 2):
-            if phases[i] <= t < phases[i + 1]:
-                return sizes[i] + (sizes[i + 1] - sizes[i]) * (t - phases[i]) * 4
-        return sizes[-1] + (sizes[0] - sizes[-1]) * (t - phases[-2]) * 4
-
-    def drawGradient(self, painter, color, center, size):
-        gradient = QRadialGradient(center, size)
-        gradient.setColorAt(0, color)
-        gradient.setColorAt(1, Qt.transparent)
-        painter.setBrush(QBrush(gradient))
-        painter.setPen(Qt.NoPen)
-        painter.drawRect(self.rect())
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.prefetch:
+            self.prefetch = False
+            # 等事件循环空闲（首个界面已经显示）后再预加载
+            QTimer.singleShot(0, self.prefetchInterfaces)
+
+    def prefetchInterfaces(self):
+        """ 每次事件循环空闲时创建一个还没创建的界面，避免一次性卡住界面 """
+        for interface in (self.BookManagerInterface, self.BorrowInterface, self.ReturnInterface):
+            if not interface.loaded:
+                interface.load()
+                QTimer.singleShot(200, self.prefetchInterfaces)
+                return
 
     def initNavigation(self):
         self.addSubInterface(self.BookManagerInterface, FIF.BOOK_SHELF, '图书管理')
@@ -111,6 +83,33 @@ class Window(FluentWindow):
         self.addSubInterface(self.ReturnInterface, FIF.CHECKBOX, '还书\续借管理')
 
 
+class LazyInterface(QWidget):
+    """ 子界面占位：第一次显示（或预加载）时才创建真正的界面，界面创建时才开始加载数据 """
+
+    def __init__(self, factory, name: str, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.name = name
+        self.interface = None
+        self.setObjectName(name)
+        self.vBoxLayout = QVBoxLayout(self)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def loaded(self):
+        return self.interface is not None
+
+    def load(self):
+        if self.interface is None:
+            self.interface = self.factory(self.name, self)
+            self.vBoxLayout.addWidget(self.interface)
+        return self.interface
+
+    def showEvent(self, event):
+        self.load()
+        super().showEvent(event)
+
+
 class BlurOverlay(QWidget):
     """ 模糊效果层 """
 
@@ -122,10 +121,23 @@ class BlurOverlay(QWidget):
         self.setGraphicsEffect(self.effect)
 
 
+def authenticate(username: str, password: str) -> bool:
+    """ 验证管理员账号（在后台任务中执行，数据库错误直接抛出） """
+    with DBConnector(db_config) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT * FROM admins WHERE username = %s AND password = %s",
+            (username, password))
+        return cursor.fetchone() is not None
+
+
 class LoginPage(QWidget):
     def __init__(self):
         super().__init__()
-        self._animation_progress = 0.0
+        self.login_task = None  # 正在进行的账号验证
+        self.login_timer = QTimer(self)
+        self.login_timer.setSingleShot(True)
+        self.login_timer.timeout.connect(self.on_login_timeout)
         self.initUI()
         self.initAnimations()
 
@@ -188,7 +200,7 @@ class LoginPage(QWidget):
             """)
         self.password.setEchoMode(QLineEdit.Password)
         # 按钮
-        login_btn = PrimaryPushButton("登录")
+        login_btn = self.login_btn = PrimaryPushButton("登录")
         # login_btn.setFont(QFont('Arial'))
         login_btn.setFixedHeight(45)
         login_btn.setStyleSheet("""
@@ -245,6 +257,10 @@ class LoginPage(QWidget):
         card_layout.addWidget(login_btn)
         card_layout.addWidget(register_btn)
         card_layout.addWidget(exit_btn)
+        # 登录进度条（验证账号时显示）
+        self.login_progress = IndeterminateProgressBar(self.card, start=False)
+        self.login_progress.hide()
+        card_layout.addWidget(self.login_progress)
 
     def quit_application(self):
         mess = Dialog("确认退出",
@@ -257,17 +273,8 @@ class LoginPage(QWidget):
         # QApplication.instance().quit()
 
     def initAnimations(self):
-        """ 初始化背景动画 """
-        self.anim_timer = QTimer(self)
-        self.anim_timer.timeout.connect(self.updateAnimation)
-        self.anim_timer.start(16)  # ~60fps
-        self.start_time = QTime.currentTime()
-
-    def updateAnimation(self):
-        """ 更新动画进度 """
-        elapsed = self.start_time.msecsTo(QTime.currentTime())
-        self._animation_progress = (elapsed % 15000) / 15000.0
-        self.update()
+        """ 初始化背景动画（缓存渲染，窗口不在前台时暂停） """
+        self.background = GradientBackground(self, base_color=QColor("#e493d0"))
 
     def paintEvent(self, event):
         """ 绘制窗口圆角和动态背景 """
@@ -281,9 +288,8 @@ class LoginPage(QWidget):
         # 应用剪切路径
         painter.setClipPath(path)
 
-        # 绘制背景内容
-        painter.fillRect(self.rect(), QColor("#e493d0"))
-        self.drawAnimatedGradients(painter)
+        # 绘制背景内容（底色和渐变都在缓存帧里）
+        self.background.paint(painter, self.rect())
 
         # 绘制边框
         painter.setPen(QColor(255, 255, 255, 50))
@@ -291,57 +297,8 @@ class LoginPage(QWidget):
 
         painter.end()
 
-    def drawAnimatedGradients(self, painter):
-        """ 绘制五个动态渐变层 """
-        t = self._animation_progress
-        size = max(self.width(), self.height())
-
-        gradients = [
-            {"color": QColor(235, 105, 78), "phase": 0.0, "sizes": [1.3, 1.0, 0.8, 0.9]},
-            {"color": QColor(243, 11, 164), "phase": 0.25, "sizes": [0.8, 0.9, 1.1, 0.9]},
-            {"color": QColor(254, 234, 131), "phase": 0.5, "sizes": [0.9, 1.0, 0.8, 1.0]},
-            {"color": QColor(170, 142, 245), "phase": 0.75, "sizes": [1.1, 0.9, 0.6, 0.9]},
-            {"color": QColor(248, 192, 147), "phase": 1.0, "sizes": [0.9, 0.6, 0.8, 0.7]}
-        ]
-        for grad in gradients:
-            pos = self.calcGradientPosition(t + grad["phase"])
-            grad_size = self.calcGradientSize(t, grad["sizes"]) * size
-            self.drawGradient(painter, grad["color"], pos, grad_size)
-
-    def calcGradientPosition(self, phase):
-        """ 计算渐变位置 """
-        angle = phase * 2 * math.pi
-        x = math.cos(angle) * 0.4
-        y = math.sin(angle) * 0.4
-        return QPointF(
-            self.width() / 2 + x * self.width(),
-            self.height() / 2 + y * self.height()
-        )
-
-    def calcGradientSize(self, t, sizes):
-        """ 修复后的渐变尺寸计算方法 """
-        phases = [0, 0.25, 0.5, 0.75, 1.0]
-
-        # 确保循环在安全范围内
-        for i in range(len(phases) - 2):  # 修改循环范围
-            if phases[i] <= t < phases[i + 1]:
-                return sizes[i] + (sizes[i + 1] - sizes[i]) * (t - phases[i]) * 4
-
-        # 处理最后一个区间（当t >= 0.75时）
-        return sizes[-1] + (sizes[0] - sizes[-1]) * (t - phases[-2]) * 4  # 循环到第一个尺寸
-
-    def drawGradient(self, painter, color, center, size):
-        """ 绘制单个渐变 """
-        gradient = QRadialGradient(center, size)
-        gradient.setColorAt(0, color)
-        gradient.setColorAt(1, Qt.transparent)
-
-        painter.setBrush(QBrush(gradient))
-        painter.setPen(Qt.NoPen)
-        painter.drawRect(self.rect())
-
     def on_login_clicked(self):
-        """ 登录按钮点击事件 """
+        """ 登录按钮点击事件：后台验证账号，同时预加载图书目录 """
         username = self.username.text()
         password = self.password.text()
         if not username or not password:
@@ -352,42 +309,77 @@ class LoginPage(QWidget):
                 position=InfoBarPosition.TOP,
                 duration=2000
             )
+            return
+        if self.login_task is not None:
+            return  # 正在验证
+
+        self.set_logging_in(True)
+        # 验证账号的同时就开始加载图书目录，主界面打开时数据已经在内存里
+        catalog.load()
+        self.login_task = executor.submit(authenticate, username, password, priority=PRIORITY_VISIBLE)
+        self.login_task.result_ready.connect(lambda ok: self.on_login_finished(ok, ""))
+        self.login_task.failed.connect(lambda error: self.on_login_finished(False, error))
+        self.login_timer.start(LOGIN_TIMEOUT)
+
+    def set_logging_in(self, logging_in: bool):
+        """ 切换登录中状态：禁用按钮并显示进度条 """
+        self.login_btn.setEnabled(not logging_in)
+        self.login_btn.setText("登录中..." if logging_in else "登录")
+        self.username.setEnabled(not logging_in)
+        self.password.setEnabled(not logging_in)
+        self.login_progress.setVisible(logging_in)
+        if logging_in:
+            self.login_progress.start()
         else:
-            try:
-                with DBConnector(db_config) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "SELECT * FROM admins WHERE username = %s AND password = %s",
-                        (username, password))
-                    if cursor.fetchone():
-                        InfoBar.success(
-                            title="登录成功",
-                            content=f"欢迎回来，{username}！",
-                            parent=self,
-                            position=InfoBarPosition.TOP,
-                            duration=2000
-                        )
-                        self.close()  # 关闭登录页面
-                        self.show_main_window()  # 打开主页面
-                    else:
-                        InfoBar.error(
-                            title="错误",
-                            content="用户名或密码错误",
-                            parent=self,
-                            position=InfoBarPosition.TOP,
-                            duration=2000
-                        )
-            except Exception as e:
-                InfoBar.error(
-                    title="错误",
-                    content=f"数据库错误：{e}",
-                    parent=self,
-                    position=InfoBarPosition.TOP,
-                    duration=2000
-                )
-            self.close()
-            self.main_window = Window()
+            self.login_progress.stop()
+
+    def on_login_timeout(self):
+        """ 验证超时：放弃这次登录（迟到的结果会被忽略） """
+        if self.login_task is None:
+            return
+        self.login_task.cancel()
+        self.login_task = None
+        self.set_logging_in(False)
+        InfoBar.error(
+            title="错误",
+            content="连接数据库超时，请稍后重试",
+            parent=self,
+            position=InfoBarPosition.TOP,
+            duration=2000
+        )
+
+    def on_login_finished(self, ok: bool, error: str):
+        self.login_timer.stop()
+        self.login_task = None
+        self.set_logging_in(False)
+        username = self.username.text()
+        if ok:
+            InfoBar.success(
+                title="登录成功",
+                content=f"欢迎回来，{username}！",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=2000
+            )
+            self.close()  # 关闭登录页面
+            self.main_window = Window()  # 打开主页面
             self.main_window.show()
+        elif error:
+            InfoBar.error(
+                title="错误",
+                content=f"数据库错误：{error}",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=2000
+            )
+        else:
+            InfoBar.error(
+                title="错误",
+                content="用户名或密码错误",
+                parent=self,
+                position=InfoBarPosition.TOP,
+                duration=2000
+            )
 
     def on_register_clicked(self):
         """ 注册按钮点击事件 """
@@ -418,6 +410,9 @@ if __name__ == "__main__":
         }
     """)
 
+    # 退出前停止后台任务，避免线程池线程在解释器退出时仍在访问数据库
+    app.aboutToQuit.connect(executor.shutdown)
+
     window = LoginPage()
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,27 +1,182 @@
 import math
 
-from PyQt5.QtCore import Qt, QTime, QTimer, QRectF
-from PyQt5.QtGui import QPainter, QColor, QPainterPath, QRadialGradient, QBrush
+from PyQt5 import sip
+from PyQt5.QtCore import Qt, QTime, QTimer, QRectF, QObject, QEvent, QElapsedTimer, QSize, QPointF
+from PyQt5.QtGui import QPainter, QColor, QPainterPath, QRadialGradient, QBrush, QPixmap
 from PyQt5.QtWidgets import QWidget
 
+# 背景动画设置
+background_config = {
+    "low_power": False,  # 省电模式：只画一帧静态背景，不再重绘
+    "fps": 30,  # 目标帧率
+    "min_fps": 8,  # 绘制太慢时自动降到的最低帧率
+    "scale": 0.25,  # 渐变先画在缩小的图片上再放大，模糊的渐变看不出差别
+}
 
-class AnimatedBackgroundWidget(QWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self._animation_progress = 0.0
+# 五个动态渐变层：颜色、相位、四个阶段的尺寸
+GRADIENTS = [
+    {"color": QColor(235, 105, 78), "phase": 0.0, "sizes": [1.3, 1.0, 0.8, 0.9]},
+    {"color": QColor(243, 11, 164), "phase": 0.25, "sizes": [0.8, 0.9, 1.1, 0.9]},
+    {"color": QColor(254, 234, 131), "phase": 0.5, "sizes": [0.9, 1.0, 0.8, 1.0]},
+    {"color": QColor(170, 142, 245), "phase": 0.75, "sizes": [1.1, 0.9, 0.6, 0.9]},
+    {"color": QColor(248, 192, 147), "phase": 1.0, "sizes": [0.9, 0.6, 0.8, 0.7]}
+]
+
+# 一个动画周期（毫秒）
+PERIOD = 15000
+
+
+def calc_gradient_size(t, sizes):
+    """ 动态计算渐变尺寸的插值方法 """
+    phases = [0, 0.25, 0.5, 0.75, 1.0]
+
+    # 处理前三个时间区间 (0-0.25, 0.25-0.5, 0.5-0.75)
+    for i in range(len(phases) - 2):  # 遍历0,1,2三个索引
+        if phases[i] <= t < phases[i + 1]:
+            # 线性插值公式：当前尺寸 + 尺寸差 * 时间比例
+            return sizes[i] + (sizes[i + 1] - sizes[i]) * (t - phases[i]) * 4
+
+    # 处理最后一个时间区间 (0.75-1.0)，实现循环效果
+    return sizes[-1] + (sizes[0] - sizes[-1]) * (t - phases[-2]) * 4  # phases[-2] = 0.75
+
+
+class GradientBackground(QObject):
+    """
+    动态渐变背景渲染器：每帧把渐变画到缩小的QPixmap缓存里，窗口重绘时只需放大贴图；
+    窗口最小化、隐藏或不在前台时暂停动画，绘制太慢时自动降低帧率，省电模式下只画一帧静态背景
+    用法：在 paintEvent 里调用 self.background.paint(painter, self.rect())
+    """
+
+    def __init__(self, widget: QWidget, base_color=None):
+        super().__init__(widget)
+        self.widget = widget
+        self.base_color = base_color
+        self.progress = 0.0
         self.start_time = QTime.currentTime()
-        self.init_animation()
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        self._cache = None  # 当前帧的缩小图
+        self._cache_key = None  # (尺寸, 进度)
+        self._interval = self._target_interval()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.tick)
+        widget.installEventFilter(self)
+        self._window = None
+        self._watch_window()
+
+    @staticmethod
+    def _target_interval():
+        return max(1, int(1000 / background_config["fps"]))
+
+    def set_low_power(self, enabled: bool):
+        """切换省电模式"""
+        background_config["low_power"] = enabled
+        self.update_timer()
+        self.widget.update()
+
+    def _watch_window(self):
+        window = self.widget.window()
+        if window is not self._window:
+            if self._window is not None:
+                self._window.removeEventFilter(self)
+            self._window = window
+            if window is not self.widget:
+                window.installEventFilter(self)
 
-    def init_animation(self):
-        self.anim_timer = QTimer(self)
-        self.anim_timer.timeout.connect(self.update_animation)
-        self.anim_timer.start(16)
+    def eventFilter(self, obj, event):
+        if sip.isdeleted(self.widget):  # 程序退出时窗口先于渲染器销毁
+            return False
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange,
+                            QEvent.ActivationChange, QEvent.ParentChange):
+            if event.type() == QEvent.ParentChange:
+                self._watch_window()
+            self.update_timer()
+        return False
 
-    def update_animation(self):
+    def _should_animate(self):
+        window = self.widget.window()
+        return (not background_config["low_power"] and self.widget.isVisible()
+                and not window.isMinimized() and window.isActiveWindow())
+
+    def update_timer(self):
+        """按窗口状态启停动画"""
+        if self._should_animate():
+            if not self.timer.isActive():
+                self.timer.start(self._interval)
+        else:
+            self.timer.stop()
+
+    def tick(self):
         elapsed = self.start_time.msecsTo(QTime.currentTime())
-        self._animation_progress = (elapsed % 15000) / 15000.0
-        self.update()
+        self.progress = (elapsed % PERIOD) / PERIOD
+        self.widget.update()
+
+    def paint(self, painter: QPainter, rect):
+        """把当前帧画到 rect（调用方负责圆角裁剪和边框）"""
+        if not self.timer.isActive() and not background_config["low_power"]:
+            # 第一次绘制或窗口刚回到前台
+            self.update_timer()
+        frame = self.frame(rect.size())
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawPixmap(QRectF(rect), frame, QRectF(frame.rect()))
+        painter.restore()
+
+    def frame(self, size: QSize):
+        """当前进度的缩小帧，进度和尺寸不变时直接返回缓存"""
+        progress = 0.0 if background_config["low_power"] else self.progress
+        key = (size.width(), size.height(), progress)
+        if self._cache is not None and self._cache_key == key:
+            return self._cache
+
+        clock = QElapsedTimer()
+        clock.start()
+        scale = background_config["scale"]
+        width = max(1, int(size.width() * scale))
+        height = max(1, int(size.height() * scale))
+        pixmap = QPixmap(width, height)
+        pixmap.fill(self.base_color if self.base_color is not None else Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        self.draw_gradients(painter, width, height, progress)
+        painter.end()
+        self._cache, self._cache_key = pixmap, key
+        self._adapt_interval(clock.elapsed())
+        return pixmap
+
+    def _adapt_interval(self, render_ms):
+        """绘制一帧超过帧间隔一半时降低帧率，绘制很快时逐步恢复目标帧率"""
+        target, slowest = self._target_interval(), int(1000 / background_config["min_fps"])
+        if render_ms * 2 > self._interval:
+            interval = min(slowest, int(self._interval * 1.5) + 1)
+        elif render_ms * 4 < self._interval:
+            interval = max(target, int(self._interval * 0.9))
+        else:
+            return
+        if interval != self._interval:
+            self._interval = interval
+            if self.timer.isActive():
+                self.timer.setInterval(interval)
+
+    @staticmethod
+    def draw_gradients(painter, width, height, t):
+        size = max(width, height)
+        painter.setPen(Qt.NoPen)
+        for grad in GRADIENTS:
+            angle = (t + grad["phase"]) * 2 * math.pi
+            center = QPointF(width / 2 + math.cos(angle) * 0.4 * width,
+                             height / 2 + math.sin(angle) * 0.4 * height)
+            gradient = QRadialGradient(center, calc_gradient_size(t, grad["sizes"]) * size)
+            gradient.setColorAt(0, grad["color"])
+            gradient.setColorAt(1, Qt.transparent)
+            painter.setBrush(QBrush(gradient))
+            painter.drawRect(0, 0, width, height)
+
+
+class AnimatedBackgroundWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.background = GradientBackground(self)
+        self.setAttribute(Qt.WA_TranslucentBackground)
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -32,46 +187,5 @@ class AnimatedBackgroundWidget(QWidget):
         path.addRoundedRect(QRectF(self.rect()), 15, 15)  # 将QRect转换为QRectF
 
         painter.setClipPath(path)
-        self.draw_animated_gradients(painter)
+        self.background.paint(painter, self.rect())
         painter.end()
-
-    def draw_animated_gradients(self, painter):
-        t = self._animation_progress
-        size = max(self.width(), self.height())
-        gradients = [
-            {"color": QColor(235, 105, 78), "phase": 0.0, "sizes": [1.3, 1.0, 0.8, 0.9]},
-            {"color": QColor(243, 11, 164), "phase": 0.25, "sizes": [0.8, 0.9, 1.1, 0.9]},
-            {"color": QColor(254, 234, 131), "phase": 0.5, "sizes": [0.9, 1.0, 0.8, 1.0]},
-            {"color": QColor(170, 142, 245), "phase": 0.75, "sizes": [1.1, 0.9, 0.6, 0.9]},
-            {"color": QColor(248, 192, 147), "phase": 1.0, "sizes": [0.9, 0.6, 0.8, 0.7]}
-        ]
-        for grad in gradients:
-            pos = self.calc_gradient_position(t + grad["phase"])
-            grad_size = self.calc_gradient_size(t, grad["sizes"]) * size
-            self.draw_gradient(painter, grad["color"], pos, grad_size)
-
-    def calc_gradient_position(self, phase):
-        angle = phase * 2 * math.pi
-        x = math.cos(angle) * 0.4
-        y = math.sin(angle) * 0.4
-        return (self.width() / 2 + x * self.width(), self.height() / 2 + y * self.height())
-
-    def calc_gradient_size(self, t, sizes):
-        """ 动态计算渐变尺寸的插值方法 """
-        phases = [0, 0.25, 0.5, 0.75, 1.0]
-
-        # 处理前三个时间区间 (0-0.25, 0.25-0.5, 0.5-0.75)
-        for i in range(len(phases) - 2):  # 遍历0,1,2三个索引
-            if phases[i] <= t < phases[i + 1]:
-                # 线性插值公式：当前尺寸 + 尺寸差 * 时间比例
-                return sizes[i] + (sizes[i + 1] - sizes[i]) * (t - phases[i]) * 4
-
-        # 处理最后一个时间区间 (0.75-1.0)，实现循环效果
-        return sizes[-1] + (sizes[0] - sizes[-1]) * (t - phases[-2]) * 4  # phases[-2] = 0.75
-
-    def draw_gradient(self, painter, color, center, size):
-        gradient = QRadialGradient(center[0], center[1], size)
-        gradient.setColorAt(0, color)
-        gradient.setColorAt(1, Qt.transparent)
-        painter.setBrush(QBrush(gradient))
-        painter.drawRect(self.rect())
\ No newline at end of file
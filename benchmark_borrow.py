@@ -0,0 +1,117 @@
+"""
+借书并发压测：多个借书台（线程）同时借同一本热门图书
+对比旧的“先查库存再扣减”写法和 BorrowManager.checkout 的条件扣减写法，输出吞吐量、借出数量和最终库存
+用法：python benchmark_borrow.py --desks 20 --borrows 50 --stock 200
+压测在当前 db_config 指向的数据库中临时新增一本图书，结束后删除它和产生的借阅记录
+"""
+import argparse
+import contextlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from borrow import BorrowManager
+from connector_pymysql import DBConnector, db_config
+
+BENCH_ISBN = "978-0-000-00000-0"
+
+
+def legacy_borrow(student_id, isbn, due_date):
+    """旧写法：SELECT库存、UPDATE、INSERT，检查和扣减之间没有加锁"""
+    try:
+        with DBConnector(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT stock FROM books WHERE isbn = %s", (isbn,))
+            stock = cursor.fetchone()
+            if not stock or stock['stock'] < 1:
+                return False
+            cursor.execute("UPDATE books SET stock = stock - 1 WHERE isbn = %s", (isbn,))
+            cursor.execute(
+                """INSERT INTO borrow_records (student_id, isbn, borrow_date, due_date)
+                VALUES (%s, %s, %s, %s)""",
+                (student_id, isbn, datetime.now(), due_date))
+            conn.commit()
+            return True
+    except Exception:
+        return False
+
+
+def conditional_borrow(student_id, isbn, due_date):
+    return BorrowManager().checkout(student_id, isbn, due_date, fetch_record=False) is not None
+
+
+def reset_book(stock):
+    with DBConnector(db_config) as conn:
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM borrow_records WHERE isbn = %s", (BENCH_ISBN,))
+        cursor.execute("DELETE FROM books WHERE isbn = %s", (BENCH_ISBN,))
+        if stock is not None:
+            cursor.execute(
+                "INSERT INTO books (isbn, title, category, stock, shelves) VALUES (%s, %s, %s, %s, 1)",
+                (BENCH_ISBN, "压测热门图书", "压测", stock))
+        conn.commit()
+
+
+def final_state():
+    with DBConnector(db_config) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT stock FROM books WHERE isbn = %s", (BENCH_ISBN,))
+        stock = cursor.fetchone()['stock']
+        cursor.execute("SELECT COUNT(*) AS n FROM borrow_records WHERE isbn = %s", (BENCH_ISBN,))
+        return stock, cursor.fetchone()['n']
+
+
+def run(name, borrow, desks, borrows, stock):
+    """
+    :return: (成功次数, 耗时秒数, 最终库存, 借阅记录数)
+    """
+    reset_book(stock)
+    due_date = datetime.now() + timedelta(days=30)
+    start_barrier = threading.Barrier(desks)
+    successes = [0] * desks
+
+    def desk(index):
+        start_barrier.wait()
+        try:
+            for i in range(borrows):
+                if borrow(index * borrows + i, BENCH_ISBN, due_date):
+                    successes[index] += 1
+        finally:
+            DBConnector(db_config).unbind_thread()
+
+    threads = [threading.Thread(target=desk, args=(i,)) for i in range(desks)]
+    # 借书时每一条都会打印结果，压测期间丢弃
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+    final_stock, records = final_state()
+    attempts = desks * borrows
+    print(f"{name}: {attempts} 次借书 {elapsed:.2f} 秒，{attempts / elapsed:.0f} 次/秒；"
+          f"借出 {sum(successes)} 本，借阅记录 {records} 条，最终库存 {final_stock}"
+          f"（初始 {stock}，{'正确' if final_stock >= 0 and stock - final_stock == records else '超借！'}）")
+    return sum(successes), elapsed, final_stock, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="借书并发压测")
+    parser.add_argument("--desks", type=int, default=20, help="同时借书的借书台数")
+    parser.add_argument("--borrows", type=int, default=50, help="每个借书台的借书次数")
+    parser.add_argument("--stock", type=int, default=200, help="热门图书的初始库存（小于总借书次数才会出现抢书）")
+    args = parser.parse_args()
+
+    # 每个借书台一个连接，避免压测的是连接池等待（必须在第一次使用DBConnector之前设置）
+    db_config["pool_size"] = max(db_config.get("pool_size", 5), args.desks)
+    try:
+        for name, borrow in (("先查后改", legacy_borrow), ("条件扣减", conditional_borrow)):
+            run(name, borrow, args.desks, args.borrows, args.stock)
+    finally:
+        reset_book(None)
+
+
+if __name__ == "__main__":
+    main()
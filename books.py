@@ -1,14 +1,51 @@
+import csv
+import re
+
+import pymysql
+from pymysql.constants import ER
 from tabulate import tabulate
 
 from connector_pymysql import DBConnector, db_config
+from connector_sqlite import FTS_MIN_LENGTH
+from search_index import book_index
+
+# MySQL ngram分词长度（服务器参数ngram_token_size，默认2），更短的关键字走LIKE
+NGRAM_TOKEN_SIZE = 2
+
+# 只由这些字符组成的关键字才可能是ISBN的一部分
+ISBN_KEYWORD = re.compile(r"[0-9Xx-]+")
+
+# ISBN格式：ISBN-13（13位数字）或ISBN-10（9位数字+校验位），可带连字符，总长不超过17（books.isbn长度）
+ISBN_PATTERN = re.compile(r"[0-9][0-9-]{8,15}[0-9Xx]")
+
+# MySQL书名全文索引不存在（未执行迁移，错误1191）时置为True，之后直接走LIKE
+_fulltext_unavailable = False
 
 # 用于转换表头
 books_dict = {"isbn": "ISBN码", "title": "书名", "category": "分类", "stock": "库存"}
 
+# books表的列（与 SELECT * FROM books 的顺序一致）
+BOOK_COLUMNS = ("isbn", "title", "category", "stock", "shelves")
+
+# 批量修改允许的字段
+UPDATABLE_COLUMNS = ("title", "category", "stock", "shelves")
+
+# 批量语句中每条SQL最多处理的图书数
+BATCH_SIZE = 500
 
-def print_result_table(headers: list, results: list, translated_headers=True):
+# 键集分页支持的排序方式：(列, 方向) 列表，最后一列必须是唯一的isbn，保证翻页不重不漏
+PAGE_ORDERS = {
+    "isbn": [("isbn", "ASC")],
+    "title": [("title", "ASC"), ("isbn", "ASC")],
+    "shelves": [("shelves", "DESC"), ("isbn", "ASC")],  # 上架在前
+    "stock": [("shelves", "DESC"), ("stock", "DESC"), ("isbn", "ASC")],  # 上架在前，库存多的在前
+}
+
+
+def print_result_table(headers: list, results: list, translated_headers=True, start=1):
     """
     最小改动版本，适应字典列表结构
+    :param start: 第一行的编号（分批打印时接着上一批编号）
     """
     if not results:
         return "无匹配结果", {}
@@ -23,8 +60,8 @@ def print_result_table(headers: list, results: list, translated_headers=True):
 
     # 关键修改点：从字典按顺序提取值
     numbered_results = [
-        (i + 1,) + tuple(row[field] for field in field_order)  # 按原始字段顺序生成元组
-        for i, row in enumerate(results)
+        (i,) + tuple(row[field] for field in field_order)  # 按原始字段顺序生成元组
+        for i, row in enumerate(results, start)
     ]
 
     translated_headers = ["编号"] + translated_headers
@@ -38,11 +75,93 @@ def print_result_table(headers: list, results: list, translated_headers=True):
     )
 
     # 关键修改点：从字典获取ISBN
-    id_mapping = {i + 1: row[field_order[0]] for i, row in enumerate(results)}  # 假设第一个字段是唯一标识
+    id_mapping = {i: row[field_order[0]] for i, row in enumerate(results, start)}  # 假设第一个字段是唯一标识
 
     return table, id_mapping
 
 
+def escape_like(keyword: str) -> str:
+    """转义LIKE通配符，配合 ESCAPE '!' 使用"""
+    return keyword.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+
+
+def check_isbn(isbn, verify_checksum=False):
+    """
+    校验ISBN格式
+    :param isbn: ISBN码
+    :param verify_checksum: 是否同时校验校验位
+    :return: 错误原因，合法时返回None
+    """
+    if not isinstance(isbn, str) or not ISBN_PATTERN.fullmatch(isbn):
+        return "ISBN格式错误"
+    digits = isbn.replace("-", "")
+    if len(digits) == 13 and digits.isdigit():
+        checksum_ok = sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(digits)) % 10 == 0
+    elif len(digits) == 10 and digits[:9].isdigit():
+        values = [10 if c in "Xx" else int(c) for c in digits]
+        checksum_ok = sum((10 - i) * v for i, v in enumerate(values)) % 11 == 0
+    else:
+        return "ISBN应为10位或13位"
+    if verify_checksum and not checksum_ok:
+        return "ISBN校验位错误"
+    return None
+
+
+def _text(value):
+    """文本字段转成去掉首尾空白的字符串（调用方可能传入数字），空值为空字符串"""
+    return "" if value is None else str(value).strip()
+
+
+def check_book_row(book: dict, verify_checksum=False):
+    """
+    校验并规范化一行待导入的图书数据
+    :return: (规范化后的图书元组, 错误原因)，出错时元组为None
+    """
+    isbn = _text(book.get("isbn"))
+    reason = check_isbn(isbn, verify_checksum)
+    if reason:
+        return None, reason
+    title = _text(book.get("title"))
+    if not title:
+        return None, "书名不能为空"
+    if len(title) > 255:
+        return None, "书名过长"
+    category = _text(book.get("category")) or None
+    try:
+        stock = int(book.get("stock"))
+        shelves = book.get("shelves")
+        shelves = 1 if shelves in (None, "") else int(shelves)
+    except (TypeError, ValueError):
+        return None, "库存/上架状态必须是整数"
+    if stock < 0:
+        return None, "库存不能为负数"
+    if shelves not in (0, 1):
+        return None, "上架状态只能是0或1"
+    return (isbn, title, category, stock, shelves), None
+
+
+def keyset_condition(keys: list, anchor: dict, alias: str = ""):
+    """
+    生成“排在anchor之后”的条件，如 (a, b) 升序时为 (a > x OR (a = x AND b > y))
+    :param keys: (列, 方向) 列表
+    :param anchor: 上一页最后一行
+    :param alias: 列名前的表别名，如 "br."
+    :return: (条件表达式, 参数列表)
+    """
+    clauses, params = [], []
+    for i, (column, direction) in enumerate(keys):
+        parts = [f"{alias}{prev} = %s" for prev, _ in keys[:i]]
+        parts.append(f"{alias}{column} {'>' if direction == 'ASC' else '<'} %s")
+        clauses.append("(" + " AND ".join(parts) + ")")
+        params += [anchor[prev] for prev, _ in keys[:i]] + [anchor[column]]
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+def fulltext_phrase(keyword: str) -> str:
+    """把关键字包装成全文检索的短语（MySQL布尔模式/FTS5通用）"""
+    return '"' + keyword.replace('"', '""' if DBConnector(db_config).backend == "sqlite" else " ") + '"'
+
+
 class BookManager:
 
     def add_book(self, isbn: str, title: str, category: str, stock: int):
@@ -61,10 +180,103 @@ class BookManager:
                     (isbn, title, category, stock)
                 )
                 conn.commit()
+                if book_index.tracking:
+                    cursor.execute("SELECT * FROM books WHERE isbn = %s", (isbn,))
+                    book_index.put(cursor.fetchone())
                 print(f"图书《{title}》添加成功！")
         except Exception as e:
             print(e)
 
+    def add_books(self, books, chunk_size: int = 1000, verify_checksum=False):
+        """
+        批量添加图书：每chunk_size行一个事务，用多行INSERT写入；
+        不合法或重复的行记录原因后跳过，不影响同批其他图书
+        :param books: 可迭代的图书字典（isbn, title, category, stock, 可选shelves）
+        :param chunk_size: 每批行数
+        :param verify_checksum: 是否校验ISBN校验位
+        :return: (成功添加的数量, 失败列表[{"row": 行号, "isbn": ISBN, "reason": 原因}])，行号从1开始
+        """
+        inserted, failures = 0, []
+        chunk = []
+        for row, book in enumerate(books, 1):
+            values, reason = check_book_row(book, verify_checksum)
+            if reason:
+                failures.append({"row": row, "isbn": book.get("isbn"), "reason": reason})
+                continue
+            chunk.append((row, values))
+            if len(chunk) >= chunk_size:
+                inserted += self._insert_books_chunk(chunk, failures)
+                chunk = []
+        if chunk:
+            inserted += self._insert_books_chunk(chunk, failures)
+        failures.sort(key=lambda failure: failure["row"])
+        print(f"批量导入完成：成功 {inserted} 本，失败 {len(failures)} 本")
+        return inserted, failures
+
+    def import_books_csv(self, path: str, chunk_size: int = 1000, verify_checksum=False, encoding="utf-8-sig"):
+        """
+        从CSV文件批量导入图书，表头可以是英文字段名（isbn,title,category,stock,shelves）或中文（ISBN码,书名,分类,库存）
+        :return: 同 add_books
+        """
+        header_map = {v: k for k, v in books_dict.items()}
+        header_map.update({"上架状态": "shelves"})
+        with open(path, newline="", encoding=encoding) as f:
+            reader = csv.DictReader(f)
+            reader.fieldnames = [header_map.get(name.strip(), name.strip()) for name in reader.fieldnames or []]
+            return self.add_books(reader, chunk_size, verify_checksum)
+
+    def _insert_books_chunk(self, chunk: list, failures: list) -> int:
+        """
+        在一个事务中写入一批已校验的图书
+        :param chunk: [(行号, (isbn, title, category, stock, shelves))]
+        :param failures: 失败记录追加到这里
+        :return: 成功写入的数量
+        """
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                # 先剔除库中已存在的和本批内重复的ISBN
+                isbns = list({values[0] for _, values in chunk})
+                placeholders = ", ".join(["%s"] * len(isbns))
+                cursor.execute(f"SELECT isbn FROM books WHERE isbn IN ({placeholders})", isbns)
+                existing = {book['isbn'] for book in cursor.fetchall()}
+                rows = []
+                for row, values in chunk:
+                    if values[0] in existing:
+                        failures.append({"row": row, "isbn": values[0], "reason": "ISBN已存在"})
+                    else:
+                        existing.add(values[0])
+                        rows.append((row, values))
+                if not rows:
+                    return 0
+
+                sql = "INSERT INTO books (isbn, title, category, stock, shelves) VALUES (%s, %s, %s, %s, %s)"
+                try:
+                    cursor.executemany(sql, [values for _, values in rows])
+                    conn.commit()
+                    written = rows
+                except Exception as e:
+                    # 整批失败（如并发插入了相同ISBN），逐行重试找出出错的行
+                    print(f"批量写入失败，改为逐行写入: {e}")
+                    conn.rollback()
+                    written = []
+                    for row, values in rows:
+                        try:
+                            cursor.execute(sql, values)
+                            conn.commit()
+                            written.append((row, values))
+                        except Exception as row_error:
+                            conn.rollback()
+                            failures.append({"row": row, "isbn": values[0], "reason": str(row_error)})
+
+                for _, values in written:
+                    book_index.put(dict(zip(BOOK_COLUMNS, values)))
+                return len(written)
+        except Exception as e:
+            print(f"批量导入失败: {e}")
+            failures.extend({"row": row, "isbn": values[0], "reason": str(e)} for row, values in chunk)
+            return 0
+
     def set_book_inactive(self, isbn: str) -> bool:
         """
         根据ISBN将图书下架（shelves设为0）
@@ -80,12 +292,129 @@ class BookManager:
                     (isbn,)
                 )
                 conn.commit()
+                # 没有改到任何行（ISBN不存在或已下架）时内存索引也不用动
+                if cursor.rowcount == 0:
+                    print(f"图书（ISBN: {isbn}）不存在或已下架")
+                    return True
+                book_index.update(isbn, shelves=0)
                 print(f"图书（ISBN: {isbn}）已下架")
                 return True
         except Exception as e:
             print(f"下架失败: {e}")
             return False
 
+    def set_books_inactive(self, isbns) -> bool:
+        """
+        批量下架图书，所有图书在一个事务中完成
+        :param isbns: ISBN列表
+        :return: 操作是否成功
+        """
+        isbns = list(dict.fromkeys(isbns))
+        if not isbns:
+            return True
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                matched = []  # 数据库中存在的ISBN，不存在的不写入内存索引
+                for i in range(0, len(isbns), BATCH_SIZE):
+                    part = isbns[i:i + BATCH_SIZE]
+                    placeholders = ", ".join(["%s"] * len(part))
+                    cursor.execute(f"SELECT isbn FROM books WHERE isbn IN ({placeholders})", part)
+                    matched += [book['isbn'] for book in cursor.fetchall()]
+                    cursor.execute(f"UPDATE books SET shelves = 0 WHERE isbn IN ({placeholders})", part)
+                conn.commit()
+                for isbn in matched:
+                    book_index.update(isbn, shelves=0)
+                print(f"已下架 {len(matched)} 本图书")
+                return True
+        except Exception as e:
+            print(f"批量下架失败: {e}")
+            return False
+
+    def update_books(self, changes: dict) -> bool:
+        """
+        批量修改图书信息，用 CASE 语句按ISBN分别赋值，所有修改在一个事务中完成
+        :param changes: {isbn: {字段: 新值}}，字段限于 title、category、stock、shelves
+        :return: 操作是否成功
+        """
+        changes = {isbn: fields for isbn, fields in changes.items() if fields}
+        if not changes:
+            return True
+        for fields in changes.values():
+            invalid = set(fields) - set(UPDATABLE_COLUMNS)
+            if invalid:
+                print(f"批量修改失败: 不支持修改字段 {', '.join(sorted(invalid))}")
+                return False
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                isbns = list(changes)
+                matched = []  # 数据库中存在的ISBN，不存在的不写入内存索引
+                for i in range(0, len(isbns), BATCH_SIZE):
+                    part = isbns[i:i + BATCH_SIZE]
+                    placeholders = ", ".join(["%s"] * len(part))
+                    cursor.execute(f"SELECT isbn FROM books WHERE isbn IN ({placeholders})", part)
+                    matched += [book['isbn'] for book in cursor.fetchall()]
+                    set_clauses, params = [], []
+                    for column in UPDATABLE_COLUMNS:
+                        targets = [isbn for isbn in part if column in changes[isbn]]
+                        if not targets:
+                            continue
+                        whens = " ".join(["WHEN %s THEN %s"] * len(targets))
+                        set_clauses.append(f"{column} = CASE isbn {whens} ELSE {column} END")
+                        for isbn in targets:
+                            params += [isbn, changes[isbn][column]]
+                    cursor.execute(
+                        f"UPDATE books SET {', '.join(set_clauses)} WHERE isbn IN ({placeholders})",
+                        params + part
+                    )
+                conn.commit()
+                for isbn in matched:
+                    book_index.update(isbn, **changes[isbn])
+                print(f"已修改 {len(matched)} 本图书的信息")
+                return True
+        except Exception as e:
+            print(f"批量修改失败: {e}")
+            return False
+
+    def adjust_stock(self, deltas: dict) -> bool:
+        """
+        批量增减库存（如重新上架、盘点），任何一本书库存会变成负数时整个操作回滚
+        :param deltas: {isbn: 增减数量}
+        :return: 操作是否成功
+        """
+        deltas = {isbn: delta for isbn, delta in deltas.items() if delta}
+        if not deltas:
+            return True
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                isbns = list(deltas)
+                negative = []
+                for i in range(0, len(isbns), BATCH_SIZE):
+                    part = isbns[i:i + BATCH_SIZE]
+                    whens = " ".join(["WHEN %s THEN %s"] * len(part))
+                    placeholders = ", ".join(["%s"] * len(part))
+                    params = [value for isbn in part for value in (isbn, int(deltas[isbn]))]
+                    cursor.execute(
+                        f"UPDATE books SET stock = stock + CASE isbn {whens} ELSE 0 END WHERE isbn IN ({placeholders})",
+                        params + part
+                    )
+                    cursor.execute(f"SELECT isbn FROM books WHERE isbn IN ({placeholders}) AND stock < 0", part)
+                    negative += [book['isbn'] for book in cursor.fetchall()]
+                if negative:
+                    conn.rollback()
+                    print(f"调整库存失败: 以下图书库存不足 {', '.join(negative)}")
+                    return False
+                conn.commit()
+                for isbn, delta in deltas.items():
+                    book_index.adjust_stock(isbn, delta)
+                print(f"已调整 {len(deltas)} 本图书的库存")
+                return True
+        except Exception as e:
+            print(f"调整库存失败: {e}")
+            return False
+
     def delete_book(self, isbn: str):
         """
         根据ISBN删除图书
@@ -99,6 +428,7 @@ class BookManager:
                     (isbn,)
                 )
                 conn.commit()
+                book_index.remove(isbn)
                 print(f"图书（ISBN: {isbn}）删除成功！")
         except Exception as e:
             print(e)
@@ -120,6 +450,11 @@ class BookManager:
                     values
                 )
                 conn.commit()
+                if cursor.rowcount == 0:
+                    # ISBN不存在（MySQL中新值与原值相同时也是0行，此时内存索引本来就一致）
+                    print(f"图书（ISBN: {isbn}）未修改")
+                    return
+                book_index.update(isbn, **kwargs)
                 print(f"图书（ISBN: {isbn}）信息更新成功！")
         except Exception as e:
             print(e)
@@ -205,6 +540,162 @@ class BookManager:
         except Exception as e:
             print(e)
 
+    def select_books(self, isbns):
+        """
+        按ISBN列表查询图书
+        :return: 图书数据列表（不存在的ISBN没有对应的行）
+        """
+        isbns = list(isbns)
+        books = []
+        with DBConnector(db_config) as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(isbns), BATCH_SIZE):
+                part = isbns[i:i + BATCH_SIZE]
+                cursor.execute(f"SELECT * FROM books WHERE isbn IN ({', '.join(['%s'] * len(part))})", part)
+                books += cursor.fetchall()
+        return books
+
+    def select_books_page(self, after_isbn=None, limit: int = 100, order_by: str = "isbn"):
+        """
+        键集分页查询图书：按索引顺序从上一页最后一本书之后开始取，不使用OFFSET，翻到多深都一样快
+        :param after_isbn: 上一页最后一本书的ISBN，None表示第一页
+        :param limit: 每页条数
+        :param order_by: 排序方式，见 PAGE_ORDERS
+        :return: (表头列表, 图书数据列表)，不足limit条说明已是最后一页
+        """
+        if order_by not in PAGE_ORDERS:
+            raise ValueError(f"不支持的排序方式: {order_by}")
+        keys = PAGE_ORDERS[order_by]
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                where, params = "", []
+                if after_isbn is not None:
+                    if len(keys) == 1:
+                        anchor = {"isbn": after_isbn}
+                    else:
+                        # 取出上一页最后一本书的排序键（主键查询）
+                        cursor.execute("SELECT * FROM books WHERE isbn = %s", (after_isbn,))
+                        anchor = cursor.fetchone()
+                        if anchor is None:
+                            print(f"翻页失败：图书（ISBN: {after_isbn}）不存在")
+                            return [], []
+                    where, params = keyset_condition(keys, anchor)
+                    where = "WHERE " + where
+                order = ", ".join(f"{column} {direction}" for column, direction in keys)
+                cursor.execute(
+                    f"SELECT * FROM books {where} ORDER BY {order} LIMIT %s",
+                    params + [limit]
+                )
+                columns = [col[0] for col in cursor.description]
+                books = cursor.fetchall()
+                return columns, list(books)
+        except Exception as e:
+            print(e)
+            return [], []
+
+    def iter_books_pages(self, page_size: int = 100, order_by: str = "isbn"):
+        """
+        逐页遍历全部图书
+        :return: 生成器，每次产出 (表头列表, 一页图书数据列表)，至少产出一次
+        """
+        after_isbn = None
+        while True:
+            columns, books = self.select_books_page(after_isbn, page_size, order_by)
+            yield columns, books
+            if len(books) < page_size:
+                return
+            after_isbn = books[-1]['isbn']
+
+    def iter_all_books(self, batch_size: int = 1000):
+        """
+        流式读取全部图书（服务器端游标，不把整个表读进内存）
+        :return: 生成器，逐批产出 (表头列表, 图书数据列表)
+        """
+        try:
+            yield from DBConnector(db_config).stream('SELECT * FROM books', batch_size=batch_size)
+        except Exception as e:
+            print(e)
+
+    def search(self, keyword: str, limit: int = 200, offset: int = 0):
+        """
+        按书名或ISBN搜索图书（一次查询），结果按匹配程度排序：ISBN完全匹配 > 前缀匹配 > 包含
+        内存索引已建立时直接在本地查询，否则查数据库
+        :param keyword: 关键字
+        :param limit: 最多返回的条数，None表示不限
+        :param offset: 跳过的条数（翻页用）
+        :return: (表头列表, 图书数据列表)
+        """
+        global _fulltext_unavailable
+        if book_index.ready:
+            return list(BOOK_COLUMNS), book_index.search(keyword, limit, offset)
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                escaped = escape_like(keyword)
+                contains, prefix = f"%{escaped}%", f"{escaped}%"
+                order_params = [keyword, prefix, prefix]
+                order_sql = """
+                    ORDER BY
+                        CASE
+                            WHEN isbn = %s THEN 0
+                            WHEN isbn LIKE %s ESCAPE '!' OR title LIKE %s ESCAPE '!' THEN 1
+                            ELSE 2
+                        END,
+                        isbn"""
+                if limit is not None:
+                    order_sql += " LIMIT %s OFFSET %s"
+                    order_params += [limit, offset]
+
+                title_match = self._title_fulltext(conn, keyword, contains)
+                if title_match:
+                    # 书名走全文索引；关键字可能是ISBN时再合并ISBN的匹配结果
+                    source, params = title_match
+                    if ISBN_KEYWORD.fullmatch(keyword):
+                        source += " UNION SELECT * FROM books WHERE isbn LIKE %s ESCAPE '!'"
+                        params = params + [contains]
+                    try:
+                        cursor.execute(f"SELECT * FROM ({source}) AS b {order_sql}", params + order_params)
+                    except pymysql.err.MySQLError as e:
+                        # 只有没有全文索引（未执行迁移）才改用LIKE，锁等待超时、断线等照常报错
+                        if not e.args or e.args[0] != ER.FT_MATCHING_KEY_NOT_FOUND:
+                            raise
+                        print(f"书名全文索引不可用，改用LIKE查询: {e}")
+                        _fulltext_unavailable = True
+                        title_match = None
+
+                if not title_match:
+                    cursor.execute(
+                        f"""SELECT * FROM books
+                        WHERE isbn LIKE %s ESCAPE '!' OR title LIKE %s ESCAPE '!' {order_sql}""",
+                        [contains, contains] + order_params
+                    )
+                columns = [col[0] for col in cursor.description]
+                books = cursor.fetchall()
+                return columns, list(books)
+        except Exception as e:
+            print(e)
+            return [], []
+
+    def _title_fulltext(self, conn, keyword: str, contains: str):
+        """
+        书名全文检索的子查询，关键字太短或没有全文索引时返回None（退回LIKE）
+        :return: (SQL, 参数列表) 或 None
+        """
+        if DBConnector(db_config).backend == "sqlite":
+            if not getattr(conn, "has_fts", False) or len(keyword) < FTS_MIN_LENGTH:
+                return None
+            return ("""SELECT books.* FROM books_fts
+                       JOIN books ON books.rowid = books_fts.rowid
+                       WHERE books_fts MATCH %s""", [fulltext_phrase(keyword)])
+
+        if _fulltext_unavailable or len(keyword) < NGRAM_TOKEN_SIZE:
+            return None
+        # 短语匹配先用ngram索引缩小范围，再用LIKE保证与子串匹配的结果一致
+        return ("""SELECT * FROM books
+                   WHERE MATCH(title) AGAINST(%s IN BOOLEAN MODE) AND title LIKE %s ESCAPE '!'""",
+                [fulltext_phrase(keyword), contains])
+
     def select_book_by_column(self, column, sth):
         try:
             with DBConnector(db_config) as conn:
@@ -1,8 +1,11 @@
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
 
 from tabulate import tabulate
 
+from books import keyset_condition
 from connector_pymysql import DBConnector, db_config
+from search_index import book_index
 
 # 表头转换字典
 borrow_dict = {
@@ -16,9 +19,98 @@ borrow_dict = {
 }
 
 
-def print_borrow_table(headers: list, results: list, translated_headers=True):
+# 归档设置：归还超过 after_days 天的记录移到 borrow_records_history，每个事务移动 batch_size 条
+archive_config = {
+    "after_days": 365,
+    "batch_size": 1000,
+}
+
+# 借阅记录表和归档表，查询历史记录时两张表一起读
+HISTORY_TABLES = ("borrow_records", "borrow_records_history")
+
+
+def borrow_record_select(table="borrow_records"):
+    """借阅记录（包含书名）的查询字段，界面表格按这个顺序显示"""
+    return f"""
+    SELECT br.id, br.student_id, b.title, br.isbn, br.borrow_date, br.due_date, br.returned_date
+    FROM {table} br
+    JOIN books b ON br.isbn = b.isbn
+"""
+
+
+BORROW_RECORD_SELECT = borrow_record_select()
+
+# 单条借阅记录（借阅记录表或归档表中，两个参数都是记录ID），写操作后返回给界面局部刷新
+BORROW_RECORD_SQL = " UNION ALL ".join(
+    borrow_record_select(table) + "    WHERE br.id = %s\n" for table in HISTORY_TABLES)
+
+# 全部借阅记录分两段读取，每段都沿 idx_open_due 的索引顺序键集分页，不需要对整张表计算排序键再filesort：
+# 未归还的在前，按应还日期从早到晚（逾期最久的在最前）；已归还的在后，按归还时间从新到旧（倒序扫描索引）
+# 每段为 (筛选条件, 排序键, 读取的表)，排序键的最后一列是唯一的id，保证翻页不重不漏；已归还的一段同时读归档表
+BORROW_RECORD_SEGMENTS = (
+    ("br.returned_date IS NULL", [("due_date", "ASC"), ("id", "ASC")], ("borrow_records",)),
+    ("br.returned_date IS NOT NULL", [("returned_date", "DESC"), ("due_date", "DESC"), ("id", "DESC")],
+     HISTORY_TABLES),
+)
+
+
+def borrow_records_query(student_id=None, isbn=None):
+    """
+    按学号/ISBN筛选借阅记录（包含书名）的SQL，借阅记录表和归档表一起查询
+    :return: (SQL语句, 参数列表)
+    """
+    condition, condition_params = " WHERE 1=1", []
+    if student_id:
+        condition += " AND br.student_id = %s"
+        condition_params.append(student_id)
+    if isbn:
+        condition += " AND br.isbn = %s"
+        condition_params.append(isbn)
+
+    query = " UNION ALL ".join(borrow_record_select(table) + condition for table in HISTORY_TABLES)
+    query += " ORDER BY borrow_date DESC"
+    return query, condition_params * len(HISTORY_TABLES)
+
+
+def lock_rows(cursor):
+    """
+    让当前事务接下来的SELECT读到的行在提交前不被其他事务修改
+    MySQL 使用 SELECT ... FOR UPDATE；SQLite 不支持，先执行一条不修改数据的写语句拿到数据库写锁
+    :return: 追加到SELECT末尾的子句
+    """
+    if DBConnector(db_config).backend == "sqlite":
+        cursor.execute("UPDATE books SET stock = stock WHERE 0")
+        return ""
+    return " FOR UPDATE"
+
+
+def first_inserted_id(cursor, count: int):
+    """
+    一条多行INSERT插入的第一行的id下限：MySQL 的 lastrowid 就是第一行的id，SQLite 的是最后一行的id
+    （SQLite 事务持有写锁，同一条语句的id连续）。MySQL 的id之间可能夹着其他借书台的记录
+    （innodb_autoinc_lock_mode=2、auto_increment_increment>1），只能当下限用，不能推算出每一行的id
+    """
+    if DBConnector(db_config).backend == "sqlite":
+        return cursor.lastrowid - count + 1
+    return cursor.lastrowid
+
+
+def case_by_isbn(values: dict):
+    """
+    按ISBN取不同值的表达式，用于一条UPDATE同时修改多本图书
+    :param values: {isbn: 值}
+    :return: (CASE表达式, 参数列表)
+    """
+    params = []
+    for isbn, value in values.items():
+        params += [isbn, value]
+    return "CASE isbn " + "WHEN %s THEN %s " * len(values) + "END", params
+
+
+def print_borrow_table(headers: list, results: list, translated_headers=True, start=1):
     """
     最小改动版本，适应字典列表结构
+    :param start: 第一行的编号（分批打印时接着上一批编号）
     """
     if not results:
         return "无匹配结果", {}
@@ -33,8 +125,8 @@ def print_borrow_table(headers: list, results: list, translated_headers=True):
 
     # 关键修改点：从字典按顺序提取值
     numbered_results = [
-        (i + 1,) + tuple(row[field] for field in field_order)  # 按原始字段顺序生成元组
-        for i, row in enumerate(results)
+        (i,) + tuple(row[field] for field in field_order)  # 按原始字段顺序生成元组
+        for i, row in enumerate(results, start)
     ]
 
     translated_headers = ["编号"] + translated_headers
@@ -48,7 +140,7 @@ def print_borrow_table(headers: list, results: list, translated_headers=True):
     )
 
     # 关键修改点：从字典获取ISBN
-    id_mapping = {i + 1: row[field_order[0]] for i, row in enumerate(results)}  # 假设第一个字段是唯一标识
+    id_mapping = {i: row[field_order[0]] for i, row in enumerate(results, start)}  # 假设第一个字段是唯一标识
 
     return table, id_mapping
 
@@ -58,26 +150,33 @@ class BorrowManager:
     def borrow_book(self, student_id: int, isbn: str, days: int):
         """
         借书功能
+        :param days: 借阅天数
+        :return: 新增的借阅记录（包含书名），失败返回None
         """
+        borrow_date = datetime.now()
+        return self.checkout(student_id, isbn, borrow_date + timedelta(days=days), borrow_date)
+
+    def checkout(self, student_id, isbn: str, due_date, borrow_date=None, fetch_record=True):
+        """
+        借书的唯一写入路径（命令行和图形界面共用）：
+        带条件的扣减库存（库存大于0且已上架）和插入借阅记录在同一个事务中完成，
+        以UPDATE的影响行数判断是否借到，不先查询库存，多个借书台同时借同一本书也不会超借
+        :param due_date: 应还日期
+        :param borrow_date: 借书日期，默认当前时间
+        :param fetch_record: 是否在提交后查询新记录（包含书名）返回
+        :return: 新增的借阅记录（fetch_record为False时只有id），库存不足、已下架或失败返回None
+        """
+        borrow_date = borrow_date or datetime.now()
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-
-                # 检查库存
-                cursor.execute("SELECT stock FROM books WHERE isbn = %s", (isbn,))
-                stock = cursor.fetchone()
-                if not stock or stock['stock'] < 1:
-                    print("图书库存不足或不存在！")
-                    return
-
-                # 减少库存
                 cursor.execute(
-                    "UPDATE books SET stock = stock - 1 WHERE isbn = %s",
+                    "UPDATE books SET stock = stock - 1 WHERE isbn = %s AND stock > 0 AND shelves = 1",
                     (isbn,))
-
-                # 添加借阅记录
-                borrow_date = datetime.now()
-                due_date = borrow_date + timedelta(days=days)
+                if cursor.rowcount != 1:
+                    conn.rollback()
+                    print("图书库存不足、已下架或不存在！")
+                    return None
 
                 cursor.execute(
                     """INSERT INTO borrow_records 
@@ -85,12 +184,18 @@ class BorrowManager:
                     VALUES (%s, %s, %s, %s)""",
                     (student_id, isbn, borrow_date, due_date)
                 )
-
+                record_id = cursor.lastrowid
                 conn.commit()
+                book_index.adjust_stock(isbn, -1)
                 print(f"学生 {student_id} 借阅 {isbn} 成功！")
 
+                if not fetch_record:
+                    return {"id": record_id}
+                cursor.execute(BORROW_RECORD_SQL, (record_id, record_id))
+                return cursor.fetchone()
         except Exception as e:
             print(f"借书失败: {e}")
+            return None
 
     def return_book(self, isbn: str):
         """
@@ -127,6 +232,7 @@ class BorrowManager:
                     (isbn,))
 
                 conn.commit()
+                book_index.adjust_stock(isbn, 1)
 
                 # 计算逾期
                 cursor.execute(
@@ -144,11 +250,174 @@ class BorrowManager:
         except Exception as e:
             print(f"还书失败: {e}")
 
+    def borrow_books(self, student_id, isbns, due_date, borrow_date=None):
+        """
+        一个学生一次借多本书（借书车）：整批在一个事务中完成，
+        锁定相关图书后按顺序逐本判断库存和上架状态，再用一条UPDATE扣减库存、一条多行INSERT写入借阅记录
+        同一本书可以出现多次（借多册），库存不够的那几册借书失败，不影响其他图书
+        :param isbns: 要借的ISBN列表
+        :param due_date: 应还日期
+        :param borrow_date: 借书日期，默认当前时间
+        :return: 与isbns顺序一致的结果列表 [{"isbn", "ok", "reason", "record"}]，record为新增的借阅记录（包含书名）
+        """
+        borrow_date = borrow_date or datetime.now().replace(microsecond=0)
+        results = [{"isbn": isbn, "ok": False, "reason": None, "record": None} for isbn in isbns]
+        distinct = list(dict.fromkeys(isbns))
+        if not distinct:
+            return results
+        placeholders = ", ".join(["%s"] * len(distinct))
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                lock = lock_rows(cursor)
+                cursor.execute(
+                    f"SELECT isbn, stock, shelves FROM books WHERE isbn IN ({placeholders}){lock}", distinct)
+                books = {book['isbn']: book for book in cursor.fetchall()}
+
+                # 逐本分配库存
+                granted = Counter()
+                for result in results:
+                    book = books.get(result["isbn"])
+                    if book is None:
+                        result["reason"] = "图书不存在"
+                    elif book['shelves'] != 1:
+                        result["reason"] = "图书已下架"
+                    elif book['stock'] - granted[result["isbn"]] < 1:
+                        result["reason"] = "库存不足"
+                    else:
+                        granted[result["isbn"]] += 1
+                        result["ok"] = True
+                if not granted:
+                    conn.rollback()
+                    return results
+
+                case, case_params = case_by_isbn(granted)
+                granted_placeholders = ", ".join(["%s"] * len(granted))
+                cursor.execute(
+                    f"UPDATE books SET stock = stock - {case} WHERE isbn IN ({granted_placeholders})",
+                    case_params + list(granted))
+                rows = [(student_id, result["isbn"], borrow_date, due_date) for result in results if result["ok"]]
+                cursor.execute(
+                    "INSERT INTO borrow_records (student_id, isbn, borrow_date, due_date) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s)"] * len(rows)),
+                    [value for row in rows for value in row])
+
+                # 取回刚插入的记录：本学生、本次借书时间、id不小于这条INSERT的第一行，
+                # 同一条语句内id随插入顺序递增，按id排序后依次对应到各本书
+                cursor.execute(
+                    f"""{BORROW_RECORD_SELECT} WHERE br.student_id = %s AND br.borrow_date = %s
+                    AND br.returned_date IS NULL AND br.id >= %s ORDER BY br.id LIMIT %s""",
+                    (student_id, borrow_date, first_inserted_id(cursor, len(rows)), len(rows)))
+                inserted = cursor.fetchall()
+                conn.commit()
+        except Exception as e:
+            print(f"借书失败: {e}")
+            for result in results:
+                result["ok"], result["reason"], result["record"] = False, str(e), None
+            return results
+
+        for isbn, count in granted.items():
+            book_index.adjust_stock(isbn, -count)
+        granted_results = [result for result in results if result["ok"]]
+        for result, record in zip(granted_results, inserted):
+            result["record"] = record if record['isbn'] == result["isbn"] else None
+        print(f"学生 {student_id} 借书 {sum(granted.values())} 本成功，{len(results) - sum(granted.values())} 本失败")
+        return results
+
+    def return_books(self, items):
+        """
+        批量还书（还书车）：整批在一个事务中完成，一条UPDATE写入所有归还日期、一条UPDATE恢复所有图书库存
+        每一项可以指定借阅记录ID（还书车中选中的那一条），不指定时归还该学生这本书最近一条未归还的记录
+        :param items: [(isbn, 学号)] 或 [(isbn, 学号, 记录ID)] 列表，不指定记录ID的同一项出现多次表示归还多册
+        :return: 与items顺序一致的结果列表 [{"isbn", "student_id", "ok", "reason", "record"}]，
+                 record为归还后的借阅记录（包含书名）
+        """
+        items = [(item[0], str(item[1]), item[2] if len(item) > 2 else None) for item in items]
+        results = [{"isbn": isbn, "student_id": student_id, "ok": False, "reason": None, "record": None}
+                   for isbn, student_id, _ in items]
+        record_ids = list(dict.fromkeys(record_id for _, _, record_id in items if record_id is not None))
+        pairs = list(dict.fromkeys((isbn, student_id) for isbn, student_id, record_id in items if record_id is None))
+        if not record_ids and not pairs:
+            return results
+        return_date = datetime.now().replace(microsecond=0)
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                lock = lock_rows(cursor)
+                # 指定的记录按主键查找，每个 (isbn, 学号) 都是 idx_isbn_student_open 上的等值查找
+                conditions = ["(isbn = %s AND student_id = %s)"] * len(pairs)
+                if record_ids:
+                    conditions.append(f"id IN ({', '.join(['%s'] * len(record_ids))})")
+                cursor.execute(
+                    f"""SELECT id, isbn, student_id, borrow_date, due_date FROM borrow_records
+                    WHERE returned_date IS NULL AND ({" OR ".join(conditions)})
+                    ORDER BY borrow_date DESC, id DESC{lock}""",
+                    [value for pair in pairs for value in pair] + record_ids)
+                open_by_id = {}
+                open_records = defaultdict(list)
+                for record in cursor.fetchall():
+                    open_by_id[record['id']] = record
+                    open_records[(record['isbn'], str(record['student_id']))].append(record)
+
+                # 指定记录ID的先对应到那一条，其余的对应到最近的未归还记录
+                returned_ids, restock = [], Counter()
+                for result, (isbn, student_id, record_id) in zip(results, items):
+                    if record_id is not None:
+                        record = open_by_id.get(record_id)
+                        if record is not None and (record['isbn'], str(record['student_id'])) != (isbn, student_id):
+                            record = None
+                    else:
+                        candidates = [record for record in open_records[(isbn, student_id)]
+                                      if record['id'] not in returned_ids and record['id'] not in record_ids]
+                        record = candidates[0] if candidates else None
+                    if record is None or record['id'] in returned_ids:
+                        result["reason"] = "未找到有效借阅记录"
+                        continue
+                    result["ok"], result["record"] = True, record
+                    returned_ids.append(record['id'])
+                    restock[isbn] += 1
+                if not returned_ids:
+                    conn.rollback()
+                    return results
+
+                id_placeholders = ", ".join(["%s"] * len(returned_ids))
+                cursor.execute(
+                    f"UPDATE borrow_records SET returned_date = %s WHERE id IN ({id_placeholders})",
+                    [return_date] + returned_ids)
+                case, case_params = case_by_isbn(restock)
+                cursor.execute(
+                    f"UPDATE books SET stock = stock + {case} WHERE isbn IN ({', '.join(['%s'] * len(restock))})",
+                    case_params + list(restock))
+                cursor.execute(f"{BORROW_RECORD_SELECT} WHERE br.id IN ({id_placeholders})", returned_ids)
+                updated = {record['id']: record for record in cursor.fetchall()}
+                conn.commit()
+        except Exception as e:
+            print(f"还书失败: {e}")
+            for result in results:
+                result["ok"], result["reason"], result["record"] = False, str(e), None
+            return results
+
+        for isbn, count in restock.items():
+            book_index.adjust_stock(isbn, count)
+        overdue = 0
+        for result in results:
+            if result["ok"]:
+                due_date = result["record"]['due_date']
+                if isinstance(due_date, datetime) and due_date < return_date:
+                    overdue += 1
+                result["record"] = updated.get(result["record"]['id'])
+        print(f"还书 {len(returned_ids)} 本成功（其中逾期 {overdue} 本），{len(results) - len(returned_ids)} 本失败")
+        return results
+
     def return_book_w(self, isbn: str, student_id: str):
+        """
+        按ISBN和学号归还最近一条未归还记录
+        :return: 更新后的借阅记录（包含书名），失败返回False
+        """
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-                # 查找未归还记录
+                # 查找未归还记录（idx_isbn_student_open 上的等值查找，已按借书日期排序，不需要filesort）
                 cursor.execute(
                     """SELECT id, borrow_date, due_date FROM borrow_records 
                     WHERE isbn = %s AND student_id = %s AND returned_date IS NULL
@@ -171,6 +440,7 @@ class BorrowManager:
                     (isbn,)
                 )
                 conn.commit()
+                book_index.adjust_stock(isbn, 1)
                 # 计算逾期
                 due_date = record['due_date']
                 if return_date > due_date:
@@ -178,7 +448,8 @@ class BorrowManager:
                     print(f"逾期归还！超期{days}天")
                 else:
                     print("按时归还成功！")
-                return True
+                cursor.execute(BORROW_RECORD_SQL, (record['id'], record['id']))
+                return cursor.fetchone()
         except Exception as e:
             print(f"还书失败: {e}")
             return False
@@ -190,31 +461,7 @@ class BorrowManager:
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-                # 修改后的SQL查询
-                query = """
-                    SELECT 
-                        br.id, 
-                        br.student_id, 
-                        b.title,
-                        br.isbn, 
-                        br.borrow_date, 
-                        br.due_date,
-                        br.returned_date
-                    FROM borrow_records br
-                    JOIN books b ON br.isbn = b.isbn
-                    WHERE 1=1
-                """
-                params = []
-
-                if student_id:
-                    query += " AND br.student_id = %s"
-                    params.append(student_id)
-                if isbn:
-                    query += " AND br.isbn = %s"
-                    params.append(isbn)
-
-                query += " ORDER BY br.borrow_date DESC"
-
+                query, params = borrow_records_query(student_id, isbn)
                 cursor.execute(query, params)
                 columns = [col[0] for col in cursor.description]
                 records = cursor.fetchall()
@@ -224,6 +471,17 @@ class BorrowManager:
             print(f"查询失败: {e}")
             return [], []
 
+    def iter_borrow_records(self, student_id=None, isbn=None, batch_size=1000):
+        """
+        流式查询借阅记录（服务器端游标，不把全部记录读进内存）
+        :return: 生成器，逐批产出 (表头列表, 借阅记录列表)
+        """
+        query, params = borrow_records_query(student_id, isbn)
+        try:
+            yield from DBConnector(db_config).stream(query, params, batch_size)
+        except Exception as e:
+            print(f"查询失败: {e}")
+
     def get_unreturned_books(self):
         """
         查询所有未归还的图书借阅记录
@@ -251,8 +509,12 @@ class BorrowManager:
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-                # 使用条件排序实现复合排序逻辑
-                cursor.execute(f"""SELECT * FROM borrow_records WHERE id = '{id}'""")
+                # 按主键查询，已归档的记录在归档表中
+                cursor.execute(
+                    " UNION ALL ".join(
+                        f"SELECT id, student_id, isbn, borrow_date, due_date, returned_date FROM {table} WHERE id = %s"
+                        for table in HISTORY_TABLES),
+                    (id,) * len(HISTORY_TABLES))
                 columns = [col[0] for col in cursor.description]
                 records = cursor.fetchall()
                 return columns, records
@@ -261,62 +523,152 @@ class BorrowManager:
             return [], []
 
     def renew_book_by_id(self, id, due_date):
+        """
+        修改借阅记录的应还日期
+        :return: 更新后的借阅记录（包含书名），失败返回False
+        """
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-                # 使用条件排序实现复合排序逻辑
                 cursor.execute(
-                    f"""
+                    """
                         UPDATE borrow_records
-                        SET due_date = '{due_date}'
-                        WHERE id = '{id}'
-                    """)
+                        SET due_date = %s
+                        WHERE id = %s
+                    """, (due_date, id))
                 conn.commit()
-                return True
+                cursor.execute(BORROW_RECORD_SQL, (id, id))
+                return cursor.fetchone()
         except Exception as e:
             print(f"续借失败: {e}")
-            return [], []
+            return False
 
-    def get_all_borrow_records(self):
+    def get_borrow_record(self, record_id):
         """
-        查询所有借阅记录（包括已归还和未归还）
-        排序规则：
-        1. 未归还的记录排在前半部分，按距离当前日期从近到远排序（due_date升序）
-        2. 已归还的记录排在后半部分，按归还时间从新到旧排序（returned_date降序）
-        :return: (表头列表, 借阅记录数据列表)
+        按记录ID查询单条借阅记录（包含书名）
+        :return: 借阅记录字典，不存在或失败返回None
         """
         try:
             with DBConnector(db_config) as conn:
                 cursor = conn.cursor()
-                # 使用条件排序实现复合排序逻辑
-                cursor.execute("""
-                    SELECT 
-                        br.id,
-                        br.student_id,
-                        b.title,
-                        br.isbn,
-                        br.borrow_date,
-                        br.due_date,
-                        br.returned_date
-                    FROM borrow_records br
-                    JOIN books b ON br.isbn = b.isbn
-                    ORDER BY 
-                        CASE 
-                            WHEN br.returned_date IS NULL THEN 0  -- 未归还记录优先
-                            ELSE 1  -- 已归还记录在后
-                        END,
-                        CASE 
-                            WHEN br.returned_date IS NULL THEN DATEDIFF(NOW(), br.due_date)  -- 未归还按逾期天数正序
-                            ELSE DATEDIFF(NOW(), br.returned_date)  -- 已归还按归还天数倒序
-                        END DESC
-                """)
+                cursor.execute(BORROW_RECORD_SQL, (record_id, record_id))
+                return cursor.fetchone()
+        except Exception as e:
+            print(f"查询失败: {e}")
+            return None
+
+    def select_borrow_records_page(self, returned: bool, after=None, limit: int = 500):
+        """
+        键集分页查询一段借阅记录（顺序见 BORROW_RECORD_SEGMENTS），每页只读索引上的limit行，与历史记录多少无关
+        :param returned: False 查询未归还的记录，True 查询已归还的记录
+        :param after: 上一页的最后一条记录，None表示第一页
+        :param limit: 每页条数
+        :return: (表头列表, 借阅记录列表)，不足limit条说明这一段已经读完
+        """
+        condition, keys, tables = BORROW_RECORD_SEGMENTS[returned]
+        params = []
+        if after is not None:
+            after_condition, params = keyset_condition(keys, after, alias="br.")
+            condition += " AND " + after_condition
+        order = ", ".join(f"br.{column} {direction}" for column, direction in keys)
+        if len(tables) == 1:
+            query = f"{borrow_record_select(tables[0])} WHERE {condition} ORDER BY {order} LIMIT %s"
+            params = params + [limit]
+        else:
+            # 每张表各自按索引顺序取前limit条，合并后再取前limit条
+            query = " UNION ALL ".join(
+                f"SELECT * FROM ({borrow_record_select(table)} WHERE {condition} ORDER BY {order} LIMIT %s) AS t{i}"
+                for i, table in enumerate(tables)
+            )
+            query += " ORDER BY " + ", ".join(f"{column} {direction}" for column, direction in keys) + " LIMIT %s"
+            params = (params + [limit]) * len(tables) + [limit]
+        try:
+            with DBConnector(db_config) as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, params)
                 columns = [col[0] for col in cursor.description]
                 records = cursor.fetchall()
-                return columns, records
+                return columns, list(records)
         except Exception as e:
             print(f"查询失败: {e}")
             return [], []
 
+    def archive_returned_records(self, after_days=None, batch_size=None, max_batches=None):
+        """
+        把归还超过 after_days 天的借阅记录移到归档表 borrow_records_history：
+        每批一个事务（复制到归档表并从借阅记录表删除），中途失败或中断只回滚当前这一批，再次调用会从剩下的记录继续
+        :param after_days: 归还多少天以后归档，默认 archive_config["after_days"]
+        :param batch_size: 每批条数，默认 archive_config["batch_size"]
+        :param max_batches: 最多处理的批数（分几次在空闲时执行），None表示全部处理完
+        :return: 本次归档的记录数
+        """
+        after_days = archive_config["after_days"] if after_days is None else after_days
+        batch_size = batch_size or archive_config["batch_size"]
+        cutoff = datetime.now() - timedelta(days=after_days)
+        moved, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            try:
+                with DBConnector(db_config) as conn:
+                    cursor = conn.cursor()
+                    # 沿 idx_open_due (returned_date, due_date) 从最早归还的记录开始取，排序与索引一致，不需要filesort
+                    cursor.execute(
+                        """SELECT id FROM borrow_records
+                        WHERE returned_date < %s
+                        ORDER BY returned_date, due_date, id LIMIT %s""",
+                        (cutoff, batch_size)
+                    )
+                    ids = [row['id'] for row in cursor.fetchall()]
+                    if not ids:
+                        break
+                    placeholders = ", ".join(["%s"] * len(ids))
+                    cursor.execute(
+                        f"""INSERT INTO borrow_records_history
+                        (id, student_id, isbn, borrow_date, due_date, returned_date)
+                        SELECT id, student_id, isbn, borrow_date, due_date, returned_date
+                        FROM borrow_records WHERE id IN ({placeholders})""",
+                        ids
+                    )
+                    cursor.execute(f"DELETE FROM borrow_records WHERE id IN ({placeholders})", ids)
+                    conn.commit()
+            except Exception as e:
+                print(f"归档失败: {e}")
+                break
+            moved += len(ids)
+            batches += 1
+            print(f"已归档 {moved} 条借阅记录")
+            if len(ids) < batch_size:
+                break
+        return moved
+
+    def get_all_borrow_records(self):
+        """
+        查询所有借阅记录（包括已归还和未归还，已归还的包括归档表中的记录）
+        排序规则：
+        1. 未归还的记录排在前半部分，按应还日期从早到晚排序（due_date升序，逾期最久的在最前）
+        2. 已归还的记录排在后半部分，按归还时间从新到旧排序（returned_date降序）
+        :return: (表头列表, 借阅记录数据列表)
+        """
+        columns, records = [], []
+        for columns, batch in self.iter_all_borrow_records():
+            records.extend(batch)
+        return columns, records
+
+    def iter_all_borrow_records(self, batch_size=1000):
+        """
+        逐页查询所有借阅记录，排序规则同 get_all_borrow_records：先读完未归还的一段，再接着读已归还的一段
+        第一页只需一次LIMIT查询，还书界面的首屏加载时间与历史记录多少无关
+        :return: 生成器，逐批产出 (表头列表, 借阅记录列表)
+        """
+        for returned in (False, True):
+            after = None
+            while True:
+                columns, records = self.select_borrow_records_page(returned, after, batch_size)
+                if records:
+                    yield columns, records
+                if len(records) < batch_size:
+                    break
+                after = records[-1]
+
 ### test
 # # 测试代码
 # manager = BorrowManager()
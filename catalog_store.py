@@ -0,0 +1,129 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from books import BookManager, PAGE_ORDERS
+from search_index import book_index
+from task_executor import executor, PRIORITY_VISIBLE
+
+
+def _sort_key(order_by: str):
+    """与 PAGE_ORDERS 一致的内存排序键（降序字段取负值）"""
+    keys = PAGE_ORDERS[order_by]
+
+    def key(book):
+        values = []
+        for column, direction in keys:
+            value = book.get(column)
+            if direction == "DESC":
+                value = -(value or 0)
+            elif value is None:
+                value = ""
+            values.append(value)
+        return values
+
+    return key
+
+
+def load_catalog_pages(page_size=200):
+    """
+    键集分页加载整个目录（在后台任务中迭代）：第一页到达就先显示，其余页陆续追加（上架图书在前）
+    :return: 生成器，每次产出 (页号, columns, books)
+    """
+    all_books = []
+    book_index.begin_load()
+    try:
+        for page, (columns, books) in enumerate(BookManager().iter_books_pages(page_size, order_by="shelves")):
+            all_books.extend(books)
+            yield page, columns, books
+        # 全部加载完成后建立内存搜索索引
+        book_index.build(all_books)
+    finally:
+        changed = book_index.end_load()
+    # 加载期间被借还、修改、新增或删除的图书：已读到的页可能是旧数据，重新读取并通知各界面
+    if changed:
+        current = {book['isbn']: book for book in BookManager().select_books(changed)}
+        for isbn in changed:
+            if isbn in current:
+                book_index.put(current[isbn])
+            else:
+                book_index.remove(isbn)
+
+
+class CatalogStore(QObject):
+    """
+    各界面共享的图书目录：只从数据库加载一次（数据存放在 book_index 中），
+    任何界面或 BookManager/BorrowManager 修改图书后发出 book_changed，各界面直接用内存数据更新
+    """
+
+    # 加载过程：第一页、后续页、全部完成
+    reset = pyqtSignal(list, list)
+    page_loaded = pyqtSignal(list, list)
+    loaded = pyqtSignal()
+    # 单本图书新增/修改/下架/库存变化 (isbn, 图书字典)，删除时图书字典为None
+    book_changed = pyqtSignal(str, object)
+    # 借阅记录新增或修改（借书、还书、续借），参数为更新后的记录列表
+    records_changed = pyqtSignal(list)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loader = None  # 正在进行的加载任务
+        book_index.add_listener(self.book_changed.emit)
+
+    @property
+    def ready(self):
+        return book_index.ready
+
+    def load(self):
+        """开始加载目录，已经加载或正在加载时什么都不做"""
+        if self.ready or self.loading:
+            return
+        self.reload()
+
+    def reload(self):
+        """从数据库重新加载整个目录（刷新按钮）"""
+        if self.loading:
+            return
+        self.loader = executor.stream(load_catalog_pages, priority=PRIORITY_VISIBLE)
+        self.loader.item_ready.connect(self._on_page)
+        self.loader.done.connect(self._on_loaded)
+
+    @property
+    def loading(self):
+        return self.loader is not None and not self.loader.finished
+
+    def _on_page(self, item):
+        page, columns, books = item
+        if page == 0:
+            self.reset.emit(columns, books)
+        else:
+            self.page_loaded.emit(columns, books)
+
+    def _on_loaded(self):
+        self.loader = None
+        if self.ready:
+            self.loaded.emit()
+
+    def books(self, order_by: str = "shelves"):
+        """全部图书，按 PAGE_ORDERS 中的方式排序；目录还没加载完时查询数据库（在后台任务中调用）"""
+        if self.ready:
+            books = book_index.books()
+        else:
+            result = BookManager().select_all_book()
+            books = result[1] if result else []  # 查询失败时返回None
+        return sorted(books, key=_sort_key(order_by))
+
+    def book(self, isbn: str):
+        return book_index.get(isbn)
+
+    def search(self, keyword: str, limit: int = None):
+        """
+        在内存中搜索（与 BookManager.search 结果一致），目录还没加载完时查询数据库
+        :param limit: 最多返回的条数，默认不限（界面搜索显示全部结果）
+        """
+        if not keyword:
+            books = self.books()
+            return books if limit is None else books[:limit]
+        return BookManager().search(keyword, limit)[1]
+
+
+# 全局共享的图书目录
+catalog = CatalogStore()
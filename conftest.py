@@ -0,0 +1,20 @@
+"""
+测试使用临时目录中的SQLite数据库（按 librarydatabase_sqlite.sql 建表并带示例数据）
+db_config 必须在第一次使用DBConnector之前设置，所有测试共用一个数据库，各测试使用自己的图书和学号
+"""
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from connector_pymysql import DBConnector, db_config  # noqa: E402
+
+_tmpdir = tempfile.mkdtemp()
+db_config.update(backend="sqlite", sqlite_path=os.path.join(_tmpdir, "library.db"), pool_size=5, pool_timeout=1)
+
+
+def pytest_unconfigure(config):
+    DBConnector(db_config).unbind_thread()
+    DBConnector(db_config).close_all()
+    shutil.rmtree(_tmpdir, ignore_errors=True)
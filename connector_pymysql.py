@@ -1,49 +1,283 @@
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+
 import pymysql
 from pymysql import Error
 from pymysql.connections import Connection
 
+import connector_sqlite
+
+# 出现后说明连接已不可用（断开、超时、SQLite数据库被锁等），连接不再放回连接池
+BROKEN_CONNECTION_ERRORS = (pymysql.err.OperationalError, sqlite3.OperationalError)
+
+
+class ConnectionPool:
+    """有界、线程安全的数据库连接池"""
+
+    def __init__(self, connect, size=5, max_idle=300, timeout=10, pre_ping=True):
+        """
+        :param connect: 无参的建立新连接函数（如绑定好参数的pymysql.connect）
+        :param size: 连接池最大连接数（包括已借出的连接）
+        :param max_idle: 空闲连接最长保留秒数，超过后关闭
+        :param timeout: 连接池耗尽时等待空闲连接的秒数
+        :param pre_ping: 借出前是否ping一次检查连接是否可用
+        """
+        self.connect = connect
+        self.size = size
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self._idle = deque()  # (连接, 归还时间)，右进右出，优先复用最近使用的连接
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self) -> Connection:
+        """借出一个可用连接，连接池耗尽时最多等待timeout秒"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise Error(f"连接池已耗尽（最大{self.size}个连接），等待超时")
+        try:
+            conn = self._take_idle()
+            if conn is None:
+                conn = self.connect()
+            return conn
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Connection, discard=False):
+        """归还连接，未提交的事务会被回滚"""
+        try:
+            if discard or not conn.open:
+                self._close_quietly(conn)
+                return
+            try:
+                conn.rollback()
+            except Exception:
+                self._close_quietly(conn)
+                return
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        """关闭所有空闲连接（已借出的连接归还时照常处理）"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def _take_idle(self):
+        """取出一个健康的空闲连接，顺便淘汰超时空闲的连接"""
+        now = time.monotonic()
+        expired = []
+        conn = None
+        with self._lock:
+            # 最早归还的连接在左侧，超时的一定先出现在左侧
+            while self._idle and now - self._idle[0][1] > self.max_idle:
+                expired.append(self._idle.popleft()[0])
+            if self._idle:
+                conn = self._idle.pop()[0]
+        for stale in expired:
+            self._close_quietly(stale)
+
+        if conn is not None and self.pre_ping:
+            try:
+                conn.ping(reconnect=False)
+            except Exception:
+                self._close_quietly(conn)
+                conn = None
+        return conn
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+class _ThreadBinding:
+    """线程固定使用的连接，线程结束（线程局部变量被回收）时自动归还连接池"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.conn = None
+        self.depth = 0  # 当前线程中嵌套的with层数
+
+    def release(self, discard=False):
+        if self.conn is not None:
+            conn, self.conn = self.conn, None
+            self.pool.release(conn, discard=discard)
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
 
 class DBConnector:
-    """使用pymysql实现的保持原接口的数据库连接器"""
+    """使用pymysql实现的保持原接口的数据库连接器（连接从连接池借出）"""
     _instance = None
 
     def __new__(cls, config):
         if not cls._instance:
             cls._instance = super().__new__(cls)
-            # 转换参数名为pymysql兼容格式
-            cls._instance.config = {
-                "host": config["host"],
-                "user": config["user"],
-                "password": config["password"],
-                "db": config["database"],  # pymysql使用db参数
-                "charset": "utf8mb4",
-                "cursorclass": pymysql.cursors.DictCursor
-            }
-            cls._instance.connection = None
+            cls._instance.backend = config.get("backend", "mysql")
+            if cls._instance.backend == "sqlite":
+                # 内嵌SQLite，无需MySQL服务器
+                cls._instance.config = {"path": config.get("sqlite_path", "librarydatabase.db")}
+                connect = partial(connector_sqlite.connect, cls._instance.config["path"])
+            else:
+                # 转换参数名为pymysql兼容格式
+                cls._instance.config = {
+                    "host": config["host"],
+                    "user": config["user"],
+                    "password": config["password"],
+                    "db": config["database"],  # pymysql使用db参数
+                    "charset": "utf8mb4",
+                    "cursorclass": pymysql.cursors.DictCursor
+                }
+                connect = partial(pymysql.connect, **cls._instance.config)
+            cls._instance.pool = ConnectionPool(
+                connect,
+                size=config.get("pool_size", 5),
+                max_idle=config.get("pool_max_idle", 300),
+                timeout=config.get("pool_timeout", 10),
+                pre_ping=config.get("pool_pre_ping", True),
+            )
+            # 线程亲和模式：每个线程懒加载并复用自己的连接
+            cls._instance.thread_affinity = config.get("thread_affinity", False)
+            # 每个线程各自记录借出的连接，避免多线程互相覆盖
+            cls._instance._local = threading.local()
         return cls._instance
 
-    def __enter__(self) -> Connection:
+    @property
+    def connection(self):
+        """当前线程最近一次借出的连接"""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1][0] if stack else None
+
+    def bind_thread(self):
+        """让当前线程固定复用一个连接（首次使用时才建立），直到unbind_thread或线程结束"""
+        if getattr(self._local, "binding", None) is None:
+            self._local.binding = _ThreadBinding(self.pool)
+        return self._local.binding
+
+    def set_thread_affinity(self, enabled: bool):
+        """单独设置当前线程是否固定复用连接（线程池的工作线程关闭：任务之间不占用连接）"""
+        self._local.affinity = enabled
+
+    def unbind_thread(self):
+        """归还当前线程固定的连接，工作线程结束前调用"""
+        binding = getattr(self._local, "binding", None)
+        if binding is not None and binding.depth == 0:
+            self._local.binding = None
+            binding.release()
+
+    def _acquire(self) -> Connection:
         try:
-            self.connection = pymysql.connect(**self.config)
-            return self.connection
+            return self.pool.acquire()
         except Error as e:
             print(f"数据库连接失败: {e}")
             raise
-        except KeyError as e:
-            print(f"配置参数错误: {e}")
-            raise ValueError("无效的数据库配置") from e
+
+    def __enter__(self) -> Connection:
+        binding = getattr(self._local, "binding", None)
+        if binding is None and getattr(self._local, "affinity", self.thread_affinity):
+            binding = self.bind_thread()
+
+        if binding is not None:
+            if binding.conn is None:
+                binding.conn = self._acquire()
+            binding.depth += 1
+            conn = binding.conn
+        else:
+            conn = self._acquire()
+
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        # 同时记下是否为线程固定连接，__exit__ 据此决定由谁归还
+        self._local.stack.append((conn, binding is not None))
+        return conn
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.connection and self.connection.open:
-            self.connection.close()
-            # 重置连接状态避免僵尸连接
-            self.connection = None
+        conn, bound = self._local.stack.pop()
+        # 出现数据库异常时连接状态不可信，直接丢弃（两种后端的连接错误）
+        broken = isinstance(exc_val, BROKEN_CONNECTION_ERRORS)
+
+        if not bound:
+            self.pool.release(conn, discard=broken)
+            return
+
+        binding = self._local.binding
+        binding.depth -= 1
+        if binding.conn is not conn:
+            return  # 内层with出错时已经丢弃了这个连接并归还了名额，外层不能再归还一次
+        if broken:
+            binding.release(discard=True)
+        elif binding.depth == 0:
+            # 固定连接不归还，但要结束事务，否则下次查询看到的还是旧快照
+            try:
+                conn.rollback()
+            except Exception:
+                binding.release(discard=True)
+
+    @contextmanager
+    def dedicated(self):
+        """
+        借出一个不与线程绑定的独立连接，用于流式查询，期间线程固定连接仍可执行其他查询
+        中途出现异常或生成器被提前关闭时，连接上可能还有没读完的结果，直接丢弃
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.pool.release(conn, discard=True)
+            raise
+        self.pool.release(conn)
+
+    def stream(self, query, params=None, batch_size=1000):
+        """
+        服务器端游标（SSDictCursor）流式查询，结果不会整体读入内存
+        :param query: SQL语句
+        :param params: 参数
+        :param batch_size: 每批行数
+        :return: 生成器，逐批产出 (表头列表, 行字典列表)
+        """
+        with self.dedicated() as conn:
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(query, params)
+            columns = [col[0] for col in cursor.description]
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield columns, list(rows)
+            cursor.close()
+
+    def close_all(self):
+        """关闭连接池中的空闲连接（程序退出时调用）"""
+        self.pool.close_all()
 
 
 # 保持原有配置结构不变
 db_config = {
+    "backend": "mysql",  # 改为"sqlite"则使用内嵌SQLite数据库（sqlite_path指定文件）
+    "sqlite_path": "librarydatabase.db",
     "host": "localhost",
     "database": "librarydatabase",  # 自动转换为pymysql的db参数
     "user": "root",
-    "password": "114514"
+    "password": "114514",
+    # 连接池配置（可选）
+    "pool_size": 5,  # 最大连接数
+    "pool_max_idle": 300,  # 空闲连接保留秒数
+    "pool_timeout": 10,  # 连接池耗尽时的等待秒数
+    "pool_pre_ping": True,  # 借出连接前检查连接是否可用
+    "thread_affinity": True  # 每个线程（UI线程等）复用各自的连接，后台任务执行器的工作线程除外
 }
@@ -0,0 +1,207 @@
+import os
+import re
+import sqlite3
+from datetime import datetime, date
+
+# SQLite版建表脚本（与librarydatabase.sql结构一致）
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "librarydatabase_sqlite.sql")
+
+
+def _parse_datetime(value: bytes):
+    """DATETIME列转换为datetime，兼容只写了日期的记录（如'2025-04-11'）"""
+    text = value.decode()
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return text
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = _parse_datetime(str(value).encode())
+    return parsed if isinstance(parsed, datetime) else None
+
+
+def _now():
+    """对应MySQL的NOW()"""
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _datediff(a, b):
+    """对应MySQL的DATEDIFF(a, b)，只比较日期部分"""
+    a, b = _to_datetime(a), _to_datetime(b)
+    if a is None or b is None:
+        return None
+    return (a.date() - b.date()).days
+
+
+sqlite3.register_adapter(datetime, lambda d: d.strftime("%Y-%m-%d %H:%M:%S"))
+sqlite3.register_adapter(date, lambda d: d.strftime("%Y-%m-%d"))
+sqlite3.register_converter("DATETIME", _parse_datetime)
+
+# 书名全文索引（trigram分词支持中文子串匹配，需要SQLite 3.34+且编译了FTS5）
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+    title, content = 'books', content_rowid = 'rowid', tokenize = 'trigram'
+);
+CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+    INSERT INTO books_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title ON books BEGIN
+    INSERT INTO books_fts (books_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO books_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+"""
+
+# 已归还借阅记录的归档表（与 migrations/004_borrow_records_history.sql 一致），已有的数据库连接时补建
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS `borrow_records_history`  (
+  `id` INTEGER PRIMARY KEY,
+  `student_id` int NOT NULL,
+  `isbn` varchar(17) NULL DEFAULT NULL REFERENCES `books` (`isbn`) ON DELETE RESTRICT ON UPDATE RESTRICT,
+  `borrow_date` DATETIME NOT NULL,
+  `due_date` DATETIME NOT NULL,
+  `returned_date` DATETIME NOT NULL,
+  `archived_at` DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS `idx_history_returned` ON `borrow_records_history` (`returned_date`, `due_date`);
+CREATE INDEX IF NOT EXISTS `idx_history_student` ON `borrow_records_history` (`student_id`, `borrow_date`);
+CREATE INDEX IF NOT EXISTS `idx_history_isbn_student` ON `borrow_records_history` (`isbn`, `student_id`, `borrow_date`);
+"""
+
+# trigram分词下能走全文索引的最短关键字长度
+FTS_MIN_LENGTH = 3
+
+# 把pymysql的%s占位符换成SQLite的?，%%还原为%
+_PLACEHOLDER = re.compile(r"%s|%%")
+
+
+def translate_placeholders(query: str) -> str:
+    return _PLACEHOLDER.sub(lambda m: "?" if m.group() == "%s" else "%", query)
+
+
+class SQLiteDictCursor:
+    """与pymysql DictCursor用法一致的SQLite游标：%s占位符，行以字典返回"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def execute(self, query, args=None):
+        # 与pymysql一致：没有参数时不做%格式化
+        if args is None:
+            self._cursor.execute(query)
+        else:
+            if isinstance(args, dict):
+                raise TypeError("SQLite后端暂不支持字典参数")
+            self._cursor.execute(translate_placeholders(query), tuple(args))
+        return self._cursor.rowcount
+
+    def executemany(self, query, args):
+        self._cursor.executemany(translate_placeholders(query), [tuple(a) for a in args])
+        return self._cursor.rowcount
+
+    def _to_dict(self, row):
+        columns = [col[0] for col in self._cursor.description]
+        return dict(zip(columns, row))
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return None if row is None else self._to_dict(row)
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        return [self._to_dict(row) for row in rows] if rows else ()
+
+    def fetchall(self):
+        # pymysql的DictCursor无结果时返回空元组，保持一致
+        rows = self._cursor.fetchall()
+        return [self._to_dict(row) for row in rows] if rows else ()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """包装sqlite3连接，提供与pymysql Connection相同的常用接口"""
+
+    def __init__(self, conn: sqlite3.Connection, has_fts=False):
+        self._conn = conn
+        self.open = True
+        self.has_fts = has_fts  # 是否建好了书名全文索引books_fts
+
+    def cursor(self, cursor=None):
+        return SQLiteDictCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self, reconnect=False):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        if self.open:
+            self.open = False
+            self._conn.close()
+
+
+def connect(path: str) -> SQLiteConnection:
+    """
+    打开SQLite数据库（WAL模式），数据库为空时按librarydatabase_sqlite.sql建表
+    :param path: 数据库文件路径
+    """
+    conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False, timeout=10)
+    conn.create_function("NOW", 0, _now)
+    conn.create_function("DATEDIFF", 2, _datediff)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books'").fetchone()
+    if not exists:
+        with open(SCHEMA_FILE, encoding="utf-8") as f:
+            conn.executescript(f.read())
+        conn.commit()
+    conn.executescript(HISTORY_SCHEMA)
+    return SQLiteConnection(conn, has_fts=_ensure_fts(conn))
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> bool:
+    """建立书名全文索引，当前SQLite不支持FTS5/trigram时返回False（搜索退回LIKE）"""
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'books_fts'").fetchone()
+    if created:
+        return True
+    try:
+        conn.executescript(FTS_SCHEMA)
+        conn.execute("INSERT INTO books_fts (books_fts) VALUES ('rebuild')")
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        conn.rollback()
+        print(f"SQLite全文索引不可用，书名搜索使用LIKE: {e}")
+        return False
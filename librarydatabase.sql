@@ -42,7 +42,10 @@ CREATE TABLE `books`  (
   `category` varchar(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL COMMENT '分类，可为空',
   `stock` int NOT NULL COMMENT '剩余数量',
   `shelves` tinyint(1) NOT NULL COMMENT '上架状态',
-  PRIMARY KEY (`isbn`) USING BTREE
+  PRIMARY KEY (`isbn`) USING BTREE,
+  INDEX `idx_title`(`title` ASC, `isbn` ASC) USING BTREE,
+  INDEX `idx_shelves_stock`(`shelves` DESC, `stock` DESC, `isbn` ASC) USING BTREE,
+  FULLTEXT INDEX `ft_title`(`title`) WITH PARSER `ngram`
 ) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci ROW_FORMAT = DYNAMIC;
 
 -- ----------------------------
@@ -71,7 +74,9 @@ CREATE TABLE `borrow_records`  (
   `due_date` datetime NOT NULL,
   `returned_date` datetime NULL DEFAULT NULL,
   PRIMARY KEY (`id`) USING BTREE,
-  INDEX `isbn`(`isbn` ASC) USING BTREE,
+  INDEX `idx_open_due`(`returned_date` ASC, `due_date` ASC) USING BTREE,
+  INDEX `idx_student_open`(`student_id` ASC, `returned_date` ASC, `borrow_date` ASC) USING BTREE,
+  INDEX `idx_isbn_student_open`(`isbn` ASC, `student_id` ASC, `returned_date` ASC, `borrow_date` ASC) USING BTREE,
   CONSTRAINT `borrow_records_ibfk_1` FOREIGN KEY (`isbn`) REFERENCES `books` (`isbn`) ON DELETE RESTRICT ON UPDATE RESTRICT
 ) ENGINE = InnoDB AUTO_INCREMENT = 57 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci ROW_FORMAT = DYNAMIC;
 
@@ -135,4 +140,23 @@ INSERT INTO `borrow_records` VALUES (54, 333333, '978-7-02-015220-0', '2025-03-0
 INSERT INTO `borrow_records` VALUES (55, 444444, '978-7-02-015220-0', '2025-03-06 00:00:00', '2025-04-11 00:00:00', NULL);
 INSERT INTO `borrow_records` VALUES (56, 1111111, '978-1-4391-3126-7', '2025-03-23 00:00:00', '2025-04-22 00:00:00', '2025-03-23 14:03:35');
 
+-- ----------------------------
+-- Table structure for borrow_records_history
+-- ----------------------------
+DROP TABLE IF EXISTS `borrow_records_history`;
+CREATE TABLE `borrow_records_history`  (
+  `id` int NOT NULL,
+  `student_id` int NOT NULL,
+  `isbn` varchar(17) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL,
+  `borrow_date` datetime NOT NULL,
+  `due_date` datetime NOT NULL,
+  `returned_date` datetime NOT NULL,
+  `archived_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_returned`(`returned_date` ASC, `due_date` ASC) USING BTREE,
+  INDEX `idx_student`(`student_id` ASC, `borrow_date` ASC) USING BTREE,
+  INDEX `idx_isbn_student`(`isbn` ASC, `student_id` ASC, `borrow_date` ASC) USING BTREE,
+  CONSTRAINT `borrow_records_history_ibfk_1` FOREIGN KEY (`isbn`) REFERENCES `books` (`isbn`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci ROW_FORMAT = DYNAMIC;
+
 SET FOREIGN_KEY_CHECKS = 1;
@@ -2,7 +2,7 @@
 import sys
 
 from books import BookManager, print_result_table
-from borrow import BorrowManager, print_borrow_table
+from borrow import BorrowManager, print_borrow_table, archive_config
 from connector_pymysql import DBConnector, db_config
 
 
@@ -39,24 +39,16 @@ def show_dashboard():
             total_books = int(cursor.fetchone()['SUM(stock)']) or 0
             # print(total_books)
 
-            # 当前借出量
+            # 当前借出量和逾期数量：一次查询，只读 idx_open_due 索引中未归还的部分
             cursor.execute("""
-                SELECT COUNT(*) 
+                SELECT COUNT(*) AS borrowed,
+                       COALESCE(SUM(due_date < NOW()), 0) AS overdue
                 FROM borrow_records 
                 WHERE returned_date IS NULL
             """)
-            borrowed = int(cursor.fetchone()['COUNT(*)']) or 0
-            print(borrowed)
-
-            # 逾期数量
-            cursor.execute("""
-                SELECT COUNT(*) 
-                FROM borrow_records 
-                WHERE returned_date IS NULL 
-                AND due_date < NOW()
-            """)
-            overdue = int(cursor.fetchone()['COUNT(*)']) or 0
-            print(overdue)
+            counts = cursor.fetchone()
+            borrowed = int(counts['borrowed'] or 0)
+            overdue = int(counts['overdue'] or 0)
 
             print("\n=== 统计看板 ===")
             print(f"总藏书量：{total_books} 册")
@@ -73,36 +65,16 @@ def search_books():
         print("关键字不能为空！")
         return
 
-    # 分别查询书名和ISBN
-    bm = BookManager()
+    # 一次查询同时匹配书名和ISBN，结果已去重并按匹配程度排序
+    columns, results = BookManager().search(keyword)
 
-    # 关键修复1：确保返回结果都是列表类型
-    columns_title, results_title = bm.select_book_by_column("title", keyword)
-    columns_isbn, results_isbn = bm.select_book_by_column("isbn", keyword)
-
-    # 强制转换结果为列表（如果原实现返回的是元组）
-    results_title = list(results_title)
-    results_isbn = list(results_isbn)
-
-    # 关键修复2：使用字典键进行去重
-    seen = set()
-    combined = []
-    for book in results_title + results_isbn:  # 现在可以安全合并
-        # 根据实际数据结构选择唯一标识字段
-        unique_id = book.get('isbn', None) or book[0]  # 兼容新旧数据结构
-        if unique_id not in seen:
-            seen.add(unique_id)
-            combined.append(book)
-
-    if not combined:
+    if not results:
         print("无匹配结果")
         return
 
-    # 关键修复3：统一使用正确的表头
-    # 假设所有结果字段结构相同，取第一个查询的列名
     table, id_mapping = print_result_table(
-        headers=columns_title,  # 或 columns_isbn，需保证字段顺序一致
-        results=combined
+        headers=columns,
+        results=results
     )
     print(table)
     return id_mapping
@@ -125,6 +97,64 @@ def show_all_books_sorted():
     return sorted_books, id_mapping
 
 
+def browse_books(page_size=20):
+    """分页浏览图书：先显示第一页，按回车再加载下一页"""
+    bm = BookManager()
+    after_isbn = None
+    page = 1
+    while True:
+        columns, books = bm.select_books_page(after_isbn, page_size, order_by="shelves")
+        if not books:
+            print("暂无书籍数据。" if page == 1 else "已经是最后一页。")
+            return
+        table, _ = print_result_table(columns, books)
+        print(f"第 {page} 页\n{table}")
+        if len(books) < page_size:
+            print("已经是最后一页。")
+            return
+        if input("回车查看下一页，输入q返回：").strip().lower() == 'q':
+            return
+        after_isbn = books[-1]['isbn']
+        page += 1
+
+
+def parse_selection(text, id_mapping):
+    """
+    解析多选编号，支持逗号/空格分隔和区间，如 "1,3 5-8"
+    :return: 选中图书的ISBN列表，有无效编号时返回None
+    """
+    isbns = []
+    for part in text.replace("，", ",").replace(",", " ").split():
+        try:
+            if "-" in part:
+                first, last = (int(n) for n in part.split("-", 1))
+                numbers = range(first, last + 1)
+            else:
+                numbers = [int(part)]
+        except ValueError:
+            return None
+        for number in numbers:
+            if number not in id_mapping:
+                return None
+            isbns.append(id_mapping[number])
+    return list(dict.fromkeys(isbns))
+
+
+def select_books_interactively(bm, prompt):
+    """显示所有图书并让用户多选，返回选中的ISBN列表（取消时返回空列表）"""
+    columns, books = bm.select_all_book()
+    if not books:
+        print("当前没有图书！")
+        return []
+    table, id_mapping = print_result_table(columns, books)
+    print(table)
+    isbns = parse_selection(input(prompt).strip(), id_mapping)
+    if isbns is None:
+        print("输入无效！")
+        return []
+    return isbns
+
+
 def book_management():
     """图书管理子菜单"""
     bm = BookManager()
@@ -134,6 +164,10 @@ def book_management():
         print("2. 删除图书")
         print("3. 修改图书信息")
         print("4. 查询图书")
+        print("5. 浏览图书（分页）")
+        print("6. 批量导入图书（CSV）")
+        print("7. 批量下架图书")
+        print("8. 批量调整库存")
         print("0. 返回上级")
         choice = input("请选择操作：").strip()
 
@@ -177,6 +211,42 @@ def book_management():
             # 查询图书
             search_books()
 
+        elif choice == '5':
+            # 分页浏览
+            browse_books()
+
+        elif choice == '6':
+            # 批量导入
+            path = input("请输入CSV文件路径（表头：isbn,title,category,stock）：").strip()
+            try:
+                inserted, failures = bm.import_books_csv(path)
+            except OSError as e:
+                print(f"读取文件失败：{e}")
+                continue
+            for failure in failures[:20]:
+                print(f"第{failure['row']}行 {failure['isbn']}：{failure['reason']}")
+            if len(failures) > 20:
+                print(f"……共 {len(failures)} 行失败")
+
+        elif choice == '7':
+            # 批量下架
+            isbns = select_books_interactively(bm, "请输入要下架的图书编号（如 1,3 5-8，回车取消）：")
+            if isbns and input(f"确认下架这 {len(isbns)} 本图书吗？(y/N)").lower() == 'y':
+                bm.set_books_inactive(isbns)
+
+        elif choice == '8':
+            # 批量调整库存
+            isbns = select_books_interactively(bm, "请输入要调整库存的图书编号（如 1,3 5-8，回车取消）：")
+            if not isbns:
+                continue
+            delta = input("请输入每本书库存的增减数量（如 5 或 -2）：").strip()
+            try:
+                delta = int(delta)
+            except ValueError:
+                print("请输入有效数字")
+                continue
+            bm.adjust_stock({isbn: delta for isbn in isbns})
+
         elif choice == '0':
             return
         else:
@@ -191,6 +261,7 @@ def borrow_management():
         print("1. 借书")
         print("2. 还书")
         print("3. 查询借阅记录")
+        print("4. 归档旧借阅记录")
         print("0. 返回上级")
         choice = input("请选择操作：").strip()
 
@@ -234,12 +305,25 @@ def borrow_management():
             student_id = int(student_id) if student_id.isdigit() else None
             isbn = isbn if isbn else None
 
-            columns, records = bm.get_borrow_records(
-                student_id=student_id,
-                isbn=isbn
-            )
-            table, _ = print_borrow_table(columns, records)
-            print(table)
+            # 流式分批打印，记录再多也不会一次读进内存
+            shown = 0
+            for columns, records in bm.iter_borrow_records(student_id=student_id, isbn=isbn, batch_size=50):
+                table, _ = print_borrow_table(columns, records, start=shown + 1)
+                print(table)
+                shown += len(records)
+                if len(records) == 50 and input("回车继续显示，输入q返回：").strip().lower() == 'q':
+                    break
+            if not shown:
+                print("无匹配结果")
+
+        elif choice == '4':
+            # 归档：已归还很久的记录移到归档表，查询借阅记录时仍然能查到
+            days = input(f"归档归还超过多少天的记录（默认{archive_config['after_days']}）：").strip()
+            if days and not days.isdigit():
+                print("天数必须为数字！")
+                continue
+            moved = bm.archive_returned_records(int(days) if days else None)
+            print(f"共归档 {moved} 条借阅记录")
 
         elif choice == '0':
             return
@@ -0,0 +1,6 @@
+/*
+ 为已有数据库的书名添加 ngram 全文索引（librarydatabase.sql 新建的库已包含）
+ ngram_token_size 使用 MySQL 默认值 2，1 个字的关键字仍走 LIKE 查询
+*/
+
+ALTER TABLE `books` ADD FULLTEXT INDEX `ft_title`(`title`) WITH PARSER `ngram`;
@@ -0,0 +1,7 @@
+/*
+ 图书键集分页（BookManager.select_books_page）使用的索引
+ 按书名翻页走 idx_title，按上架状态/库存翻页走 idx_shelves_stock
+*/
+
+ALTER TABLE `books` ADD INDEX `idx_title`(`title` ASC, `isbn` ASC) USING BTREE;
+ALTER TABLE `books` ADD INDEX `idx_shelves_stock`(`shelves` DESC, `stock` DESC, `isbn` ASC) USING BTREE;
@@ -0,0 +1,12 @@
+/*
+ 借阅记录的复合索引（librarydatabase.sql 新建的库已包含）
+ idx_open_due：未归还记录（returned_date IS NULL）的计数、按应还日期查逾期，统计看板只读索引
+ idx_student_open：按学号查询借阅记录 / 未归还记录
+ idx_isbn_student_open：还书时按 ISBN+学号 找最近一条未归还记录，索引内已按借书日期排序；
+                        同时满足外键对 isbn 索引的要求，原来的单列索引 isbn 不再需要
+*/
+
+ALTER TABLE `borrow_records` ADD INDEX `idx_open_due`(`returned_date` ASC, `due_date` ASC) USING BTREE;
+ALTER TABLE `borrow_records` ADD INDEX `idx_student_open`(`student_id` ASC, `returned_date` ASC, `borrow_date` ASC) USING BTREE;
+ALTER TABLE `borrow_records` ADD INDEX `idx_isbn_student_open`(`isbn` ASC, `student_id` ASC, `returned_date` ASC, `borrow_date` ASC) USING BTREE;
+ALTER TABLE `borrow_records` DROP INDEX `isbn`;
@@ -0,0 +1,20 @@
+/*
+ 已归还借阅记录的归档表（librarydatabase.sql 新建的库已包含，SQLite 连接时自动建立）
+ BorrowManager.archive_returned_records 把归还超过 archive_config["after_days"] 天的记录分批移到这里，
+ 借阅记录 borrow_records 只保留未归还和最近归还的记录；id 沿用原记录的id
+*/
+
+CREATE TABLE IF NOT EXISTS `borrow_records_history`  (
+  `id` int NOT NULL,
+  `student_id` int NOT NULL,
+  `isbn` varchar(17) CHARACTER SET utf8mb4 COLLATE utf8mb4_0900_ai_ci NULL DEFAULT NULL,
+  `borrow_date` datetime NOT NULL,
+  `due_date` datetime NOT NULL,
+  `returned_date` datetime NOT NULL,
+  `archived_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (`id`) USING BTREE,
+  INDEX `idx_returned`(`returned_date` ASC, `due_date` ASC) USING BTREE,
+  INDEX `idx_student`(`student_id` ASC, `borrow_date` ASC) USING BTREE,
+  INDEX `idx_isbn_student`(`isbn` ASC, `student_id` ASC, `borrow_date` ASC) USING BTREE,
+  CONSTRAINT `borrow_records_history_ibfk_1` FOREIGN KEY (`isbn`) REFERENCES `books` (`isbn`) ON DELETE RESTRICT ON UPDATE RESTRICT
+) ENGINE = InnoDB CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci ROW_FORMAT = DYNAMIC;
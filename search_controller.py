@@ -0,0 +1,72 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from task_executor import executor, PRIORITY_VISIBLE
+
+
+class SearchController(QObject):
+    """
+    搜索框的防抖+后台查询：输入停止 delay 毫秒后才查询，查询交给全局 executor 执行，
+    新的输入会取消上一次查询（还在排队的直接移出）并丢弃过期结果，result_ready 只发出最新一次的结果
+    用法：
+        controller = SearchController(lambda kw: BookManager().search(kw), parent=self)
+        line_edit.textChanged.connect(controller.search)
+        controller.result_ready.connect(self.update_table)
+        controller.failed.connect(self.show_search_error)
+    """
+
+    # 最新一次查询的结果 (columns, rows)
+    result_ready = pyqtSignal(list, list)
+    # 最新一次查询失败 (关键字, 错误信息)，过期查询的失败不会发出
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, query, delay: int = 300, parent=None):
+        """
+        :param query: 查询函数，参数为关键字，返回 (columns, rows)，在后台线程中调用
+        :param delay: 防抖时间（毫秒）
+        """
+        super().__init__(parent)
+        self.query = query
+        self.generation = 0  # 请求序号，只有等于它的结果才会发出
+        self._keyword = ""
+        self._pending = None  # 最近提交的查询任务
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self._submit)
+
+    def set_delay(self, delay: int):
+        self._timer.setInterval(delay)
+
+    def search(self, keyword: str):
+        """防抖搜索（连接到 textChanged）"""
+        self._keyword = keyword or ""
+        self.generation += 1  # 之前还在执行的查询结果作废
+        self._timer.start()
+
+    def search_now(self, keyword: str = ""):
+        """立即搜索（刷新按钮、写操作之后），同样在后台执行"""
+        self._keyword = keyword or ""
+        self.generation += 1
+        self._timer.stop()
+        self._submit()
+
+    def _submit(self):
+        # 旧查询直接取消（还在排队的不会再执行，正在执行的结果不会再发出）
+        if self._pending is not None:
+            self._pending.cancel()
+        generation, keyword = self.generation, self._keyword
+        self._pending = executor.submit(self.query, keyword, priority=PRIORITY_VISIBLE)
+        self._pending.result_ready.connect(lambda result: self._deliver(generation, *result))
+        self._pending.failed.connect(lambda error: self._fail(generation, keyword, error))
+
+    def _deliver(self, generation, columns, rows):
+        if generation != self.generation:
+            return  # 过期结果
+        self._pending = None
+        self.result_ready.emit(list(columns), list(rows))
+
+    def _fail(self, generation, keyword, error):
+        if generation != self.generation:
+            return  # 过期查询
+        self._pending = None
+        self.failed.emit(keyword, error)
@@ -0,0 +1,341 @@
+import threading
+from bisect import bisect_left
+
+# 索引的最长字符n-gram，短于它的关键字直接用同长度的n-gram查
+MAX_GRAM = 3
+
+
+def _grams(text: str, n: int):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def book_matches(book: dict, keyword: str) -> bool:
+    """单本图书是否满足搜索关键字（与 BookSearchIndex.search 的匹配规则一致）"""
+    needle = (keyword or "").lower()
+    return needle in book['isbn'].lower() or needle in (book.get('title') or '').lower()
+
+
+class BookSearchIndex:
+    """
+    内存中的图书字符n-gram倒排索引（ISBN和书名，1~3字），用于输入即搜索
+    由 CatalogStore 加载目录时建立，增删改图书时同步更新，线程安全
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books = {}  # isbn -> 图书字典
+        self._postings = {}  # n-gram -> {isbn}
+        self._listeners = []  # 单本图书变化的回调 callback(isbn, book)，删除时 book 为 None
+        self.ready = False  # 是否已经从数据库建好索引
+        self._changed = None  # 加载目录期间被修改的ISBN（加载完成后重新读取），不在加载时为None
+
+    def add_listener(self, callback):
+        """注册单本图书变化的回调（在执行写操作的线程中调用）"""
+        self._listeners.append(callback)
+
+    def _notify(self, isbn: str, book):
+        for callback in self._listeners:
+            callback(isbn, None if book is None else dict(book))
+
+    @property
+    def tracking(self):
+        """写操作是否需要通知索引（已建好或正在加载）"""
+        return self.ready or self._changed is not None
+
+    def begin_load(self):
+        """开始从数据库分页加载：此后被修改的图书记下来，build 之后由加载方重新读取"""
+        with self._lock:
+            self._changed = set()
+
+    def end_load(self):
+        """加载结束（完成或取消），返回加载期间被修改的ISBN"""
+        with self._lock:
+            changed, self._changed = self._changed or set(), None
+            return changed
+
+    def _mark_changed(self, isbn: str):
+        if self._changed is not None:
+            self._changed.add(isbn)
+
+    def build(self, books):
+        """用完整的图书列表重建索引（加载期间被修改的图书要在之后重新读取，见 begin_load）"""
+        book_map, postings = {}, {}
+        for book in books:
+            book_map[book['isbn']] = dict(book)
+            self._index(postings, book)
+        with self._lock:
+            self._books, self._postings = book_map, postings
+            self.ready = True
+
+    def clear(self):
+        with self._lock:
+            self._books, self._postings = {}, {}
+            self.ready = False
+
+    def put(self, book: dict):
+        """新增或整体替换一本书"""
+        with self._lock:
+            self._mark_changed(book['isbn'])
+            if not self.ready:
+                return
+            old = self._books.get(book['isbn'])
+            if old is not None:
+                self._unindex(old)
+            self._books[book['isbn']] = dict(book)
+            self._index(self._postings, book)
+        self._notify(book['isbn'], book)
+
+    def update(self, isbn: str, **changes):
+        """修改已索引图书的部分字段（如 stock、shelves、title）"""
+        with self._lock:
+            self._mark_changed(isbn)
+            old = self._books.get(isbn)
+            if not self.ready or old is None:
+                return
+            new = {**old, **changes}
+            if new['title'] != old['title']:
+                self._unindex(old)
+                self._index(self._postings, new)
+            self._books[isbn] = new
+        self._notify(isbn, new)
+
+    def adjust_stock(self, isbn: str, delta: int):
+        with self._lock:
+            self._mark_changed(isbn)
+            book = self._books.get(isbn)
+            if book is None:
+                return
+            book['stock'] = book.get('stock', 0) + delta
+            book = dict(book)
+        self._notify(isbn, book)
+
+    def remove(self, isbn: str):
+        with self._lock:
+            self._mark_changed(isbn)
+            old = self._books.pop(isbn, None)
+            if old is None:
+                return
+            self._unindex(old)
+        self._notify(isbn, None)
+
+    def get(self, isbn: str):
+        """单本图书（副本），未索引时返回None"""
+        with self._lock:
+            book = self._books.get(isbn)
+            return None if book is None else dict(book)
+
+    def books(self):
+        """全部图书（副本），按加载顺序"""
+        with self._lock:
+            return [dict(book) for book in self._books.values()]
+
+    def search(self, keyword: str, limit: int = 200, offset: int = 0):
+        """
+        与 BookManager.search 结果一致：ISBN或书名包含关键字，ISBN完全匹配 > 前缀匹配 > 包含
+        :param limit: 最多返回的条数，None表示不限
+        :return: 图书字典列表（副本）
+        """
+        needle = keyword.lower()
+        with self._lock:
+            candidates = self._candidates(needle)
+            matched = []
+            for isbn in candidates:
+                book = self._books[isbn]
+                isbn_lower, title_lower = isbn.lower(), book['title'].lower()
+                if needle not in isbn_lower and needle not in title_lower:
+                    continue
+                if isbn == keyword:
+                    rank = 0
+                elif isbn_lower.startswith(needle) or title_lower.startswith(needle):
+                    rank = 1
+                else:
+                    rank = 2
+                matched.append((rank, isbn, book))
+            matched.sort(key=lambda item: (item[0], item[1]))
+            end = None if limit is None else offset + limit
+            return [dict(book) for _, _, book in matched[offset:end]]
+
+    def _candidates(self, needle: str):
+        if not needle:
+            return list(self._books)
+        n = min(len(needle), MAX_GRAM)
+        postings = [self._postings.get(gram, set()) for gram in _grams(needle, n)]
+        if not postings:
+            return []
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def _book_grams(book: dict):
+        grams = set()
+        for text in (book['isbn'].lower(), (book.get('title') or '').lower()):
+            for n in range(1, MAX_GRAM + 1):
+                grams |= _grams(text, n)
+        return grams
+
+    def _index(self, postings: dict, book: dict):
+        for gram in self._book_grams(book):
+            postings.setdefault(gram, set()).add(book['isbn'])
+
+    def _unindex(self, book: dict):
+        for gram in self._book_grams(book):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(book['isbn'])
+                if not posting:
+                    del self._postings[gram]
+
+
+class BorrowRecordIndex:
+    """
+    还书界面已加载借阅记录的内存索引：学号/ISBN的精确和前缀查找，学号/ISBN/书名的n-gram子串查找
+    输入关键字时直接在内存中过滤，只有刷新或写操作之后才重新查询数据库（只在界面线程使用）
+    """
+
+    def __init__(self):
+        self._records = []
+        self._positions = {}  # 记录ID -> 记录下标
+        self._exact = {}  # 小写学号/ISBN -> [记录下标]
+        self._keys = []  # 排好序的学号/ISBN，用于二分查找前缀
+        self._keys_sorted = True
+        self._postings = {}  # n-gram -> {记录下标}
+        # 每条记录的显示顺序（与表格一致）：加载的记录按加载顺序（即下标），
+        # 之后新增的记录（借书）排在最前面，越新越靠前（负数）
+        self._ranks = []
+        self._new_count = 0
+
+    def build(self, records):
+        """用新加载的记录重建索引"""
+        self._records, self._positions, self._exact, self._keys, self._postings = [], {}, {}, [], {}
+        self._keys_sorted = True
+        self._ranks, self._new_count = [], 0
+        self.add(records)
+
+    def add(self, records):
+        """
+        追加一批记录（流式加载的后续批次）
+        加载过程中借书、还书、续借已经 put 进来的记录更新，批次中的同一条记录跳过
+        :return: 实际追加的记录列表
+        """
+        added = []
+        for record in records:
+            if record['id'] in self._positions:
+                continue
+            added.append(record)
+            pos = len(self._records)
+            self._records.append(record)
+            self._ranks.append(pos)
+            self._positions[record['id']] = pos
+            self._index(pos, record)
+        return added
+
+    def put(self, record: dict):
+        """新增或替换一条记录（借书、还书、续借之后），返回是否为新记录；新记录排在最前面，与表格一致"""
+        pos = self._positions.get(record['id'])
+        if pos is None:
+            self.add([record])
+            self._new_count += 1
+            self._ranks[-1] = -self._new_count
+            return True
+        old = self._records[pos]
+        self._records[pos] = record
+        # 还书、续借只改日期，学号/ISBN/书名没变时不用动索引
+        if self._record_texts(old) != self._record_texts(record):
+            self._unindex(pos, old)
+            self._index(pos, record)
+        return False
+
+    def _index(self, pos: int, record: dict):
+        for key in self._record_keys(record):
+            if key not in self._exact:
+                self._exact[key] = []
+                self._keys.append(key)
+                self._keys_sorted = False
+            self._exact[key].append(pos)
+        for gram in self._record_grams(record):
+            self._postings.setdefault(gram, set()).add(pos)
+
+    def _unindex(self, pos: int, record: dict):
+        for key in self._record_keys(record):
+            self._exact[key].remove(pos)  # 空列表留着，前缀查找时自然跳过
+        for gram in self._record_grams(record):
+            self._postings[gram].discard(pos)
+
+    def __len__(self):
+        return len(self._records)
+
+    def search(self, keyword: str):
+        """
+        学号、ISBN或书名包含关键字的记录，学号/ISBN完全匹配 > 前缀匹配 > 包含，同级按显示顺序（新借的在前，其余按加载顺序）
+        :return: 记录字典列表
+        """
+        needle = (keyword or "").strip().lower()
+        rank = self._ranks.__getitem__
+        if not needle:
+            if not self._new_count:
+                return list(self._records)
+            return [self._records[pos] for pos in sorted(range(len(self._records)), key=rank)]
+        exact = self._exact.get(needle, [])
+        prefix = self._prefix(needle)
+        contains = self._contains(needle)
+        seen, ordered = set(), []
+        for group in (sorted(exact, key=rank), sorted(prefix, key=rank), sorted(contains, key=rank)):
+            for pos in group:
+                if pos not in seen:
+                    seen.add(pos)
+                    ordered.append(self._records[pos])
+        return ordered
+
+    def matches(self, record: dict, keyword: str):
+        """单条记录是否满足关键字（与search的匹配规则一致）"""
+        needle = (keyword or "").strip().lower()
+        return not needle or any(needle in text for text in self._record_texts(record))
+
+    def _prefix(self, needle: str):
+        if not self._keys_sorted:
+            self._keys.sort()
+            self._keys_sorted = True
+        result = []
+        for i in range(bisect_left(self._keys, needle), len(self._keys)):
+            key = self._keys[i]
+            if not key.startswith(needle):
+                break
+            result.extend(self._exact[key])
+        return result
+
+    def _contains(self, needle: str):
+        n = min(len(needle), MAX_GRAM)
+        postings = sorted((self._postings.get(gram, set()) for gram in _grams(needle, n)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+        # n-gram只能筛出候选，长关键字还要确认是连续子串
+        return {pos for pos in candidates
+                if any(needle in text for text in self._record_texts(self._records[pos]))}
+
+    @staticmethod
+    def _record_keys(record: dict):
+        return {str(record['student_id']).lower(), str(record['isbn']).lower()}
+
+    @staticmethod
+    def _record_texts(record: dict):
+        return (str(record['student_id']).lower(), str(record['isbn']).lower(),
+                (record.get('title') or '').lower())
+
+    def _record_grams(self, record: dict):
+        grams = set()
+        for text in self._record_texts(record):
+            for n in range(1, MAX_GRAM + 1):
+                grams |= _grams(text, n)
+        return grams
+
+
+# 全局共享的图书索引
+book_index = BookSearchIndex()
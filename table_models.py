@@ -0,0 +1,305 @@
+from datetime import date, datetime
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PyQt5.QtGui import QColor, QFont
+
+# 表格颜色（只创建一次，data() 里直接复用）
+ACTIVE_COLOR = QColor(0, 0, 0)  # 上架：黑色
+INACTIVE_COLOR = QColor(128, 128, 128)  # 下架：灰色
+RED_BACKGROUND = QColor(255, 200, 200)  # 淡红色：库存<5 / 逾期
+YELLOW_BACKGROUND = QColor(255, 255, 200)  # 淡黄色：库存<10 / 3天内到期
+GREEN_BACKGROUND = QColor(200, 255, 200)  # 淡绿色：其余
+
+
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+class BookTableModel(QAbstractTableModel):
+    """
+    图书表格的虚拟模型：直接持有查询返回的图书字典列表，
+    单元格文字和颜色在视图绘制可见行时才计算，刷新只需一次模型重置
+    """
+
+    # (字段名, 表头)
+    COLUMNS = [('isbn', 'ISBN'), ('title', '书名'), ('category', '分类'), ('stock', '库存'), ('shelves', '上架状态')]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._books = []
+        self._rows = {}  # isbn -> 行号，写操作后按ISBN局部刷新
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._books)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        book = self._books[index.row()]
+        if role == Qt.DisplayRole:
+            return self.display_text(book, self.COLUMNS[index.column()][0])
+        if role == Qt.ForegroundRole:
+            return self.foreground(book)
+        if role == Qt.BackgroundRole:
+            return self.background(book)
+        return None
+
+    @staticmethod
+    def display_text(book: dict, key: str):
+        if key == 'stock':
+            return str(_to_int(book.get('stock', 0), 0))
+        if key == 'shelves':
+            return "上架" if book.get('shelves') == 1 else "下架"
+        return book.get(key)
+
+    @staticmethod
+    def is_active(book: dict):
+        return _to_int(book.get('shelves', 1), 1) != 0  # 异常时默认上架
+
+    def foreground(self, book: dict):
+        return ACTIVE_COLOR if self.is_active(book) else INACTIVE_COLOR
+
+    def background(self, book: dict):
+        return None
+
+    def set_books(self, books: list):
+        """整体替换表格数据"""
+        self.beginResetModel()
+        self._books = list(books)
+        self._reindex()
+        self.endResetModel()
+
+    def append_books(self, books: list):
+        """把一页图书追加到末尾"""
+        if not books:
+            return
+        start = len(self._books)
+        self.beginInsertRows(QModelIndex(), start, start + len(books) - 1)
+        self._books.extend(books)
+        for row, book in enumerate(books, start):
+            self._rows[book['isbn']] = row
+        self.endInsertRows()
+
+    def update_book(self, book: dict):
+        """
+        用写操作返回的图书局部刷新：已显示的行原地替换（不影响滚动位置和选中行），没有的追加到末尾
+        """
+        row = self._rows.get(book['isbn'])
+        if row is None:
+            self.append_books([book])
+            return
+        self._books[row] = book
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+    def remove_book(self, isbn: str):
+        row = self._rows.get(isbn)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._books[row]
+        self._reindex()
+        self.endRemoveRows()
+
+    def _reindex(self):
+        self._rows = {book['isbn']: row for row, book in enumerate(self._books)}
+
+    def book(self, row: int):
+        """第row行的图书字典，越界返回None"""
+        return self._books[row] if 0 <= row < len(self._books) else None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """点击表头排序，库存和上架状态按数值排序"""
+        if not 0 <= column < len(self.COLUMNS):
+            return
+        key = self.COLUMNS[column][0]
+        if key in ('stock', 'shelves'):
+            sort_key = lambda book: _to_int(book.get(key), 0)
+        else:
+            sort_key = lambda book: book.get(key) or ''
+        self.layoutAboutToBeChanged.emit()
+        self._books.sort(key=sort_key, reverse=order == Qt.DescendingOrder)
+        self._reindex()
+        self.layoutChanged.emit()
+
+
+class StockBookTableModel(BookTableModel):
+    """借书界面用：上架图书按库存多少填充背景色"""
+
+    def foreground(self, book: dict):
+        return None if self.is_active(book) else INACTIVE_COLOR
+
+    def background(self, book: dict):
+        if not self.is_active(book):
+            return None  # 下架图书不填充背景颜色
+        stock = _to_int(book.get('stock', 0), 0)
+        if stock < 5:
+            return RED_BACKGROUND
+        if stock < 10:
+            return YELLOW_BACKGROUND
+        return GREEN_BACKGROUND
+
+
+class BorrowRecordTableModel(QAbstractTableModel):
+    """
+    借阅记录表格的虚拟模型：每行的格式化日期、逾期状态和颜色在第一次绘制该行时算好并缓存，
+    不可见的行不做任何计算，多年的借阅历史也能流畅滚动
+    """
+
+    COLUMNS = [('id', '记录ID'), ('student_id', '学号'), ('title', '书名'), ('isbn', 'ISBN'),
+               ('borrow_date', '借书日期'), ('due_date', '应还日期')]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._records = []
+        self._rows = []  # 每行的显示缓存，未绘制过的行为None
+        self._positions = {}  # 记录ID -> 行号，写操作后按记录局部刷新
+        self._today = date.today()
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section][1]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and self._row(index.row()).returned:
+            flags &= ~Qt.ItemIsSelectable  # 已归还的记录不可选择
+        return flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._row(index.row())
+        if role == Qt.DisplayRole:
+            return row.texts[index.column()]
+        if role == Qt.BackgroundRole:
+            return row.background
+        if role == Qt.ForegroundRole:
+            return INACTIVE_COLOR if row.returned else None
+        if role == Qt.FontRole:
+            return self._bold_font if row.overdue else None  # 逾期记录加粗
+        return None
+
+    def _row(self, row: int):
+        cached = self._rows[row]
+        if cached is None:
+            cached = self._rows[row] = self._render(self._records[row])
+        return cached
+
+    def _render(self, record: dict):
+        """计算一行的显示内容（每行只算一次）"""
+        texts = tuple(self._format(record.get(key)) for key, _ in self.COLUMNS)
+        returned = record.get('returned_date') is not None
+        overdue, background = False, None
+        due_date = _to_date(record.get('due_date'))
+        if not returned and due_date is not None:
+            delta_days = (due_date - self._today).days
+            if delta_days < 0:
+                overdue, background = True, RED_BACKGROUND  # 逾期
+            elif delta_days <= 3:
+                background = YELLOW_BACKGROUND  # 即将到期
+            else:
+                background = GREEN_BACKGROUND  # 归还时限大于3天
+        return _RecordRow(texts, returned, overdue, background)
+
+    @staticmethod
+    def _format(value):
+        if isinstance(value, (datetime, date)):
+            return value.strftime("%Y-%m-%d")
+        return "" if value is None else str(value)
+
+    def set_records(self, records: list):
+        """整体替换表格数据"""
+        self.beginResetModel()
+        self._records = list(records)
+        self._rows = [None] * len(self._records)
+        self._reindex()
+        self._today = date.today()
+        self.endResetModel()
+
+    def append_records(self, records: list):
+        """把一批记录追加到末尾，表格中已有的记录（加载过程中局部刷新插入的）跳过"""
+        records = [record for record in records if record['id'] not in self._positions]
+        if not records:
+            return
+        start = len(self._records)
+        self.beginInsertRows(QModelIndex(), start, start + len(records) - 1)
+        self._records.extend(records)
+        self._rows.extend([None] * len(records))
+        for row, record in enumerate(records, start):
+            self._positions[record['id']] = row
+        self.endInsertRows()
+
+    def update_record(self, record: dict):
+        """
+        用写操作返回的记录局部刷新：已显示的行原地替换并重新计算这一行，新记录插到最前面
+        """
+        row = self._positions.get(record['id'])
+        if row is None:
+            self.beginInsertRows(QModelIndex(), 0, 0)
+            self._records.insert(0, record)
+            self._rows.insert(0, None)
+            self._reindex()
+            self.endInsertRows()
+            return
+        self._records[row] = record
+        self._rows[row] = None
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+
+    def remove_record(self, record_id):
+        row = self._positions.get(record_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._records[row]
+        del self._rows[row]
+        self._reindex()
+        self.endRemoveRows()
+
+    def _reindex(self):
+        self._positions = {record['id']: row for row, record in enumerate(self._records)}
+
+    def record(self, row: int):
+        """第row行的借阅记录字典，越界返回None"""
+        return self._records[row] if 0 <= row < len(self._records) else None
+
+    def text(self, row: int, column: int):
+        """第row行第column列显示的文字（如格式化后的应还日期）"""
+        return self._row(row).texts[column]
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+class _RecordRow:
+    __slots__ = ('texts', 'returned', 'overdue', 'background')
+
+    def __init__(self, texts, returned, overdue, background):
+        self.texts = texts
+        self.returned = returned
+        self.overdue = overdue
+        self.background = background
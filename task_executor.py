@@ -0,0 +1,163 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from connector_pymysql import DBConnector, db_config
+
+# 任务优先级：当前界面可见的加载优先，预加载等后台任务在后
+PRIORITY_VISIBLE = 10
+PRIORITY_NORMAL = 5
+PRIORITY_BACKGROUND = 0
+
+
+class CancelToken:
+    """取消标记：任务在两批数据之间检查，已取消的任务不再发出任何结果"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class TaskHandle(QObject):
+    """
+    提交任务后返回的句柄（在界面线程中），通过信号交付结果：
+    result_ready 普通任务的返回值；item_ready 流式任务的每一批；failed 异常信息；done 任务结束（无论成功、失败或取消）
+    """
+
+    result_ready = pyqtSignal(object)
+    item_ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    done = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.token = CancelToken()
+        self.runnable = None
+        self.finished = False
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        """取消任务：还在排队的直接移出线程池，正在执行的在下一批之前停止"""
+        self.token.cancel()
+        if self.finished or self.runnable is None:
+            return
+        executor = self.parent()
+        if executor is not None:
+            executor.take(self)
+
+
+class _Task(QRunnable):
+    def __init__(self, handle: TaskHandle, fn, args, kwargs, stream: bool):
+        super().__init__()
+        self.handle = handle
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.stream = stream
+
+    def run(self):
+        handle, token = self.handle, self.handle.token
+        # 工作线程不固定连接：每次查询用完即归还，流式查询的独立连接总能从连接池借到
+        DBConnector(db_config).set_thread_affinity(False)
+        try:
+            if token.cancelled:
+                return
+            if self.stream:
+                items = self.fn(*self.args, **self.kwargs)
+                try:
+                    for item in items:
+                        if token.cancelled:
+                            break
+                        handle.item_ready.emit(item)
+                finally:
+                    # 取消时立即关闭生成器，释放其中的游标
+                    if hasattr(items, "close"):
+                        items.close()
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+                if not token.cancelled:
+                    handle.result_ready.emit(result)
+        except Exception as e:
+            print(f"后台任务失败: {e}")
+            if not token.cancelled:
+                handle.failed.emit(str(e))
+        finally:
+            # 任务中显式 bind_thread 的连接也在任务结束时归还
+            DBConnector(db_config).unbind_thread()
+            handle.done.emit()
+
+
+class TaskExecutor(QObject):
+    """
+    GUI 的后台任务执行器：固定大小的线程池（为界面线程和流式查询的独立连接各留一个连接），
+    任务带优先级和取消标记，结果通过 TaskHandle 的信号回到界面线程
+    用法：
+        handle = executor.submit(BorrowManager().get_all_borrow_records)
+        handle.result_ready.connect(...)
+        handle = executor.stream(BookManager().iter_books_pages, 200, priority=PRIORITY_VISIBLE)
+        handle.item_ready.connect(...)
+    """
+
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads is None:
+            max_threads = max(1, min(4, db_config.get("pool_size", 5) - 2))
+        self.pool.setMaxThreadCount(max_threads)
+        self._handles = set()  # 未结束的任务，结束前保持引用
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, **kwargs) -> TaskHandle:
+        """在后台执行 fn(*args, **kwargs)，返回值通过 handle.result_ready 交付"""
+        return self._start(fn, args, kwargs, priority, stream=False)
+
+    def stream(self, fn, *args, priority=PRIORITY_NORMAL, **kwargs) -> TaskHandle:
+        """在后台迭代 fn(*args, **kwargs) 返回的生成器，每一项通过 handle.item_ready 交付"""
+        return self._start(fn, args, kwargs, priority, stream=True)
+
+    def _start(self, fn, args, kwargs, priority, stream):
+        handle = TaskHandle(self)
+        task = _Task(handle, fn, args, kwargs, stream)
+        task.setAutoDelete(False)  # 由Python端持有，避免线程池删除Python对象
+        handle.runnable = task
+        handle.done.connect(lambda: self._finish(handle))
+        self._handles.add(handle)
+        # 下一轮事件循环再放入线程池：调用方连接完信号之前任务不会开始，结果不会丢失
+        QTimer.singleShot(0, lambda: self._enqueue(handle, priority))
+        return handle
+
+    def _enqueue(self, handle: TaskHandle, priority):
+        if handle.cancelled:
+            handle.done.emit()  # 还没放入线程池就被取消
+        else:
+            self.pool.start(handle.runnable, priority)
+
+    def take(self, handle: TaskHandle):
+        """把还在排队的任务移出线程池（还没放入线程池的由 _enqueue 处理）"""
+        if self.pool.tryTake(handle.runnable):
+            handle.done.emit()
+
+    def _finish(self, handle: TaskHandle):
+        handle.finished = True
+        handle.runnable = None
+        self._handles.discard(handle)
+        handle.deleteLater()
+
+    def shutdown(self, msecs=3000):
+        """程序退出前：丢弃排队的任务，取消正在执行的任务并等待它们结束"""
+        self.pool.clear()
+        for handle in list(self._handles):
+            handle.token.cancel()
+        return self.pool.waitForDone(msecs)
+
+
+# 全局共享的后台任务执行器
+executor = TaskExecutor()
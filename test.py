@@ -1,30 +1,16 @@
 import sys
 from datetime import datetime
 
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QDate
-from PyQt5.QtGui import QColor
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QTableWidgetItem, QHeaderView, QApplication, QTableView
+from PyQt5.QtCore import pyqtSignal, Qt, QDate
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QApplication, QTableView
 from qfluentwidgets import (
-    TableWidget, LineEdit, PrimaryToolButton, FluentIcon, BodyLabel,
+    TableView, LineEdit, PrimaryToolButton, FluentIcon, BodyLabel,
     PushButton, InfoBar, InfoBarPosition, Action, RoundMenu, CalendarPicker
 )
 
 from borrow import BorrowManager
-
-
-class RenewWorker(QThread):
-    result_ready = pyqtSignal(list, list)
-
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.borrow_manager = BorrowManager()
-
-    def run(self):
-        try:
-            columns, records = self.borrow_manager.get_all_borrow_records()
-            self.result_ready.emit(columns, records)
-        except Exception as e:
-            print(f"Worker error: {e}")
+from table_models import BorrowRecordTableModel
+from task_executor import executor, PRIORITY_VISIBLE
 
 
 class RenewInterface(QWidget):
@@ -33,6 +19,8 @@ class RenewInterface(QWidget):
     def __init__(self, text: str, parent=None):
         super().__init__(parent)
         self.borrow_manager = BorrowManager()
+        self.loader = None  # 正在进行的加载任务
+        self.records = []  # 最近一次加载的全部记录，搜索只在这里过滤
         self.init_ui()
         self.search_result_ready.connect(self.update_table)
         self.setObjectName(text.replace(' ', '-'))
@@ -56,9 +44,10 @@ class RenewInterface(QWidget):
         search_layout.addWidget(refresh_btn)
 
         # 表格
-        self.table = TableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(['记录ID', '学号', '书名', 'ISBN', '借书日期', '应还日期'])
+        self.table = TableView()
+        # 虚拟模型：逾期状态和日期文字每行只算一次，只渲染可见行
+        self.model = BorrowRecordTableModel(self.table)
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setEditTriggers(QTableView.NoEditTriggers)
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -71,83 +60,32 @@ class RenewInterface(QWidget):
         self.load_data()
 
     def load_data(self):
-        self.worker = RenewWorker()
-        self.worker.result_ready.connect(self.update_table)
-        self.worker.start()
+        if self.loader is not None:
+            self.loader.cancel()  # 上一次刷新还没完成
+        loader = executor.submit(self.borrow_manager.get_all_borrow_records, priority=PRIORITY_VISIBLE)
+        loader.result_ready.connect(lambda result: self.on_records_loaded(loader, result))
+        self.loader = loader
+
+    def on_records_loaded(self, loader, result):
+        if loader is not self.loader:
+            return  # 已被新的刷新取代
+        self.loader = None
+        columns, self.records = result
+        self.search_records(self.search_edit.text())
 
     def update_table(self, columns, records):
-        """更新表格数据并设置行颜色"""
-        self.records = records
-        self.table.setRowCount(len(records))
-        current_date = datetime.today().date()  # 统一使用date类型
-
-        for row, record in enumerate(records):
-            row_color = None
-            due_date = record['due_date'].date()  # 转换datetime到date
-            delta_days = None  # 初始化 delta_days
-
-            if record['returned_date'] is not None:
-                # 已归还的记录不设置背景色
-                pass
-            else:
-                delta_days = (due_date - current_date).days
-
-                if delta_days < 0:
-                    row_color = QColor(255, 200, 200)  # 逾期
-                elif 0 <= delta_days <= 3:
-                    row_color = QColor(255, 255, 200)  # 即将到期
-                else:
-                    row_color = QColor(200, 255, 200)  # 归还时限大于3天，设置绿色
-
-            # 创建表格项并设置颜色
-            for col in range(6):  # 共6列数据
-                # 生成单元格文本
-                if col == 0:
-                    text = str(record['id'])
-                elif col == 1:
-                    text = str(record['student_id'])
-                elif col == 2:
-                    text = record['title']
-                elif col == 3:
-                    text = record['isbn']
-                elif col == 4:
-                    text = record['borrow_date'].strftime("%Y-%m-%d")
-                elif col == 5:
-                    text = record['due_date'].strftime("%Y-%m-%d")
-                else:
-                    text = ""
-
-                item = QTableWidgetItem(text)
-
-                if record['returned_date'] is not None:
-                    # 已归还的记录设置字体为灰色
-                    item.setForeground(QColor(128, 128, 128))
-                    # 设置不可选择状态
-                    item.setFlags(item.flags() & ~Qt.ItemIsSelectable)
-
-                # 设置整行背景色
-                if row_color:
-                    item.setBackground(row_color)
-
-                # 特殊格式：逾期记录加粗
-                if delta_days is not None and delta_days < 0 and not record['returned_date']:
-                    font = item.font()
-                    font.setBold(True)
-                    item.setFont(font)
-
-                self.table.setItem(row, col, item)
+        """更新表格数据（一次模型重置）"""
+        self.model.set_records(records)
 
     def show_context_menu(self, pos):
         # 获取点击位置的行号
         row = self.table.rowAt(pos.y())
 
         # 有效性校验
-        if not (0 <= row < self.table.rowCount()):  # 行号越界保护
+        record = self.model.record(row)
+        if record is None:  # 行号越界保护
             return
 
-        # 获取对应数据记录
-        record = self.records[row]
-
         # 核心逻辑：已归还记录不弹出菜单
         if record.get('returned_date'):  # 使用get方法避免KeyError
             return  # 直接退出，不显示菜单
@@ -169,11 +107,8 @@ class RenewInterface(QWidget):
         处理续借图书操作
         :param row: 选中的行数据
         """
-        id = self.table.item(row, 0).text()
-        print(id)
-        columns, books = BorrowManager.get_all_borrow_records_by_isbn(self, id)
-        print(type(books))
-        print(books)
+        # 直接使用表格中已加载的记录
+        books = [self.model.record(row)]
         record_info = {
             'title': books[0]['title'],
             'isbn': books[0]['isbn'],
@@ -199,8 +134,8 @@ class RenewInterface(QWidget):
             self.update_due_date(row['record_id'], new_due_date)
 
     def search_records(self, keyword):
-        """根据关键字搜索记录并更新表格"""
-        columns, records = self.borrow_manager.get_all_borrow_records()
+        """根据关键字在已加载的记录中搜索并更新表格"""
+        records = self.records
 
         if keyword:
             filtered = []
@@ -212,10 +147,9 @@ class RenewInterface(QWidget):
                         keyword in record['title'].lower()):
                     filtered.append(record)
             records = filtered
-            self.records = records
 
         # 调用更新表格函数
-        self.update_table(columns, records)
+        self.update_table([], records)
 
     def show_info_bar(self, type_, title, content):
         creator = getattr(InfoBar, type_)
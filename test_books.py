@@ -0,0 +1,78 @@
+"""
+图书批量导入、搜索和键集分页（数据库由 conftest.py 设置为临时SQLite）
+运行：python -m pytest test_books.py
+"""
+import unittest
+
+from books import BookManager, PAGE_ORDERS
+from search_index import BookSearchIndex, book_index
+
+
+def page_key(order_by):
+    """与 PAGE_ORDERS 一致的排序键"""
+    def key(book):
+        return [-book[column] if direction == "DESC" else book[column] for column, direction in PAGE_ORDERS[order_by]]
+    return key
+
+
+class AddBooksTest(unittest.TestCase):
+    def test_add_books_reports_failures_per_row(self):
+        manager = BookManager()
+        rows = [
+            {"isbn": "979-1-0000-0001-0", "title": "批量导入测试一", "category": "测试", "stock": "3"},
+            {"isbn": 9791000000029, "title": 12345, "category": None, "stock": 1},  # 数字字段转成字符串
+            {"isbn": "123", "title": "ISBN格式错误", "stock": 1},
+            {"isbn": "979-1-0000-0003-4", "title": "  ", "stock": 1},
+            {"isbn": "979-1-0000-0004-1", "title": "库存为负", "stock": -1},
+            {"isbn": "979-1-0000-0005-8", "title": "上架状态错误", "stock": 1, "shelves": 2},
+            {"isbn": "979-1-0000-0001-0", "title": "与第一行重复", "stock": 1},
+        ]
+        inserted, failures = manager.add_books(rows, chunk_size=4)
+
+        self.assertEqual(inserted, 2)
+        self.assertEqual([(failure["row"], failure["reason"]) for failure in failures], [
+            (3, "ISBN格式错误"), (4, "书名不能为空"), (5, "库存不能为负数"), (6, "上架状态只能是0或1"), (7, "ISBN已存在"),
+        ])
+        books = {book["isbn"]: book for book in manager.select_books(["979-1-0000-0001-0", "9791000000029"])}
+        self.assertEqual(books["979-1-0000-0001-0"]["stock"], 3)
+        self.assertEqual(books["9791000000029"]["title"], "12345")
+
+        # 再导入一次：全部是已存在的ISBN，不影响库中数据
+        inserted, failures = manager.add_books(rows[:2])
+        self.assertEqual(inserted, 0)
+        self.assertEqual([failure["reason"] for failure in failures], ["ISBN已存在"] * 2)
+
+
+class SearchAndPagingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        BookManager().add_books([
+            {"isbn": "979-2-0000-0001-7", "title": "Python 检索测试", "category": "测试", "stock": 5},
+            {"isbn": "979-2-0000-0002-4", "title": "检索测试 Python 进阶", "category": "测试", "stock": 0},
+            {"isbn": "979-2-0000-0003-1", "title": "下架的检索测试", "category": "测试", "stock": 5, "shelves": 0},
+        ])
+        cls.books = BookManager().select_all_book()[1]
+
+    def test_database_search_matches_memory_index(self):
+        self.assertFalse(book_index.ready)  # BookManager.search 走数据库
+        index = BookSearchIndex()
+        index.build(self.books)
+        for keyword in ("979-2", "979-2-0000-0002-4", "检索测试", "python", "Py", "不存在的书名"):
+            db_isbns = [book["isbn"] for book in BookManager().search(keyword, None)[1]]
+            self.assertEqual(db_isbns, [book["isbn"] for book in index.search(keyword, None)], keyword)
+
+    def test_search_ranking_and_limit(self):
+        isbns = [book["isbn"] for book in BookManager().search("979-2-0000-0002", None)[1]]
+        self.assertEqual(isbns[0], "979-2-0000-0002-4")
+        # ISBN完全匹配排在最前，其余按ISBN
+        isbns = [book["isbn"] for book in BookManager().search("979-2-0000-0003-1")[1]]
+        self.assertEqual(isbns, ["979-2-0000-0003-1"])
+        self.assertEqual(len(BookManager().search("979", 2)[1]), 2)
+        self.assertEqual(BookManager().search("979", 2, offset=2)[1], BookManager().search("979", None)[1][2:4])
+
+    def test_keyset_pages_cover_all_books_in_order(self):
+        for order_by in PAGE_ORDERS:
+            pages = list(BookManager().iter_books_pages(3, order_by=order_by))
+            self.assertTrue(all(len(books) <= 3 for _, books in pages))
+            isbns = [book["isbn"] for _, books in pages for book in books]
+            self.assertEqual(isbns, [book["isbn"] for book in sorted(self.books, key=page_key(order_by))], order_by)
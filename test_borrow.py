@@ -0,0 +1,127 @@
+"""
+借书车/还书车的批量接口（数据库由 conftest.py 设置为临时SQLite）
+运行：python -m pytest test_borrow.py
+"""
+import unittest
+from datetime import datetime, timedelta
+
+from borrow import BorrowManager
+from connector_pymysql import DBConnector, db_config
+
+
+def add_test_book(isbn, stock, shelves=1):
+    with DBConnector(db_config) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO books (isbn, title, category, stock, shelves) VALUES (%s, %s, %s, %s, %s)",
+            (isbn, f"测试图书{isbn}", "测试", stock, shelves))
+        conn.commit()
+
+
+def book_stock(isbn):
+    with DBConnector(db_config) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT stock FROM books WHERE isbn = %s", (isbn,))
+        return cursor.fetchone()['stock']
+
+
+class BatchBorrowTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        add_test_book("T-BORROW-1", 2)
+        add_test_book("T-BORROW-2", 0)
+        add_test_book("T-BORROW-3", 5, shelves=0)
+        add_test_book("T-RETURN-1", 3)
+        cls.manager = BorrowManager()
+        cls.due_date = datetime.now() + timedelta(days=30)
+
+    def test_borrow_books_per_item_results(self):
+        # 同一学生已有一条同一本书的未归还记录，不能被当成本次新借的记录
+        earlier = self.manager.borrow_books(
+            "9001", ["T-BORROW-1"], self.due_date, datetime.now().replace(microsecond=0) - timedelta(days=1))
+        self.assertTrue(earlier[0]["ok"])
+
+        isbns = ["T-BORROW-1", "T-BORROW-1", "T-BORROW-2", "T-BORROW-3", "T-NOT-EXIST"]
+        results = self.manager.borrow_books("9001", isbns, self.due_date)
+
+        self.assertEqual([result["isbn"] for result in results], isbns)
+        self.assertEqual([result["ok"] for result in results], [True, False, False, False, False])
+        self.assertEqual([result["reason"] for result in results],
+                         [None, "库存不足", "库存不足", "图书已下架", "图书不存在"])
+        record = results[0]["record"]
+        self.assertEqual((record["isbn"], record["student_id"]), ("T-BORROW-1", 9001))
+        self.assertIsNone(record["returned_date"])
+        self.assertGreater(record["id"], earlier[0]["record"]["id"])
+        self.assertEqual(book_stock("T-BORROW-1"), 0)
+
+    def test_borrow_books_maps_records_in_order(self):
+        add_test_book("T-BORROW-4", 3)
+        add_test_book("T-BORROW-5", 3)
+        isbns = ["T-BORROW-4", "T-BORROW-5", "T-BORROW-4"]
+        results = self.manager.borrow_books("9002", isbns, self.due_date, "2026-01-05")
+
+        self.assertTrue(all(result["ok"] for result in results))
+        self.assertEqual([result["record"]["isbn"] for result in results], isbns)
+        ids = [result["record"]["id"] for result in results]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual((book_stock("T-BORROW-4"), book_stock("T-BORROW-5")), (1, 2))
+
+    def test_return_books_by_record_id(self):
+        older = self.manager.borrow_books(
+            "9003", ["T-RETURN-1"], self.due_date, datetime.now().replace(microsecond=0) - timedelta(days=2))
+        newer = self.manager.borrow_books("9003", ["T-RETURN-1"], self.due_date)
+        older_id, newer_id = older[0]["record"]["id"], newer[0]["record"]["id"]
+        self.assertEqual(book_stock("T-RETURN-1"), 1)
+
+        # 指定较早的那条记录：归还的就是它，而不是最近的一条；同一条记录重复指定时第二项失败
+        results = self.manager.return_books([("T-RETURN-1", "9003", older_id), ("T-RETURN-1", "9003", older_id)])
+        self.assertEqual([result["ok"] for result in results], [True, False])
+        self.assertEqual(results[0]["record"]["id"], older_id)
+        self.assertIsNotNone(results[0]["record"]["returned_date"])
+        self.assertEqual(results[1]["reason"], "未找到有效借阅记录")
+        self.assertEqual(book_stock("T-RETURN-1"), 2)
+
+        # 不指定记录ID：归还最近一条未归还的记录；没有借这本书的学生失败
+        results = self.manager.return_books([("T-RETURN-1", "9003"), ("T-RETURN-1", "9999")])
+        self.assertEqual([result["ok"] for result in results], [True, False])
+        self.assertEqual(results[0]["record"]["id"], newer_id)
+        self.assertEqual(book_stock("T-RETURN-1"), 3)
+
+
+class ArchiveTest(unittest.TestCase):
+    def add_returned_record(self, student_id, returned_days_ago):
+        returned_date = datetime.now().replace(microsecond=0) - timedelta(days=returned_days_ago)
+        with DBConnector(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """INSERT INTO borrow_records (student_id, isbn, borrow_date, due_date, returned_date)
+                VALUES (%s, %s, %s, %s, %s)""",
+                (student_id, "T-ARCHIVE-1", returned_date - timedelta(days=20), returned_date - timedelta(days=5),
+                 returned_date))
+            conn.commit()
+            return cursor.lastrowid
+
+    def table_ids(self, table):
+        with DBConnector(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id FROM {table} WHERE isbn = %s", ("T-ARCHIVE-1",))
+            return {row['id'] for row in cursor.fetchall()}
+
+    def test_archive_moves_old_returned_records_in_batches(self):
+        add_test_book("T-ARCHIVE-1", 1)
+        manager = BorrowManager()
+        old_ids = [self.add_returned_record(9101 + i, 400 + i) for i in range(5)]
+        recent_id = self.add_returned_record(9110, 10)
+        open_loan = manager.borrow_books("9111", ["T-ARCHIVE-1"], datetime.now() + timedelta(days=30))[0]["record"]
+        before = [record['id'] for _, records in manager.iter_all_borrow_records(4) for record in records]
+
+        # 每批2条、最多2批：先归档最早归还的4条，再次调用从剩下的继续
+        self.assertEqual(manager.archive_returned_records(after_days=365, batch_size=2, max_batches=2), 4)
+        manager.archive_returned_records(after_days=365, batch_size=2)
+
+        self.assertEqual(self.table_ids("borrow_records"), {recent_id, open_loan['id']})
+        self.assertEqual(self.table_ids("borrow_records_history"), set(old_ids))
+        # 归档后的记录仍能按ID查到，全部借阅记录的内容和顺序不变
+        self.assertEqual(manager.get_borrow_record(old_ids[0])['student_id'], 9101)
+        after = [record['id'] for _, records in manager.iter_all_borrow_records(4) for record in records]
+        self.assertEqual(after, before)
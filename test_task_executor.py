@@ -0,0 +1,59 @@
+"""
+后台任务执行器与连接池的配合：界面线程固定一个连接、执行器线程全部忙碌时，流式查询仍能借到独立连接
+运行：python -m pytest test_task_executor.py（数据库由 conftest.py 设置）
+"""
+import time
+import unittest
+
+from PyQt5.QtCore import QCoreApplication
+
+from books import BookManager
+from connector_pymysql import DBConnector, db_config
+from task_executor import TaskExecutor, PRIORITY_VISIBLE
+
+
+class TaskExecutorPoolTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_concurrent_tasks_and_stream(self):
+        # 界面线程固定一个连接（线程亲和模式下第一次查询后一直占用）
+        with DBConnector(db_config) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) AS n FROM books")
+            total = cursor.fetchone()['n']
+        self.assertGreater(total, 0)
+
+        executor = TaskExecutor()
+
+        def query(hold=1.5):
+            with DBConnector(db_config) as conn:
+                time.sleep(hold)  # 各任务同时持有连接（比连接池等待时间长）
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) AS n FROM books")
+                return cursor.fetchone()['n']
+
+        def stream_books():
+            # 先在工作线程上普通查询一次，再流式读取（流式查询需要另借一个独立连接）
+            query(hold=0.1)
+            yield from BookManager().iter_all_books(2)
+
+        results, batches, errors = [], [], []
+        handles = [executor.stream(stream_books, priority=PRIORITY_VISIBLE)]
+        handles += [executor.submit(query) for _ in range(4)]
+        for handle in handles:
+            handle.result_ready.connect(results.append)
+            handle.item_ready.connect(batches.append)
+            handle.failed.connect(errors.append)
+
+        deadline = time.monotonic() + 10
+        while any(not handle.finished for handle in handles) and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        executor.shutdown()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results, [total] * 4)
+        self.assertEqual(sum(len(books) for _, books in batches), total)
+